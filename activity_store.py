@@ -0,0 +1,138 @@
+# activity_store.py
+"""Local SQLite store for the EIA international activity data.
+
+Used by `fetch_activity.py --incremental`: the store remembers every
+(activity, country, product, period) row fetched so far, so a refresh only
+requests the periods after the latest stored one (plus a revision
+lookback) and upserts them. The CSV/Parquet outputs are regenerated from
+the store afterwards. A full refresh replaces the activity's stored rows
+with the new CSV, so the next incremental run starts from fresh data.
+"""
+import os
+
+import pandas as pd
+from sqlalchemy import (Column, Float, Index, MetaData, String, Table,
+                        create_engine, delete, func, select)
+from sqlalchemy.dialects.sqlite import insert
+
+STORE_PATH = os.path.join("data", "activity_store.sqlite")
+
+KEY_COLUMNS = ["activityId", "countryRegionId", "productName", "period"]
+COLUMNS = ["period", "productName", "activityId", "activityName",
+           "countryRegionId", "countryRegionName", "value", "unit"]
+
+metadata = MetaData()
+activity_table = Table(
+    "activity", metadata,
+    Column("activityId", String, primary_key=True),
+    Column("countryRegionId", String, primary_key=True),
+    Column("productName", String, primary_key=True),
+    Column("period", String, primary_key=True),  # YYYY-MM-DD
+    Column("activityName", String),
+    Column("countryRegionName", String),
+    Column("value", Float),
+    Column("unit", String),
+)
+# Latest-period lookups scan (activity, country, product) ranges
+Index("ix_activity_latest", activity_table.c.activityId, activity_table.c.countryRegionId,
+      activity_table.c.productName, activity_table.c.period)
+
+_engines = {}
+
+
+def get_engine(path=STORE_PATH):
+    if path not in _engines:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        engine = create_engine(f"sqlite:///{path}")
+        metadata.create_all(engine)
+        _engines[path] = engine
+    return _engines[path]
+
+
+def _to_records(df):
+    """Normalize a fetched/CSV frame to store rows."""
+    df = df[[c for c in COLUMNS if c in df.columns]].copy()
+    df["period"] = pd.to_datetime(df["period"], errors="coerce").dt.strftime("%Y-%m-%d")
+    df["activityId"] = df["activityId"].astype(str)
+    df["value"] = pd.to_numeric(df["value"], errors="coerce")
+    df = df.dropna(subset=["period"])
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict("records")
+
+
+# --- Write ---
+def upsert(df, engine=None, chunk_size=500):
+    """Insert or update rows keyed on (activity, country, product, period)."""
+    if df.empty:
+        return 0
+    engine = engine or get_engine()
+    with engine.begin() as conn:
+        return _upsert(conn, df, chunk_size)
+
+
+def _upsert(conn, df, chunk_size=500):
+    records = _to_records(df)
+    for i in range(0, len(records), chunk_size):
+        stmt = insert(activity_table).values(records[i:i + chunk_size])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=KEY_COLUMNS,
+            set_={c: stmt.excluded[c] for c in COLUMNS if c not in KEY_COLUMNS},
+        )
+        conn.execute(stmt)
+    return len(records)
+
+
+def seed_from_csv(csv_path, activity_id, engine=None):
+    """Fill an empty store for activity_id from an existing full-history CSV."""
+    engine = engine or get_engine()
+    if latest_periods(activity_id, engine) or not os.path.exists(csv_path):
+        return 0
+    df = pd.read_csv(csv_path)
+    return upsert(df[df["activityId"].astype(str) == str(activity_id)], engine)
+
+
+def replace_from_csv(csv_path, activity_id, engine=None, chunksize=50000):
+    """
+    Replace the stored rows of activity_id with those of csv_path (after a
+    full refresh), in one transaction: rows the refresh no longer returns go too.
+    """
+    engine = engine or get_engine()
+    with engine.begin() as conn:
+        conn.execute(delete(activity_table).where(activity_table.c.activityId == str(activity_id)))
+        rows = 0
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            rows += _upsert(conn, chunk[chunk["activityId"].astype(str) == str(activity_id)])
+    return rows
+
+
+# --- Read ---
+def latest_periods(activity_id, engine=None):
+    """Return {(countryRegionId, productName): latest period} for an activity."""
+    engine = engine or get_engine()
+    t = activity_table.c
+    stmt = (select(t.countryRegionId, t.productName, func.max(t.period))
+            .where(t.activityId == str(activity_id))
+            .group_by(t.countryRegionId, t.productName))
+    with engine.connect() as conn:
+        return {(c, p): pd.Timestamp(period) for c, p, period in conn.execute(stmt)}
+
+
+def iter_activity(activity_id, chunksize=5000, engine=None):
+    """Yield the history of one activity in chunks, newest period first per country."""
+    engine = engine or get_engine()
+    t = activity_table.c
+    stmt = (select(*[t[c] for c in COLUMNS])
+            .where(t.activityId == str(activity_id))
+            .order_by(t.countryRegionId, t.period.desc(), t.productName))
+    with engine.connect() as conn:
+        for chunk in pd.read_sql(stmt, conn, chunksize=chunksize):
+            chunk["period"] = pd.to_datetime(chunk["period"])
+            yield chunk
+
+
+def read_activity(activity_id, engine=None):
+    """Full history of one activity, newest period first per country."""
+    chunks = list(iter_activity(activity_id, engine=engine))
+    if not chunks:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.concat(chunks, ignore_index=True)
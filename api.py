@@ -0,0 +1,309 @@
+# api.py
+"""Read-only JSON API over the dashboard datasets.
+
+Serves the frames the dashboard loaders produce (load_spot_data,
+load_and_clean) to other tools, so they stop parsing data/*.csv
+themselves. Frames are loaded once per data version through the same
+process cache and cross-process registry as the dashboard.
+
+    GET /api/v1/datasets
+    GET /api/v1/spot/<brent|wti|spread>?start=&end=&freq=&limit=&cursor=
+    GET /api/v1/snd/<production|consumption|stocks>?country=&product=&start=&end=&freq=&limit=&cursor=
+
+freq resamples like aggregate_prices (spot: Daily ... Yearly; S&D:
+Monthly, Quarterly, Yearly means). country and product take comma
+separated lists. start and end are ISO dates (a time zone, if given, is
+converted to UTC). Rows come in key order, `limit` at a time; pass the
+response's next_cursor to get the next page. Cursors are keysets (the
+last row's key), so paging keeps working across a data refresh.
+
+Every response carries an ETag derived from the data version and the
+query; a matching If-None-Match gets a 304 without touching the data.
+Bodies are kept in an LRU result cache and gzip-compressed for clients
+that accept it.
+
+    python api.py --port 8050
+"""
+import argparse
+import base64
+import gzip
+import json
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from flask import Flask, Response, jsonify, request
+
+import utils
+from data_cache import file_signature
+from dataset_registry import digest
+from snapshots import snapshots
+from storage import parquet_path
+
+SPOT_SERIES = ("brent", "wti", "spread")
+SPOT_FREQS = ("Daily", "Weekly", "Monthly", "Quarterly", "Yearly")
+ACTIVITIES = {
+    "production": "data/production.csv",
+    "consumption": "data/consumption.csv",
+    "stocks": "data/stocks.csv",
+}
+SND_FREQS = {"Monthly": None, "Quarterly": "Q", "Yearly": "Y"}
+SND_COLUMNS = ["period", "countryRegionId", "productName", "value"]
+
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = 10000
+GZIP_MIN_BYTES = 1024
+
+
+class ApiError(Exception):
+    """Bad request parameters; answered as {"error": message} with `status`."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+# --- Result cache ---
+class ResultCache:
+    """Thread-safe LRU of response bodies keyed by ETag, capped in bytes."""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # etag -> {"body": bytes, "gzip": bytes or None}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, etag):
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(etag)
+            self.hits += 1
+            return entry
+
+    def put(self, etag, body):
+        entry = {"body": body, "gzip": None}
+        with self._lock:
+            if etag in self._entries:
+                return self._entries[etag]
+            self._entries[etag] = entry
+            self.bytes += len(body)
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                _, old = self._entries.popitem(last=False)
+                self.bytes -= len(old["body"]) + len(old["gzip"] or b"")
+        return entry
+
+    def compressed(self, entry):
+        """Gzip body of an entry, compressed on first use."""
+        if entry["gzip"] is None:
+            entry["gzip"] = gzip.compress(entry["body"], compresslevel=6)
+            with self._lock:
+                self.bytes += len(entry["gzip"])
+        return entry["gzip"]
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.bytes,
+                    "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
+
+
+# --- Parameters ---
+def _timestamp(value):
+    """Naive timestamp of an ISO date; tz-aware values are converted to UTC."""
+    ts = pd.Timestamp(value)
+    if ts is pd.NaT:
+        raise ValueError(f"not a date: {value!r}")
+    return ts.tz_convert("UTC").tz_localize(None) if ts.tzinfo is not None else ts
+
+
+def _dates(args):
+    try:
+        start = _timestamp(args["start"]) if args.get("start") else None
+        end = _timestamp(args["end"]) if args.get("end") else None
+    except (ValueError, TypeError) as exc:
+        raise ApiError(f"invalid date: {exc}")
+    return start, end
+
+
+def _limit(args):
+    try:
+        limit = int(args.get("limit", DEFAULT_LIMIT))
+    except ValueError:
+        raise ApiError("limit must be an integer")
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ApiError(f"limit must be between 1 and {MAX_LIMIT}")
+    return limit
+
+
+def _choice(value, choices, name):
+    """Case-insensitive match of value against choices."""
+    for choice in choices:
+        if value.lower() == choice.lower():
+            return choice
+    raise ApiError(f"{name} must be one of {', '.join(choices)}")
+
+
+def _list(args, name):
+    return [v.strip() for v in args.get(name, "").split(",") if v.strip()] or None
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, size):
+    """[period, *keys] of a cursor holding `size` values, the period parsed."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(key, list) or len(key) != size or not all(isinstance(k, str) for k in key):
+            raise ValueError("bad cursor shape")
+        return [_timestamp(key[0]), *key[1:]]
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise ApiError("invalid cursor")
+
+
+def data_version(paths):
+    """Digest of the current snapshot files behind paths (and their Parquet copies)."""
+    sigs = []
+    for path in paths:
+        for p in (path, parquet_path(path)):
+            sigs.append(file_signature(snapshots.resolve(p)))
+    return digest(sigs)
+
+
+# --- Queries ---
+def _records(df):
+    """Rows as a JSON array, periods as YYYY-MM-DD."""
+    out = df.assign(period=df["period"].dt.strftime("%Y-%m-%d"))
+    return out.to_json(orient="records", double_precision=6)
+
+
+def spot_page(series, freq, start, end, limit, cursor):
+    """(rows, next cursor key) of one spot series page."""
+    brent, wti, spread, _ = utils.load_spot_data()
+    df = {"brent": brent, "wti": wti, "spread": spread}[series]
+    # Slice the daily rows before aggregating: buckets are labelled with their end date
+    df = utils.aggregate_prices(utils.slice_period(df, start, end), freq)
+    if cursor is not None:
+        df = utils.slice_period(df, cursor[0] + pd.Timedelta(1, "ns"))
+    page = df.iloc[:limit]
+    more = len(df) > limit
+    return page, ([page["period"].iloc[-1].isoformat()] if more else None)
+
+
+def snd_page(activity, countries, products, freq, start, end, limit, cursor):
+    """(rows, next cursor key) of one S&D page, rows ordered by period, country, product."""
+    df = utils.load_and_clean(ACTIVITIES[activity], columns=SND_COLUMNS)
+    df = utils.slice_period(df, start, end)
+    if countries:
+        df = df[df["countryRegionId"].isin(countries)]
+    if products:
+        df = df[df["productName"].isin(products)]
+    # Parquet loads these as categoricals: plain strings sort and compare like the cursor keys
+    df = df.astype({"countryRegionId": str, "productName": str})
+    rule = SND_FREQS[freq]
+    if rule is not None and not df.empty:
+        bucket = df["period"].dt.to_period(rule).dt.start_time
+        df = (df.groupby([bucket, "countryRegionId", "productName"], observed=True)["value"]
+                .mean().reset_index())
+    df = df.sort_values(["period", "countryRegionId", "productName"], kind="stable")
+    if cursor is not None:
+        period, country, product = cursor
+        p, c, g = df["period"], df["countryRegionId"], df["productName"]
+        after = (p > period) | ((p == period) & ((c > country) | ((c == country) & (g > product))))
+        df = df[after.to_numpy()]
+    page = df.iloc[:limit]
+    if len(df) <= limit:
+        return page, None
+    last = page.iloc[-1]
+    return page, [last["period"].isoformat(), last["countryRegionId"], last["productName"]]
+
+
+# --- App ---
+def create_app(config=None):
+    """Flask app serving the API; config overrides e.g. RESULT_CACHE_MB."""
+    app = Flask(__name__)
+    app.config.update(RESULT_CACHE_MB=64)
+    app.config.update(config or {})
+    cache = ResultCache(int(app.config["RESULT_CACHE_MB"] * 1024 * 1024))
+    app.extensions["result_cache"] = cache
+
+    def respond(version, query, build):
+        """ETag / 304, then the cached or freshly built body, gzipped when accepted."""
+        etag = digest((version, request.path, query))
+        headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if request.if_none_match.contains(etag):
+            return Response(status=304, headers=headers)
+        entry = cache.get(etag)
+        if entry is None:
+            meta, page, next_key = build()
+            meta["next_cursor"] = encode_cursor(next_key) if next_key is not None else None
+            meta["version"] = version
+            body = f'{{"meta": {json.dumps(meta)}, "data": {_records(page)}}}'.encode()
+            entry = cache.put(etag, body)
+        body = entry["body"]
+        if len(body) >= GZIP_MIN_BYTES and "gzip" in request.accept_encodings:
+            body = cache.compressed(entry)
+            headers["Content-Encoding"] = "gzip"
+        return Response(body, mimetype="application/json", headers=headers)
+
+    @app.errorhandler(ApiError)
+    def api_error(exc):
+        return jsonify(error=str(exc)), exc.status
+
+    @app.get("/api/v1/datasets")
+    def datasets():
+        with snapshots.pinned():
+            return jsonify(
+                spot={"series": list(SPOT_SERIES), "freq": list(SPOT_FREQS),
+                      "version": data_version([utils.PRICES_PATH])},
+                snd={name: {"freq": list(SND_FREQS), "version": data_version([path])}
+                     for name, path in ACTIVITIES.items()},
+                snapshots=snapshots.versions(),
+                result_cache=cache.stats(),
+            )
+
+    @app.get("/api/v1/spot/<series>")
+    def spot(series):
+        series = _choice(series, SPOT_SERIES, "series")
+        args = request.args
+        freq = _choice(args.get("freq", "Daily"), SPOT_FREQS, "freq")
+        start, end = _dates(args)
+        limit = _limit(args)
+        cursor = decode_cursor(args["cursor"], 1) if args.get("cursor") else None
+        query = (series, freq, start, end, limit, cursor)
+        with snapshots.pinned():
+            def build():
+                page, next_key = spot_page(series, freq, start, end, limit, cursor)
+                return {"series": series, "freq": freq, "rows": len(page)}, page, next_key
+            return respond(data_version([utils.PRICES_PATH]), query, build)
+
+    @app.get("/api/v1/snd/<activity>")
+    def snd(activity):
+        activity = _choice(activity, list(ACTIVITIES), "activity")
+        args = request.args
+        freq = _choice(args.get("freq", "Monthly"), list(SND_FREQS), "freq")
+        countries, products = _list(args, "country"), _list(args, "product")
+        start, end = _dates(args)
+        limit = _limit(args)
+        cursor = decode_cursor(args["cursor"], 3) if args.get("cursor") else None
+        query = (activity, countries, products, freq, start, end, limit, cursor)
+        with snapshots.pinned():
+            def build():
+                page, next_key = snd_page(activity, countries, products, freq, start, end, limit, cursor)
+                return {"activity": activity, "freq": freq, "rows": len(page)}, page, next_key
+            return respond(data_version([ACTIVITIES[activity]]), query, build)
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the dashboard datasets as a JSON API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    args = parser.parse_args()
+    create_app().run(host=args.host, port=args.port, threaded=True)
@@ -0,0 +1,54 @@
+# benchmarks/bench_time_filter.py
+"""
+Time-window slicing vs. boolean-mask filtering as history grows.
+
+Run from the repo root:
+    python benchmarks/bench_time_filter.py
+
+apply_time_filter slices a sorted period index with searchsorted, so its
+cost should stay flat while the mask scan grows linearly with the rows.
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import apply_time_filter, slice_period  # noqa: E402
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+LABELS = ["1M", "YTD", "5Y"]
+
+
+def synthetic_prices(n):
+    periods = pd.date_range(end="2025-10-17", periods=n, freq="D")
+    return pd.DataFrame({"period": periods, "value": 60 + np.random.default_rng(0).normal(0, 1, n).cumsum()})
+
+
+def mask_filter(df, start):
+    return df.copy()[df["period"] >= start]
+
+
+def best_of(fn, repeat=5, number=20):
+    return min(timeit.repeat(fn, repeat=repeat, number=number)) / number
+
+
+def main():
+    print(f"{'rows':>10} {'label':>6} {'slice (us)':>12} {'mask (us)':>12}")
+    for n in SIZES:
+        df = synthetic_prices(n)
+        apply_time_filter(df, "1M")  # build the period index once, as for cached frames
+        for label in LABELS:
+            start = apply_time_filter(df, label)["period"].iloc[0]
+            t_slice = best_of(lambda: apply_time_filter(df, label))
+            t_mask = best_of(lambda: mask_filter(df, start))
+            print(f"{n:>10} {label:>6} {t_slice * 1e6:>12.1f} {t_mask * 1e6:>12.1f}")
+    df = synthetic_prices(SIZES[-1])
+    t = best_of(lambda: slice_period(df, "2020-03-01", "2020-03-31"))
+    print(f"custom range on {SIZES[-1]} rows: {t * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
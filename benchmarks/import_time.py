@@ -0,0 +1,134 @@
+# benchmarks/import_time.py
+"""
+Import-time report for the dashboard entry points (python -X importtime).
+
+Run from the repo root:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --compare benchmarks/results/importtime-<old>.json
+
+Each entry point's `from utils import ...` line is taken from the page
+itself and timed in a fresh interpreter, after the imports every page
+already pays for (streamlit, as in a running server). The report lists
+the total and the heaviest newly imported packages per entry point, best
+of a few runs, and is written as JSON to benchmarks/results/.
+
+The check fails (exit 1) when an entry point imports a library it must
+not load at import time, e.g. plotly for the landing page, or plotly /
+streamlit for the data-only imports used by the API and the scheduler.
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+PAGES = ["main.py", "pages/Spot Analysis.py", "pages/Supply & Demand.py", "pages/US Import Flows.py"]
+MARKER = "--entry--"
+DATA_IMPORT = "from utils import load_spot_data, load_and_clean, aggregate_prices, slice_period"
+# Packages an entry point must not import
+FORBIDDEN = {
+    "import utils": ["pandas", "plotly", "streamlit", "pyarrow", "toml", "tomllib"],
+    "data loaders (api, scheduler)": ["plotly", "streamlit"],
+    "main.py": ["plotly"],
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def page_import(path):
+    """The `from utils import ...` statement of a page."""
+    with open(os.path.join(ROOT, path)) as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module == "utils":
+            return f"from utils import {', '.join(a.name for a in node.names)}"
+    return "import utils"
+
+
+def measure(preload, statement):
+    """{module: (self us, cumulative us, depth)} of the modules statement imports after preload."""
+    code = f"{preload}\nimport sys\nsys.stderr.write('{MARKER}\\n')\n{statement}"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+    lines = proc.stderr.split(MARKER + "\n", 1)[-1].splitlines()
+    modules = {}
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative), depth)
+    return modules
+
+
+def report(name, preload, statement, repeat):
+    forbidden = FORBIDDEN.get(name, [])
+    runs = [measure(preload, statement) for _ in range(repeat)]
+    totals = [sum(c for _, c, depth in run.values() if depth == 0) for run in runs]
+    best = runs[totals.index(min(totals))]
+    packages = {}
+    for module, (self_us, _, _) in best.items():
+        top = module.split(".")[0]
+        packages[top] = packages.get(top, 0) + self_us
+    heaviest = sorted(packages.items(), key=lambda kv: -kv[1])[:6]
+    violations = sorted({m.split(".")[0] for m in best} & set(forbidden))
+    print(f"{name:<32} {min(totals) / 1000:>8.1f} ms   "
+          + ", ".join(f"{pkg} {us / 1000:.0f}" for pkg, us in heaviest)
+          + (f"   FORBIDDEN: {', '.join(violations)}" if violations else ""))
+    return {"name": name, "statement": statement, "ms": min(totals) / 1000,
+            "packages_ms": {pkg: us / 1000 for pkg, us in heaviest}, "violations": violations}
+
+
+def compare(results, baseline_path, threshold=1.2):
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r["ms"] for r in json.load(f)["results"]}
+    print(f"\nCompared with {baseline_path}:")
+    for r in results:
+        old = baseline.get(r["name"])
+        if old:
+            ratio = r["ms"] / old
+            flag = "  REGRESSION" if ratio > threshold else ""
+            print(f"{r['name']:<32} {ratio:>6.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time report of the dashboard entry points")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=None, help="JSON output (default benchmarks/results/importtime-<commit>.json)")
+    parser.add_argument("--compare", default=None, help="earlier report to compare against")
+    args = parser.parse_args()
+
+    cases = [("import utils", "", "import utils"),
+             ("data loaders (api, scheduler)", "", DATA_IMPORT)]
+    cases += [(page, "import streamlit", page_import(page)) for page in PAGES]
+    results = [report(name, preload, stmt, args.repeat) for name, preload, stmt in cases]
+
+    commit = git_commit()
+    output = args.output or os.path.join(HERE, "results", f"importtime-{commit}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"commit": commit, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                   "python": sys.version.split()[0], "results": results}, f, indent=2)
+    print(f"\nReport written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+    failed = [r for r in results if r["violations"]]
+    if failed:
+        print("Forbidden imports:", "; ".join(f"{r['name']}: {', '.join(r['violations'])}" for r in failed))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
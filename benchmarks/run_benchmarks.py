@@ -0,0 +1,257 @@
+# benchmarks/run_benchmarks.py
+"""
+Benchmarks of the utils hot paths on synthetic data at 1x / 10x / 100x.
+
+Run from the repo root:
+    python benchmarks/run_benchmarks.py                 # 1x and 10x
+    python benchmarks/run_benchmarks.py --scales 1 10 100
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<old>.json
+
+Synthetic datasets are generated once under benchmarks/.data/<scale>x and
+each scale runs with that directory as working directory, so the Parquet
+copies and derived artifacts it builds stay there. Results (best time of
+a few repeats per case) are written as JSON to benchmarks/results/, named
+after the current commit, for comparisons between commits. Correctness
+(RollingStats against pandas) is checked by tests/test_rolling.py.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+
+os.environ.setdefault("OIL_DASH_REGISTRY_DIR", os.path.join(HERE, ".data", "registry"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import synthetic  # noqa: E402
+import utils  # noqa: E402
+from data_cache import dataset_cache  # noqa: E402
+from figure_cache import figure_cache  # noqa: E402
+from rolling import RollingStats  # noqa: E402
+from snd_matrix import SndMatrix  # noqa: E402
+from spot_engine import SpotEngine, read_spot_prices  # noqa: E402
+from storage import write_parquet_from_csv  # noqa: E402
+
+
+def best_of(fn, repeat=3, budget=0.5):
+    """Best seconds per call, with enough calls per repeat to last ~budget / repeat."""
+    start = time.perf_counter()
+    fn()
+    once = time.perf_counter() - start
+    number = max(1, min(1000, int(budget / repeat / max(once, 1e-6))))
+    return min(timeit.repeat(fn, repeat=repeat, number=number)) / number
+
+
+def spot_engine_cases(record, n_series=32, days=10000):
+    """SpotEngine with n_series daily series over ~40 years (EIA spot history starts in 1986)."""
+    rng = np.random.default_rng(0)
+    series = {f"s{i:02d}": {"series": f"S{i:02d}", "label": f"Series {i}", "short": f"S{i:02d}",
+                            "unit": "$/GAL" if i % 2 else "$/BBL"} for i in range(n_series)}
+    combinations = {f"c{i:02d}": {"label": f"Crack {i}", "short": f"C{i:02d}",
+                                  "legs": {f"s{i + 1:02d}": 1, f"s{i:02d}": -1}} for i in range(0, n_series, 2)}
+    dates = pd.bdate_range(end=synthetic.END, periods=days)
+    values = 50 + np.cumsum(rng.normal(0, 1, (days, n_series)), axis=0)
+    values[rng.random(values.shape) < 0.02] = np.nan  # holidays differ per market
+    long = pd.DataFrame({"period": np.repeat(dates.values, n_series),
+                         "series": np.tile([cfg["series"] for cfg in series.values()], days),
+                         "value": values.ravel()})
+    rows = int(long["value"].notna().sum())
+    record(f"spot_engine_build_{n_series}", best_of(lambda: SpotEngine(long, series, combinations), repeat=2), rows)
+    engine = SpotEngine(long, series, combinations)
+    pairs = [(a, b) for i, a in enumerate(engine.keys) for b in engine.keys[i + 1:]]
+    record(f"spot_engine_all_pairs_{n_series}", best_of(lambda: engine.spreads(pairs)), days * len(pairs))
+    record(f"spot_engine_spread_matrix_{n_series}", best_of(engine.spread_matrix), n_series ** 2)
+    record(f"spot_engine_frames_{n_series}", best_of(
+        lambda: ([engine.frame(k) for k in engine.available()], engine._frames.clear())), rows)
+
+
+def run_scale(scale):
+    """All benchmark cases for one scale; returns a list of result dicts."""
+    root = os.path.join(HERE, ".data", f"{scale}x")
+    paths = synthetic.generate(scale, root)
+    cwd = os.getcwd()
+    os.chdir(root)
+    dataset_cache.clear()
+    figure_cache.clear()
+    results = []
+
+    def record(name, seconds, rows=None, **extra):
+        results.append({"scale": scale, "name": name, "seconds": seconds, "rows": rows, **extra})
+        print(f"{scale:>4}x {name:<34} {seconds * 1e3:>10.2f} ms" + (f"  ({rows} rows)" if rows else ""))
+
+    try:
+        prod_csv, prices_csv, imports_csv = "data/production.csv", "data/prices.csv", "data/us_crude_imports.csv"
+        rows = {name: sum(1 for _ in open(path)) - 1 for name, path in paths.items()}
+        load = utils.load_and_clean.__wrapped__  # uncached loader
+
+        # --- Loading ---
+        record("load_and_clean_csv", best_of(
+            lambda: load(prod_csv, filter_crude=True, columns=utils.SND_COLUMNS)), rows["production"])
+        start = time.perf_counter()
+        write_parquet_from_csv(prod_csv)
+        write_parquet_from_csv(prices_csv)
+        record("parquet_convert", time.perf_counter() - start, rows["production"] + rows["prices"])
+        record("load_and_clean_parquet", best_of(
+            lambda: load(prod_csv, filter_crude=True, columns=utils.SND_COLUMNS)), rows["production"])
+        record("load_and_clean_cached", best_of(
+            lambda: utils.load_and_clean(prod_csv, filter_crude=True, columns=utils.SND_COLUMNS)))
+
+        if os.path.exists(os.path.join("data", "spot_derived.parquet")):
+            os.remove(os.path.join("data", "spot_derived.parquet"))
+        start = time.perf_counter()
+        utils.load_spot_data.__wrapped__()
+        record("load_spot_data_derive", time.perf_counter() - start, rows["prices"])
+        record("load_spot_data_artifact", best_of(utils.load_spot_data.__wrapped__), rows["prices"])
+        record("load_spot_data_cached", best_of(utils.load_spot_data))
+
+        brent, wti, spread, prices = utils.load_spot_data()
+        record("load_spot_engine", best_of(lambda: SpotEngine(read_spot_prices(prices_csv))), rows["prices"])
+        spot_engine_cases(record)
+        prod = utils.load_and_clean(prod_csv, filter_crude=True, columns=utils.SND_COLUMNS)
+
+        # --- Time filters and aggregation ---
+        for label in ["1M", "1Y", "Max"]:
+            record(f"apply_time_filter_{label}", best_of(lambda: utils.apply_time_filter(brent, label)))
+        record("apply_time_filter_snd_5Y", best_of(lambda: utils.apply_time_filter_snd(prod, "Last 5 Years")))
+        start = time.perf_counter()
+        utils.aggregate_prices(brent, "Weekly")
+        record("aggregate_prices_pyramid", time.perf_counter() - start, len(brent))
+        for freq in ["Weekly", "Monthly"]:
+            record(f"aggregate_prices_{freq}", best_of(lambda: utils.aggregate_prices(brent, freq)))
+
+        # --- Rolling statistics (plot_price_chart / plot_returns_with_vol) ---
+        values = brent["value"].to_numpy(dtype="float64")
+        returns = brent["returns"].to_numpy(dtype="float64")
+
+        def rolling_ours():
+            stats = RollingStats(values)
+            stats.mean(20), stats.mean(50)
+            RollingStats(returns).std(20)
+
+        def rolling_pandas():
+            s, r = pd.Series(values), pd.Series(returns)
+            s.rolling(20).mean(), s.rolling(50).mean(), r.rolling(20).std()
+
+        record("rolling_stats", best_of(rolling_ours), len(values))
+        record("rolling_pandas", best_of(rolling_pandas), len(values))
+
+        # --- S&D matrix (all countries at once) vs per-section pandas ---
+        frames = {"Production": prod, "Consumption": prod, "Stocks": prod}
+        record("snd_matrix_build", best_of(lambda: SndMatrix(frames), repeat=2), 3 * len(prod))
+        matrix = SndMatrix(frames)
+        countries = sorted(prod["countryRegionId"].unique())[:10]
+
+        def sections_pandas():
+            for _ in frames:
+                section = utils.apply_time_filter_snd(prod, "Last 5 Years")
+                section = section[section["countryRegionId"].isin(countries)]
+                last_12m = section["period"].max() - pd.DateOffset(months=12)
+                section[section["period"] > last_12m].groupby("countryRegionId", observed=True)["value"].mean()
+
+        def sections_matrix():
+            for activity in frames:
+                start = utils.window_start("Last 5 Years", matrix.periods[matrix.last_row(activity)])
+                matrix.frame(activity, countries, start=start), matrix.latest(activity, countries)
+
+        record("snd_sections_pandas", best_of(sections_pandas), len(prod))
+        record("snd_sections_matrix", best_of(sections_matrix), len(prod))
+
+        # --- Figures ---
+        series = matrix.frame("Production", countries)
+        latest = matrix.latest("Production", countries)
+        record("plot_section_build", best_of(lambda: (
+            utils.section_line_chart.__wrapped__(series, "Production"),
+            utils.section_bar_chart.__wrapped__(latest, "Production"))), series.size)
+        record("plot_section_cached", best_of(lambda: (
+            utils.section_line_chart(series, "Production"),
+            utils.section_bar_chart(latest, "Production"))), series.size)
+
+        imports = pd.read_csv(imports_csv)
+        for level in ["origin", "grade", "month"]:
+            record(f"prepare_sankey_nodes_{level}", best_of(
+                lambda: utils.prepare_sankey_nodes(imports, level=level, max_links=150)), len(imports))
+
+        record("plot_price_chart_build", best_of(lambda: utils.plot_price_chart.__wrapped__(
+            brent, "Brent", "Brent", "Price", fast_k=20, slow_k=50)), len(brent))
+        record("plot_returns_with_vol_build", best_of(lambda: utils.plot_returns_with_vol.__wrapped__(
+            brent, "Brent", k=20)), len(brent))
+        fig = utils.plot_price_chart(brent, "Brent", "Brent", "Price", fast_k=20, slow_k=50)
+        record("plot_price_chart_cached", best_of(lambda: utils.plot_price_chart(
+            brent, "Brent", "Brent", "Price", fast_k=20, slow_k=50)), len(brent),
+               payload_bytes=len(fig.to_json()))
+
+        def spot_page():
+            for df in (brent, wti, spread):
+                view = utils.apply_time_filter(utils.aggregate_prices(df, "Daily"), "Max")
+                utils.plot_price_chart.__wrapped__(view, "x", "t", "y", fast_k=20, slow_k=50).to_json()
+                utils.plot_returns_with_vol.__wrapped__(view, "x", k=20).to_json()
+        record("spot_page_figures_end_to_end", best_of(spot_page, repeat=2), len(brent))
+    finally:
+        os.chdir(cwd)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline_path, threshold=1.2):
+    """Print cases slower than `threshold` times the baseline run."""
+    with open(baseline_path) as f:
+        baseline = {(r["scale"], r["name"]): r["seconds"] for r in json.load(f)["results"]}
+    print(f"\nCompared with {baseline_path}:")
+    for r in results:
+        old = baseline.get((r["scale"], r["name"]))
+        if old:
+            ratio = r["seconds"] / old
+            flag = "  REGRESSION" if ratio > threshold else ""
+            print(f"{r['scale']:>4}x {r['name']:<34} {ratio:>6.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="utils hot-path benchmarks on synthetic data")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], choices=sorted(synthetic.SCALES))
+    parser.add_argument("--output", default=None, help="JSON output path (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", default=None, help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.scales:
+        results.extend(run_scale(scale))
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "results": results,
+    }
+    output = args.output or os.path.join(HERE, "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# benchmarks/synthetic.py
+"""
+EIA-shaped synthetic datasets at 1x, 10x and 100x the current data.
+
+Writes production.csv, prices.csv and us_crude_imports.csv with the same
+columns as the fetchers produce. Larger scales add countries, products,
+years and intraday price ticks:
+
+    python benchmarks/synthetic.py --scale 10 --out benchmarks/.data/10x
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Rows grow roughly 10x / 100x from the 1x shape of data/
+SCALES = {
+    1: {"countries": 40, "products": 6, "months": 66,
+        "ticks_per_day": 1, "origins": 60, "grades": 5, "import_months": 187},
+    10: {"countries": 160, "products": 6, "months": 165,
+         "ticks_per_day": 10, "origins": 240, "grades": 5, "import_months": 467},
+    100: {"countries": 400, "products": 10, "months": 400,
+          "ticks_per_day": 100, "origins": 600, "grades": 10, "import_months": 935},
+}
+PRICE_DAYS = 2775  # business days of prices.csv
+PRODUCTS = ["Crude oil including lease condensate", "NGPL", "Other liquids", "Refinery processing gain",
+            "Total petroleum and other liquids", "Crude oil, NGPL, and other liquids",
+            "Biofuels", "Condensate", "Synthetic crude", "Shale oil"]
+GRADES = [("HSW", "Heavy Sweet"), ("LSW", "Light Sweet"), ("HSO", "Heavy Sour"), ("LSO", "Light Sour"),
+          ("MED", "Medium"), ("XHS", "Extra Heavy Sour"), ("XLS", "Extra Light Sweet"),
+          ("CON", "Condensate"), ("BIT", "Bitumen"), ("SYN", "Synthetic")]
+IMPORT_DENSITY = 0.145  # share of (origin, grade, month) cells with a shipment
+END = pd.Timestamp("2025-06-01")
+
+
+def _names(prefix, n):
+    return [f"{prefix}{i:03d}" for i in range(n)]
+
+
+def production(spec, rng):
+    countries = _names("C", spec["countries"])
+    products = PRODUCTS[:spec["products"]]
+    periods = pd.date_range(end=END, periods=spec["months"], freq="MS")
+    grid = pd.MultiIndex.from_product([periods[::-1], countries, products],
+                                      names=["period", "countryRegionId", "productName"]).to_frame(index=False)
+    base = rng.lognormal(4, 1.5, size=(spec["countries"], spec["products"]))
+    noise = rng.normal(1, 0.05, len(grid))
+    c = grid["countryRegionId"].str[1:].astype(int).to_numpy()
+    p = pd.Index(products).get_indexer(grid["productName"])
+    grid["value"] = base[c, p] * noise
+    grid.loc[rng.random(len(grid)) < 0.02, "value"] = np.nan  # missing values, as in the EIA data
+    return pd.DataFrame({
+        "period": grid["period"].dt.strftime("%Y-%m-%d"),
+        "productName": grid["productName"],
+        "activityId": 1,
+        "activityName": "Production",
+        "countryRegionId": grid["countryRegionId"],
+        "countryRegionName": "Country " + grid["countryRegionId"],
+        "value": grid["value"],
+        "unit": "TBPD",
+    })
+
+
+def prices(spec, rng):
+    days = pd.bdate_range(end=END, periods=PRICE_DAYS)
+    ticks = spec["ticks_per_day"]
+    offsets = pd.to_timedelta(np.arange(ticks) * (8 * 3600 // ticks), unit="s") + pd.Timedelta(hours=9)
+    periods = (days.values[:, None] + offsets.values[None, :]).ravel() if ticks > 1 else days.values
+    fmt = "%Y-%m-%d %H:%M:%S" if ticks > 1 else "%Y-%m-%d"
+    # Both series follow one mean-reverting log price, Brent at a small premium
+    log_price, level = np.empty(len(periods)), np.log(55.0)
+    shocks = rng.normal(0, 0.02 / np.sqrt(ticks), len(periods))
+    for i, shock in enumerate(shocks):
+        level += 0.001 / ticks * (np.log(60.0) - level) + shock
+        log_price[i] = level
+    frames = []
+    for product, name, desc, premium in [
+            ("EPCBRENT", "UK Brent Crude Oil", "Europe Brent Spot Price FOB (Dollars per Barrel)", 1.06),
+            ("EPCWTI", "WTI Crude Oil", "Cushing, OK WTI Spot Price FOB (Dollars per Barrel)", 1.0)]:
+        walk = premium * np.exp(log_price + rng.normal(0, 0.005, len(periods)))
+        frames.append(pd.DataFrame({
+            "period": pd.DatetimeIndex(periods).strftime(fmt),
+            "product": product,
+            "product-name": name,
+            "process-name": "Spot Price FOB",
+            "series-description": desc,
+            "value": walk.round(2),
+            "units": "$/BBL",
+        }))
+    return pd.concat(frames).sort_values(["period", "product"], ascending=[False, True], kind="stable")
+
+
+def us_imports(spec, rng):
+    origins = _names("Origin ", spec["origins"])
+    grades = GRADES[:spec["grades"]]
+    periods = pd.date_range(end=END, periods=spec["import_months"], freq="MS")
+    n = spec["origins"] * spec["grades"] * spec["import_months"]
+    cells = np.flatnonzero(rng.random(n) < IMPORT_DENSITY)
+    m, rest = np.divmod(cells, spec["origins"] * spec["grades"])
+    o, g = np.divmod(rest, spec["grades"])
+    return pd.DataFrame({
+        "period": periods[m].strftime("%Y-%m-%d"),
+        "originName": np.array(origins)[o],
+        "destinationId": "US",
+        "gradeId": np.array([c for c, _ in grades])[g],
+        "gradeName": np.array([n for _, n in grades])[g],
+        "quantity": rng.lognormal(7, 1.3, len(cells)).round(),
+        "quantity-units": "thousand barrels",
+    })
+
+
+def generate(scale, out_dir, seed=0):
+    """Write the three datasets for `scale` into out_dir/data; return their paths."""
+    spec = SCALES[scale]
+    rng = np.random.default_rng(seed)
+    data_dir = os.path.join(out_dir, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    paths = {}
+    for name, build in [("production", production), ("prices", prices), ("us_crude_imports", us_imports)]:
+        path = os.path.join(data_dir, f"{name}.csv")
+        if not os.path.exists(path):
+            build(spec, rng).to_csv(path, index=False)
+        paths[name] = path
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, choices=sorted(SCALES), default=1)
+    parser.add_argument("--out", default=None, help="output root (default benchmarks/.data/<scale>x)")
+    args = parser.parse_args()
+    out = args.out or os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data", f"{args.scale}x")
+    for name, path in generate(args.scale, out).items():
+        print(f"{name}: {path}")
@@ -0,0 +1,322 @@
+# data_cache.py
+"""Process-wide cache for the datasets loaded from data/.
+
+Every Streamlit rerun (and every session) calls the loaders in utils.py.
+Parsed frames are kept here, keyed on the source file path, its mtime/size
+and the loader arguments, so a rerun only pays the parse cost again after a
+fetcher rewrites the file. Cached frames are shared between sessions and
+must be treated as read-only: with Copy-on-Write enabled any in-place edit
+made by a caller only touches its own copy.
+
+Source paths are resolved through the snapshot manifest (see snapshots.py),
+pinned for the whole call, so publishing a new version of one dataset only
+invalidates the entries reading it. Concurrent misses on the same key are
+single-flighted: one caller loads, the others wait for its result.
+"""
+import hashlib
+import inspect
+import os
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+
+import pandas as pd
+
+from dataset_registry import digest, registry
+from snapshots import snapshots
+
+# Copy-on-Write is always on from pandas 3.0, opt in on older versions so
+# shared frames cannot be modified through a caller's reference.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+MAX_BYTES = int(os.getenv("OIL_DASH_CACHE_MB", "512")) * 1024 * 1024
+# Part of every shared (registry) version next to the loader's source hash;
+# bump when code outside the loader's module changes the frames it returns.
+SCHEMA_VERSION = 1
+
+
+# --- Size estimate ---
+def _nbytes(obj):
+    """Approximate in-memory size of a loader result."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, (tuple, list)):
+        return sum(_nbytes(o) for o in obj)
+    if isinstance(obj, dict):
+        return sum(_nbytes(o) for o in obj.values())
+    return sys.getsizeof(obj)
+
+
+def _freeze(obj):
+    """Turn list arguments (e.g. column lists) into hashable tuples."""
+    if isinstance(obj, (list, tuple)):
+        return tuple(_freeze(o) for o in obj)
+    if isinstance(obj, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in obj.items()))
+    return obj
+
+
+# --- File signature ---
+def file_signature(path):
+    """
+    Return (abs path, mtime_ns, size) for a file; mtime/size are None if it
+    is missing. For a directory (e.g. a Parquet dataset) the newest mtime
+    and the total size of the files below it are used.
+    """
+    path = os.path.abspath(path)
+    if os.path.isdir(path):
+        mtime, size = 0, 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                st = os.stat(os.path.join(root, name))
+                mtime, size = max(mtime, st.st_mtime_ns), size + st.st_size
+        return (path, mtime, size)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return (path, None, None)
+    return (path, st.st_mtime_ns, st.st_size)
+
+
+class DatasetCache:
+    """Thread-safe LRU cache with a memory cap and hit/miss counters."""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, nbytes)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key][0]
+            self.misses += 1
+            return False, None
+
+    def peek(self, key):
+        """get() without touching the counters (re-check after waiting on a load)."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return True, self._entries[key][0]
+            return False, None
+
+    def put(self, key, value):
+        size = _nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            # Entries for an older version of the same source are stale now
+            stale = [k for k in self._entries if k[0] == key[0] and k[2] == key[2] and k[1] != key[1]]
+            for k in stale:
+                self.current_bytes -= self._entries.pop(k)[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# Shared by every session of this process
+dataset_cache = DatasetCache()
+
+# --- Single flight ---
+# key -> [lock, number of callers using it]
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+@contextmanager
+def single_flight(key):
+    """Serialize callers loading the same key; the lock is dropped with its last user."""
+    with _flights_lock:
+        flight = _flights.setdefault(key, [threading.Lock(), 0])
+        flight[1] += 1
+    try:
+        with flight[0]:
+            yield
+    finally:
+        with _flights_lock:
+            flight[1] -= 1
+            if flight[1] == 0:
+                _flights.pop(key, None)
+
+
+def loader_version(func):
+    """SCHEMA_VERSION plus a hash of the source of the module defining func."""
+    try:
+        with open(inspect.getsourcefile(func), "rb") as f:
+            code = hashlib.sha1(f.read()).hexdigest()[:16]
+    except (OSError, TypeError):  # no source file: fall back to the bytecode
+        code = hashlib.sha1(func.__code__.co_code).hexdigest()[:16]
+    return f"{SCHEMA_VERSION}-{code}"
+
+
+def cached_dataset(sources=None, shared=False):
+    """
+    Decorator caching a loader's result in `dataset_cache`.
+
+    sources: list of file paths the loader reads, or a callable returning
+    that list from the call arguments. When omitted, the first positional
+    argument of the call is taken as the path.
+    shared: on a miss, attach the frames from the cross-process
+    dataset_registry (publishing them there if no process has yet). The
+    registry version covers the source files and loader_version(func), so
+    frames built by older loader code are not attached after an upgrade.
+
+    The loader runs with the snapshot manifest pinned, so the paths it
+    resolves are the ones the key was computed from. The result carries
+    the key's digest as its data version (see version_of).
+    """
+    def decorator(func):
+        code_version = loader_version(func) if shared else None
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with snapshots.pinned():
+                return _load(args, kwargs)
+
+        def _load(args, kwargs):
+            if callable(sources):
+                paths = sources(*args, **kwargs)
+            elif sources is not None:
+                paths = sources
+            else:
+                paths = [kwargs.get("path", args[0] if args else None)]
+            sigs = [file_signature(snapshots.resolve(p)) for p in paths]
+            # key: (loader, source versions, (source paths, arguments)); the
+            # version part holds the resolved path, which names the snapshot
+            key = (
+                func.__qualname__,
+                tuple(sigs),
+                (tuple(os.path.abspath(p) for p in paths), _freeze(args), _freeze(sorted(kwargs.items()))),
+            )
+            found, value = dataset_cache.get(key)
+            if found:
+                return value
+            with single_flight(key):
+                found, value = dataset_cache.peek(key)
+                if found:
+                    return value
+                if shared and registry is not None:
+                    name = f"{func.__qualname__}-{digest(key[2])}"
+                    value = registry.get_or_publish(name, digest((code_version, key[1])), lambda: func(*args, **kwargs))
+                else:
+                    value = func(*args, **kwargs)
+                tag_version(value, digest(key))
+                dataset_cache.put(key, value)
+            return value
+        return wrapper
+    return decorator
+
+
+# --- Per-frame memo ---
+# Structures derived from a shared frame (period index, resolution pyramid,
+# ...) are built once per frame object: (id, name) -> (weakref, value).
+# Entries go away with the frame, so a new data version starts fresh.
+_frame_memo = {}
+
+
+def frame_memo(df, name, build):
+    """Return build(df), computed once per live frame object and name."""
+    key = (id(df), name)
+    entry = _frame_memo.get(key)
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    value = build(df)
+    derive_version(df, value, name)
+    _frame_memo[key] = (weakref.ref(df), value)
+    weakref.finalize(df, _frame_memo.pop, key, None)
+    return value
+
+
+# --- Data versions ---
+# A loader result carries the digest of its cache key (source signatures and
+# arguments) as its version; what is derived from it through frame_memo,
+# slice_period or a `derived` method carries (parent version, step). Equal
+# versions mean equal contents, so figure_cache keys charts on them instead
+# of hashing the frames: id -> (weakref, version).
+_versions = {}
+
+
+def _set_version(obj, version):
+    entry = _versions.get(id(obj))
+    if entry is not None and entry[0]() is obj:
+        if entry[1] == version:
+            return
+    else:
+        weakref.finalize(obj, _versions.pop, id(obj), None)
+    _versions[id(obj)] = (weakref.ref(obj), version)
+
+
+def tag_version(value, version, keep=None):
+    """Attach version to value (to each element of a tuple, list or dict), never to `keep`."""
+    if value is keep:
+        return
+    if isinstance(value, (tuple, list)):
+        for i, v in enumerate(value):
+            tag_version(v, (version, i), keep)
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            tag_version(v, (version, k), keep)
+    else:
+        try:
+            _set_version(value, version)
+        except TypeError:  # not weak-referenceable (ints, strings, ...)
+            pass
+
+
+def version_of(obj):
+    """Data version of a loader result or of what was derived from one, else None."""
+    entry = _versions.get(id(obj))
+    if entry is not None and entry[0]() is obj:
+        return entry[1]
+    return None
+
+
+def derive_version(parent, value, *step):
+    """Tag value as derived from parent by step (no-op for an unversioned parent)."""
+    version = version_of(parent)
+    if version is not None:
+        tag_version(value, (version, *step), keep=parent)
+    return value
+
+
+def derived(method):
+    """Method decorator: the result carries (version of self, method name, arguments)."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        value = method(self, *args, **kwargs)
+        return derive_version(self, value, method.__name__, _freeze(args), _freeze(sorted(kwargs.items())))
+    return wrapper
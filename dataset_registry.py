@@ -0,0 +1,195 @@
+# dataset_registry.py
+"""Cross-process registry of loaded datasets as memory-mapped Arrow files.
+
+Several Streamlit worker processes serve the dashboard. The first process
+to load a dataset version publishes the frames as Arrow IPC files under
+REGISTRY_DIR (/dev/shm when available, so they live in shared memory);
+every other process memory-maps the same file instead of parsing the
+source again. Numeric and datetime columns of the attached frames are
+views on the mapped pages, so the OS keeps one copy per host.
+
+Layout: REGISTRY_DIR/<name>/<version>-<part>.arrow, where name identifies
+the loader and its arguments and version the source file signatures and
+the loader code (data_cache.loader_version).
+Each process holding a version leaves a REGISTRY_DIR/<name>/<version>.refs/<pid>
+marker; versions that are not current and have no live holder are removed.
+Loading a missing version is serialized by a per-version file lock, so
+after a data refresh one worker parses while the others wait and attach.
+"""
+import glob
+import hashlib
+import os
+import shutil
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # no inter-process lock: each worker may load once
+    fcntl = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:  # every process loads its own copy
+    pa = None
+
+_SHM = "/dev/shm"
+REGISTRY_DIR = os.getenv("OIL_DASH_REGISTRY_DIR") or (
+    os.path.join(_SHM, "oil_dashboard") if os.path.isdir(_SHM) else os.path.join("data", ".registry"))
+
+
+def digest(obj):
+    """Short stable hash of a (repr-able) key."""
+    return hashlib.sha1(repr(obj).encode()).hexdigest()[:16]
+
+
+def shareable(value):
+    """True for a frame or a tuple/list of frames."""
+    if isinstance(value, pd.DataFrame):
+        return True
+    return isinstance(value, (tuple, list)) and len(value) > 0 and all(
+        isinstance(v, pd.DataFrame) for v in value)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class DatasetRegistry:
+    """Publish / attach frames by (name, version) in a shared directory."""
+
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = root
+
+    @property
+    def pid(self):
+        return os.getpid()  # workers may be forked after import
+
+    def _dir(self, name):
+        return os.path.join(self.root, name)
+
+    def _parts(self, name, version):
+        return sorted(glob.glob(os.path.join(self._dir(name), f"{version}-*.arrow")),
+                      key=lambda p: int(p.rsplit("-", 1)[1].split(".")[0]))
+
+    # --- Publish / attach ---
+    def publish(self, name, version, value):
+        """Write value's frames for (name, version); the first writer wins."""
+        frames = [value] if isinstance(value, pd.DataFrame) else list(value)
+        folder = self._dir(name)
+        os.makedirs(folder, exist_ok=True)
+        manifest = os.path.join(folder, f"{version}.parts")
+        if os.path.exists(manifest):
+            return
+        for i, frame in enumerate(frames):
+            path = os.path.join(folder, f"{version}-{i}.arrow")
+            tmp = f"{path}.tmp-{self.pid}"
+            table = pa.Table.from_pandas(frame)
+            with pa.OSFile(tmp, "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, path)
+        # Written last: readers only attach complete versions
+        tmp = f"{manifest}.tmp-{self.pid}"
+        with open(tmp, "w") as f:
+            f.write("tuple" if not isinstance(value, pd.DataFrame) else "frame")
+        os.replace(tmp, manifest)
+
+    def attach(self, name, version):
+        """Memory-map a published version; None if it is not there."""
+        manifest = os.path.join(self._dir(name), f"{version}.parts")
+        try:
+            with open(manifest) as f:
+                kind = f.read()
+        except FileNotFoundError:
+            return None
+        frames = []
+        try:
+            for path in self._parts(name, version):
+                with pa.memory_map(path) as source:
+                    table = ipc.open_file(source).read_all()
+                # split_blocks keeps numeric / datetime columns as views on the map
+                frames.append(table.to_pandas(split_blocks=True))
+        except (OSError, pa.ArrowInvalid):  # collected meanwhile, load again
+            return None
+        return frames[0] if kind == "frame" else tuple(frames)
+
+    # --- Reference counting ---
+    def acquire(self, name, version):
+        """Mark this process as a holder of version and release older ones."""
+        refs = os.path.join(self._dir(name), f"{version}.refs")
+        os.makedirs(refs, exist_ok=True)
+        open(os.path.join(refs, str(self.pid)), "a").close()
+        for other in glob.glob(os.path.join(self._dir(name), "*.refs")):
+            if other != refs:
+                try:
+                    os.remove(os.path.join(other, str(self.pid)))
+                except FileNotFoundError:
+                    pass
+        self.collect(name, keep=version)
+
+    def holders(self, name, version):
+        """Live pids holding version (markers of dead processes are removed)."""
+        refs = os.path.join(self._dir(name), f"{version}.refs")
+        live = []
+        for marker in glob.glob(os.path.join(refs, "*")):
+            pid = int(os.path.basename(marker))
+            if _pid_alive(pid):
+                live.append(pid)
+            else:
+                try:
+                    os.remove(marker)
+                except FileNotFoundError:
+                    pass
+        return live
+
+    def collect(self, name, keep=None):
+        """Remove versions of name other than keep that no live process holds."""
+        folder = self._dir(name)
+        for manifest in glob.glob(os.path.join(folder, "*.parts")):
+            version = os.path.basename(manifest)[:-len(".parts")]
+            if version == keep or self.holders(name, version):
+                continue
+            # Mapped files stay readable for processes that still have them open
+            for path in self._parts(name, version) + [manifest, os.path.join(folder, f"{version}.lock")]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            shutil.rmtree(os.path.join(folder, f"{version}.refs"), ignore_errors=True)
+
+    @contextmanager
+    def _loading(self, name, version):
+        """Exclusive lock held by the one process loading (name, version)."""
+        os.makedirs(self._dir(name), exist_ok=True)
+        with open(os.path.join(self._dir(name), f"{version}.lock"), "w") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def get_or_publish(self, name, version, load):
+        """Attach (name, version), or load, publish and attach it."""
+        value = self.attach(name, version)
+        if value is None:
+            with self._loading(name, version):
+                value = self.attach(name, version)  # published while waiting
+                if value is None:
+                    loaded = load()
+                    if not shareable(loaded):
+                        return loaded
+                    self.publish(name, version, loaded)
+                    value = self.attach(name, version)
+                    if value is None:
+                        return loaded
+        self.acquire(name, version)
+        return value
+
+
+registry = DatasetRegistry() if pa is not None else None
@@ -0,0 +1,83 @@
+# downsample.py
+"""Point-budget downsampling for long chart traces.
+
+Both methods return sorted indices into the original series, so the same
+selection can be applied to every trace of a chart (price + MAs, returns
++ volatility band) and hover values stay aligned.
+
+- "minmax": first/last point plus the min and max of each bucket; fully
+  vectorized, keeps every spike.
+- "lttb": Largest-Triangle-Three-Buckets; picks per bucket the point
+  forming the largest triangle with its neighbours, best visual shape.
+"""
+import numpy as np
+
+POINT_BUDGET = 1500  # points per trace sent to the browser
+# Above this many drawn points per trace use Scattergl. Kept below the budget:
+# traces are cut to POINT_BUDGET first, so long (downsampled) series and
+# multi-year daily windows render with WebGL, a year or less with SVG.
+WEBGL_THRESHOLD = 1000
+
+
+def _as_float(values):
+    """Numeric array (datetimes as int64 ns) with NaNs left in place."""
+    arr = np.asarray(values)
+    if np.issubdtype(arr.dtype, np.datetime64):
+        return arr.astype("datetime64[ns]").astype("int64").astype("float64")
+    return arr.astype("float64")
+
+
+def minmax_indices(y, budget):
+    """Indices of the min and max of each of budget // 2 equal buckets."""
+    y = _as_float(y)
+    n = len(y)
+    if n <= budget or budget < 4:
+        return np.arange(n)
+    buckets = (budget - 2) // 2
+    size = -(-n // buckets)
+    pad = buckets * size - n
+    blocks = np.concatenate((y, np.full(pad, np.nan))).reshape(buckets, size)
+    lo = np.where(np.isnan(blocks), np.inf, blocks).argmin(axis=1)
+    hi = np.where(np.isnan(blocks), -np.inf, blocks).argmax(axis=1)
+    offsets = np.arange(buckets) * size
+    idx = np.concatenate(([0, n - 1], offsets + lo, offsets + hi))
+    return np.unique(idx[idx < n])
+
+
+def lttb_indices(x, y, budget):
+    """Largest-Triangle-Three-Buckets selection of `budget` points."""
+    x, y = _as_float(x), _as_float(y)
+    n = len(y)
+    if n <= budget or budget < 3:
+        return np.arange(n)
+    y = np.where(np.isnan(y), np.nanmean(y) if not np.isnan(y).all() else 0.0, y)
+    edges = np.linspace(1, n - 1, budget - 1).astype(int)
+    out = np.empty(budget, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(budget - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        nxt_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:nxt_end].mean() if nxt_end > end else x[-1]
+        avg_y = y[end:nxt_end].mean() if nxt_end > end else y[-1]
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x) * (by - y[a]) - (x[a] - bx) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def downsample_indices(x, y, budget=POINT_BUDGET, method="minmax"):
+    """Indices to keep so the trace fits `budget` points."""
+    if budget is None or len(y) <= budget:
+        return np.arange(len(y))
+    if method == "lttb":
+        return lttb_indices(x, y, budget)
+    return minmax_indices(y, budget)
+
+
+def scatter_class(n_points):
+    """go.Scatter for short traces, go.Scattergl (WebGL) for long ones (n_points = points drawn)."""
+    import plotly.graph_objects as go
+    return go.Scattergl if n_points > WEBGL_THRESHOLD else go.Scatter
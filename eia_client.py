@@ -0,0 +1,224 @@
+# eia_client.py
+"""Shared HTTP engine for the EIA fetchers.
+
+One pooled keep-alive session, a bounded worker pool, a token-bucket rate
+limiter and exponential backoff on 429/5xx. `fetch_all` reads the first page
+of a query, takes the total row count from it and fetches the remaining
+pages in parallel; `fetch_many` does that for many queries at once. The
+`iter_*` variants yield pages as they arrive for streaming consumers.
+
+Responses go through the on-disk cache of http_cache.py (fresh entries
+are served without a request, stale ones are revalidated); set
+EIA_HTTP_CACHE=replay to run entirely from recorded responses.
+
+Point EIA_API_ROOT at a local stand-in (see eia_stub.py) to run the
+fetchers without the real API.
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_cache import CacheMiss, ResponseCache
+
+API_ROOT = os.getenv("EIA_API_ROOT", "https://api.eia.gov/v2").rstrip("/")
+
+MAX_WORKERS = 8
+RATE_PER_SEC = 5.0  # sustained requests per second
+BURST = 5
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5  # seconds, doubled on each retry
+TIMEOUT = 30
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Blocking token-bucket limiter shared by all worker threads."""
+
+    def __init__(self, rate=RATE_PER_SEC, capacity=BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class EIAClient:
+    """Concurrent, rate-limited client for paginated EIA v2 data queries."""
+
+    def __init__(self, max_workers=MAX_WORKERS, rate=RATE_PER_SEC, burst=BURST,
+                 max_retries=MAX_RETRIES, backoff=BACKOFF_BASE, timeout=TIMEOUT, cache=None):
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.limiter = TokenBucket(rate, burst)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.cache = cache  # ResponseCache or None
+        self.requests_made = 0
+        self.cache_hits = 0
+        self.not_modified = 0
+
+    # --- Single request ---
+    def get_json(self, url, params):
+        """GET through the response cache, with rate limiting and backoff on errors."""
+        entry = self.cache.lookup(url, params) if self.cache is not None else None
+        if entry is not None and (self.cache.mode == "replay" or (self.cache.mode == "on" and entry.fresh)):
+            self.cache_hits += 1
+            return entry.json()
+        if self.cache is not None and self.cache.mode == "replay":
+            raise CacheMiss(f"no recorded response for {url} {params}")
+
+        headers = entry.conditional_headers() if entry is not None else {}
+        response = self._get(url, params, headers)
+        if response.status_code == 304:
+            data = self._not_modified(entry)
+            if data is not None:
+                return data
+            # Nothing cached to answer with (evicted since the lookup): ask again unconditionally
+            response = self._get(url, params, {})
+            if response.status_code == 304:
+                raise requests.HTTPError(f"304 Not Modified without a cached response for {url}",
+                                         response=response)
+        response.raise_for_status()
+        data = response.json()
+        if self.cache is not None:
+            self.cache.store(url, params, response.content, response.headers)
+        return data
+
+    def _not_modified(self, entry):
+        """Body of the revalidated entry, or None if there is none (left) on disk."""
+        if entry is None:
+            return None
+        try:
+            data = entry.json()
+        except (OSError, ValueError):
+            return None
+        self.not_modified += 1
+        self.cache.revalidated(entry)
+        return data
+
+    def _get(self, url, params, headers):
+        """GET with rate limiting and exponential backoff on 429/5xx/connection errors."""
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            self.requests_made += 1
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._delay(attempt))
+                continue
+            if response.status_code in RETRY_STATUS and attempt < self.max_retries:
+                retry_after = response.headers.get("Retry-After")
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else self._delay(attempt)
+                time.sleep(delay)
+                continue
+            return response
+
+    def _delay(self, attempt):
+        return self.backoff * (2 ** attempt) * (1 + random.random() / 2)
+
+    # --- Paginated queries ---
+    def _page(self, url, params, offset, length):
+        page_params = dict(params, offset=offset, length=length)
+        return self.get_json(url, page_params)["response"]
+
+    @staticmethod
+    def _next_offsets(response, offset, length):
+        """Offsets still to fetch after receiving the page at `offset`."""
+        if len(response["data"]) < length:
+            return []
+        if response.get("total") is None:
+            # No row count reported: walk the pages one by one
+            return [offset + length]
+        if offset == 0:
+            return list(range(length, int(response["total"]), length))
+        return []
+
+    def iter_many(self, queries, length):
+        """
+        Yield (key, offset, rows) for every page of several queries as pages arrive.
+
+        queries: {key: (url, params)}
+        At most 2 * max_workers pages are in flight, so a slow consumer
+        (e.g. a streaming writer) bounds memory instead of buffering the
+        whole result.
+        """
+        pending = deque((key, 0) for key in queries)
+        limit = 2 * self.max_workers
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {}
+
+            def submit():
+                while pending and len(futures) < limit:
+                    key, offset = pending.popleft()
+                    url, params = queries[key]
+                    futures[pool.submit(self._page, url, params, offset, length)] = (key, offset)
+
+            submit()
+            while futures:
+                done = next(as_completed(futures))
+                key, offset = futures.pop(done)
+                response = done.result()
+                # Once the first page reports the total, the rest of the query fans out
+                pending.extendleft((key, o) for o in reversed(self._next_offsets(response, offset, length)))
+                submit()
+                yield key, offset, response["data"]
+
+    def iter_pages(self, url, params, length):
+        """Yield the pages of one query in offset order, fetched in parallel."""
+        buffered, next_offset = {}, 0
+        for _, offset, rows in self.iter_many({None: (url, params)}, length):
+            buffered[offset] = rows
+            while next_offset in buffered:
+                yield buffered.pop(next_offset)
+                next_offset += length
+
+    def fetch_all(self, url, params, length):
+        """Fetch every page of one query and return the rows in order."""
+        return [row for rows in self.iter_pages(url, params, length) for row in rows]
+
+    def fetch_many(self, queries, length):
+        """
+        Fetch several paginated queries concurrently.
+
+        queries: {key: (url, params)}
+        Returns {key: rows}, rows in page order for each query.
+        """
+        pages = {key: {} for key in queries}
+        for key, offset, rows in self.iter_many(queries, length):
+            pages[key][offset] = rows
+        return {key: [row for offset in sorted(p) for row in p[offset]] for key, p in pages.items()}
+
+
+_default_client = None
+
+
+def default_client():
+    """Client shared by the fetchers of this process."""
+    global _default_client
+    if _default_client is None:
+        _default_client = EIAClient(cache=ResponseCache.from_env())
+    return _default_client
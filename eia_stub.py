@@ -0,0 +1,126 @@
+# eia_stub.py
+"""Local stand-in for the EIA v2 API, served from the CSVs in data/.
+
+Mimics the two routes the fetchers use:
+    /v2/international/data/      (production, consumption, stocks)
+    /v2/petroleum/pri/spt/data/  (spot prices)
+with facet filters, start/end, sort direction, offset/length pagination and
+the `total` row count. `fail_rate` makes a share of requests answer 429 to
+exercise the client's retry path.
+
+Usage:
+    python eia_stub.py --port 8000
+    EIA_API_ROOT=http://127.0.0.1:8000/v2 python fetch_activity.py
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+DATA_DIR = "data"
+ROUTES = {
+    "/v2/international/data/": ["production.csv", "consumption.csv", "stocks.csv"],
+    "/v2/petroleum/pri/spt/data/": ["prices.csv"],
+}
+FACET_RE = re.compile(r"facets\[(.+?)\]\[\d+\]")
+# Series id of the crude products in prices.csv files written without a series column
+SPOT_SERIES = {"EPCBRENT": "RBRTE", "EPCWTI": "RWTC"}
+
+
+def load_route_data(data_dir=DATA_DIR):
+    """Raw rows per route, with `period` kept as the API's string format."""
+    frames = {}
+    for route, files in ROUTES.items():
+        parts = [pd.read_csv(os.path.join(data_dir, f), dtype=str) for f in files
+                 if os.path.exists(os.path.join(data_dir, f))]
+        df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+        if route.startswith("/v2/international") and not df.empty:
+            df["period"] = df["period"].str[:7]  # monthly data is served as YYYY-MM
+        if route.startswith("/v2/petroleum") and not df.empty:
+            series = df["series"] if "series" in df.columns else pd.Series(None, index=df.index, dtype=object)
+            df["series"] = series.fillna(df["product"].map(SPOT_SERIES))
+        frames[route] = df
+    return frames
+
+
+def query(df, params):
+    """Apply EIA-style facets, date range, sort and pagination to df."""
+    facets = {}
+    for key, values in params.items():
+        m = FACET_RE.fullmatch(key)
+        if m:
+            facets.setdefault(m.group(1), []).extend(values)
+    for column, values in facets.items():
+        df = df[df[column].isin(values)] if column in df.columns else df.iloc[0:0]
+    if params.get("start"):
+        df = df[df["period"] >= params["start"][0]]
+    if params.get("end"):
+        df = df[df["period"] <= params["end"][0]]
+    sort_cols, ascending = [], []
+    i = 0
+    while f"sort[{i}][column]" in params:
+        sort_cols.append(params[f"sort[{i}][column]"][0])
+        ascending.append(params.get(f"sort[{i}][direction]", ["asc"])[0] != "desc")
+        i += 1
+    if sort_cols:
+        df = df.sort_values(sort_cols, ascending=ascending, kind="stable")
+    offset = int(params.get("offset", ["0"])[0])
+    length = int(params.get("length", ["5000"])[0])
+    page = df.iloc[offset:offset + length]
+    return {"response": {"total": str(len(df)), "data": page.where(page.notna(), None).to_dict("records")}}
+
+
+def make_handler(frames, fail_rate=0.0):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path not in frames:
+                self.send_error(404)
+                return
+            if fail_rate and random.random() < fail_rate:
+                self.send_response(429)
+                self.send_header("Retry-After", "0")
+                self.end_headers()
+                return
+            body = json.dumps(query(frames[url.path], parse_qs(url.query))).encode()
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(port=0, data_dir=DATA_DIR, fail_rate=0.0):
+    """Start the stub in a background thread; returns (server, api_root)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(load_route_data(data_dir), fail_rate))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v2"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve data/*.csv as a local EIA API stand-in.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    server, root = serve(args.port, fail_rate=args.fail_rate)
+    print(f"EIA stub listening on {root}")
+    threading.Event().wait()
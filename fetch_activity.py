@@ -1,11 +1,19 @@
 ''' Retrieve data from EIA and save to CSV'''
 
 # fetch_data.py
+import argparse
 import os
-import requests
 import pandas as pd
 from dotenv import load_dotenv
 from datetime import datetime
+from contextlib import ExitStack
+from storage import write_parquet_from_csv
+from stream_writer import AtomicCSVWriter, print_peak_rss
+import activity_store
+import fetch_planner
+from kpi_index import kpi_path, update_index
+from eia_client import API_ROOT, default_client
+from snapshots import snapshots
 
 load_dotenv()
 EIA_API_KEY = os.getenv("EIA_API_KEY")
@@ -68,44 +76,33 @@ ACTIVITIES = {
     "Stocks": "5"
 }
 
-URL = "https://api.eia.gov/v2/international/data/"
+URL = f"{API_ROOT}/international/data/"
 START_DATE = "2020-01"
 LENGTH = 5000  # max rows per call
-
-def fetch_activity(activity_name: str, activity_id: str) -> pd.DataFrame:
-    """Fetch data for a single activity across all countries with pagination."""
-    all_data = []
-
-    for country_id in COUNTRY_IDS:
-        offset = 0
-        while True:
-            params = {
-                "api_key": EIA_API_KEY,
-                "frequency": "monthly",
-                "data[0]": "value",
-                "sort[0][column]": "period",
-                "sort[0][direction]": "desc",
-                "offset": offset,
-                "length": LENGTH,
-                "facets[countryRegionId][0]": country_id,
-                "facets[activityId][0]": activity_id,
-                "start": START_DATE,
-                "end": None
-            }
-
-            response = requests.get(URL, params=params)
-            response.raise_for_status()
-            data = response.json()["response"]["data"]
-
-            if not data:
-                break
-
-            all_data.extend(data)
-            if len(data) < LENGTH:
-                break
-            offset += LENGTH
-
-    # Convert to DataFrame
+REVISION_MONTHS = 3  # incremental mode: re-request this many stored months (EIA revisions)
+
+def batch_params(country_ids: list, activity_ids: list, start: str = START_DATE, end: str = None) -> dict:
+    """Query parameters for a facet list of countries and activities from `start` to `end` (None = latest)."""
+    params = {
+        "api_key": EIA_API_KEY,
+        "frequency": "monthly",
+        "data[0]": "value",
+        "sort[0][column]": "period",
+        "sort[0][direction]": "desc",
+        "start": start,
+        "end": end
+    }
+    for i, country_id in enumerate(country_ids):
+        params[f"facets[countryRegionId][{i}]"] = country_id
+    for i, activity_id in enumerate(activity_ids):
+        params[f"facets[activityId][{i}]"] = activity_id
+    return params
+
+def activity_csv_path(activity_name: str) -> str:
+    return os.path.join(DATA_DIR, f"{activity_name.lower()}.csv")
+
+def clean_activity(all_data: list) -> pd.DataFrame:
+    """Convert raw API rows to a typed DataFrame without the unused columns."""
     df = pd.DataFrame(all_data)
     if not df.empty:
         df["value"] = pd.to_numeric(df["value"], errors="coerce")
@@ -117,15 +114,128 @@ def fetch_activity(activity_name: str, activity_id: str) -> pd.DataFrame:
             "countryRegionTypeName", "dataFlagId", "dataFlagDescription", "unitName"
         ]
         df.drop(columns=[c for c in drop_cols if c in df.columns], inplace=True)
-
-    # Save CSV using readable activity name
-    csv_path = os.path.join(DATA_DIR, f"{activity_name.lower()}.csv")
-    df.to_csv(csv_path, index=False)
-    print(f"{activity_name} data saved to {csv_path}, total rows: {len(df)}")
-
     return df
 
-if __name__ == "__main__":
-    for name, aid in ACTIVITIES.items():
-        fetch_activity(name, aid)
+def save_parquet(activity_name: str) -> None:
+    """Typed, partitioned copy of the activity CSV for the dashboard loaders."""
+    pq_path = write_parquet_from_csv(activity_csv_path(activity_name))
+    if pq_path:
+        print(f"{activity_name} data saved to {pq_path}")
+
+def save_kpi_index(activity_name: str) -> None:
+    """Latest two observations per product and country for the landing page KPIs."""
+    update_index(activity_csv_path(activity_name))
+    print(f"{activity_name} KPI index saved to {kpi_path(activity_csv_path(activity_name))}")
+
+def incremental_starts(activity_id: str, lookback_months: int = REVISION_MONTHS) -> dict:
+    """
+    Start period per country for an incremental refresh: the oldest of the
+    latest stored periods across the country's products, minus the revision
+    lookback. Countries missing from the store start at START_DATE.
+    """
+    latest = {}
+    for (country, _), period in activity_store.latest_periods(activity_id).items():
+        latest[country] = min(period, latest.get(country, period))
+    starts = {}
+    for country_id in COUNTRY_IDS:
+        if country_id in latest:
+            start = latest[country_id] - pd.DateOffset(months=lookback_months)
+            starts[country_id] = max(start.strftime("%Y-%m"), START_DATE)
+        else:
+            starts[country_id] = START_DATE
+    return starts
+
+def fetch_activities(activities: dict = ACTIVITIES, incremental: bool = False,
+                     lookback_months: int = REVISION_MONTHS) -> dict:
+    """
+    Fetch several activities across all countries with batched, paginated queries.
+
+    Countries (and activities sharing a start period) are packed into
+    facet-list queries by fetch_planner using the previous run's row counts,
+    and the combined responses are split back per country and activity.
+
+    incremental: only request periods newer than the local store (minus the
+    revision lookback), upsert them and regenerate the outputs from the store.
+    A full refresh replaces the activity's rows in an existing store.
+
+    Pages are converted and written as they arrive (see stream_writer), so
+    memory does not grow with history length and the CSVs are replaced
+    atomically. Returns {activity_name: rows written}.
+    """
+    starts = {}
+    for name, aid in activities.items():
+        if incremental:
+            activity_store.seed_from_csv(activity_csv_path(name), aid)
+            starts[aid] = incremental_starts(aid, lookback_months)
+        else:
+            starts[aid] = {country_id: START_DATE for country_id in COUNTRY_IDS}
+
+    # Plan facet-list queries from the previous run's row counts
+    keys = [(country_id, aid, starts[aid][country_id])
+            for aid in activities.values() for country_id in COUNTRY_IDS]
+    def plan():
+        rates = {aid: fetch_planner.row_rates(activity_csv_path(name)) for name, aid in activities.items()}
+        return fetch_planner.plan_batches(keys, fetch_planner.estimate_rows(rates, keys), LENGTH)
+
+    # The plan depends on today and the local CSVs: record it with the responses, reuse it in replay
+    client = default_client()
+    plan_name = f"activity-{'-'.join(sorted(activities.values()))}-{'incremental' if incremental else 'full'}"
+    batches = client.cache.plan(plan_name, plan) if client.cache is not None else plan()
+    queries = {i: (URL, batch_params(b["countries"], b["activities"], b["start"], b.get("end")))
+               for i, b in enumerate(batches)}
+    print(f"{len(keys)} country/activity pairs planned into {len(queries)} queries")
+
+    # Stream pages straight to the outputs (full mode) or the store (incremental)
+    rows_written = {name: 0 for name in activities}
+    with ExitStack() as stack:
+        writers = {} if incremental else {
+            aid: stack.enter_context(AtomicCSVWriter(activity_csv_path(name), activity_store.COLUMNS))
+            for name, aid in activities.items()
+        }
+        for _, _, rows in client.iter_many(queries, LENGTH):
+            for (_, aid), key_rows in fetch_planner.split_rows(rows).items():
+                if aid not in starts:
+                    continue
+                df = clean_activity(key_rows)
+                if incremental:
+                    activity_store.upsert(df)
+                else:
+                    writers[aid].write(df)
+        for name, aid in activities.items():
+            if not incremental:
+                rows_written[name] = writers[aid].rows
+
+    for name, aid in activities.items():
+        if incremental:
+            # Regenerate the CSV from the store, chunk by chunk
+            with AtomicCSVWriter(activity_csv_path(name), activity_store.COLUMNS) as out:
+                for chunk in activity_store.iter_activity(aid):
+                    out.write(chunk)
+            rows_written[name] = out.rows
+        elif os.path.exists(activity_store.STORE_PATH) and os.path.exists(activity_csv_path(name)):
+            # Keep the incremental store in step, or the next --incremental run regenerates stale rows
+            activity_store.replace_from_csv(activity_csv_path(name), aid)
+        print(f"{name} data saved to {activity_csv_path(name)}, total rows: {rows_written[name]}")
+        save_parquet(name)
+        save_kpi_index(name)
+    print_peak_rss()
+    return rows_written
+
+def fetch_activity(activity_name: str, activity_id: str, incremental: bool = False,
+                   lookback_months: int = REVISION_MONTHS) -> int:
+    """Fetch data for a single activity across all countries; returns the number of rows written."""
+    return fetch_activities({activity_name: activity_id}, incremental, lookback_months)[activity_name]
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch EIA production, consumption and stocks data.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only fetch periods newer than the local SQLite store")
+    parser.add_argument("--lookback", type=int, default=REVISION_MONTHS,
+                        help="months of stored history to re-request for revisions")
+    args = parser.parse_args()
+    rows_written = fetch_activities(ACTIVITIES, incremental=args.incremental, lookback_months=args.lookback)
+    # Readers resolve a published dataset through its snapshot: publish this refresh too
+    for name, rows in rows_written.items():
+        version = snapshots.publish_if_tracked(name.lower()) if rows else None
+        if version:
+            print(f"Published {name.lower()} snapshot {version}")
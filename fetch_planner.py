@@ -0,0 +1,142 @@
+# fetch_planner.py
+"""Request planner for the EIA international activity queries.
+
+Most country histories are a few hundred rows, far below the page length,
+so one query per country wastes round trips. The planner packs many
+countries (and activities, when they share a start period) into one
+facet-list query sized to fit under the page length, using the row counts
+of the previous run (the CSVs in data/) as estimates. `split_rows` then
+routes the combined response back per (country, activity).
+
+A single key estimated above the capacity on its own is split into
+consecutive date ranges (start/end months) that each fit, so its pages
+are requested in one parallel round instead of first-page-then-fan-out.
+Estimates only drive packing: a batch that turns out larger than planned
+is still fetched completely by the paginated client.
+"""
+import os
+from collections import defaultdict
+
+import pandas as pd
+
+FILL = 0.8  # target share of the page length, leaves room for new periods
+MAX_FACETS = 40  # countries per query, keeps the URL short
+
+
+def row_rates(csv_path):
+    """
+    Rows per period by country from a previous run's output.
+
+    Returns {countryRegionId: rows_per_period}; empty if the file is missing.
+    """
+    if not os.path.exists(csv_path):
+        return {}
+    df = pd.read_csv(csv_path, usecols=["countryRegionId", "period"])
+    stats = df.groupby("countryRegionId")["period"].agg(["size", "nunique"])
+    return (stats["size"] / stats["nunique"]).to_dict()
+
+
+def months_since(start, today=None):
+    """Number of monthly periods from `start` (YYYY-MM) up to today."""
+    today = pd.Timestamp(today) if today is not None else pd.Timestamp.today()
+    start = pd.Timestamp(start)
+    return max((today.year - start.year) * 12 + today.month - start.month + 1, 1)
+
+
+def estimate_rows(rates, keys, today=None):
+    """
+    Expected rows per (country, activity_id) for keys of (country, activity_id, start).
+
+    rates: {activity_id: {country: rows_per_period}}. A country missing from
+    an activity's previous run returned no rows then and is estimated at ~0;
+    activities without a previous run are left out (unknown).
+    """
+    estimates = {}
+    for country, activity_id, start in keys:
+        activity_rates = rates.get(activity_id)
+        if activity_rates:
+            rate = activity_rates.get(country, 0)
+            estimates[(country, activity_id)] = int(rate * months_since(start, today)) + 1
+    return estimates
+
+
+def split_range(start, rows, capacity, today=None):
+    """
+    [(start, end, rows), ...] consecutive date ranges (YYYY-MM, end inclusive,
+    the last one open-ended) of at most `capacity` estimated rows each for
+    one key. A single month above the capacity cannot be split further.
+    """
+    months = months_since(start, today)
+    step = max(months * capacity // rows, 1)
+    if step >= months:
+        return [(start, None, rows)]
+    first = pd.Period(start, freq="M")
+    ranges = []
+    for i in range(0, months, step):
+        span = min(step, months - i)
+        end = str(first + i + span - 1) if i + step < months else None
+        ranges.append((str(first + i), end, -(-rows * span // months)))
+    return ranges
+
+
+def plan_batches(keys, estimates, length, fill=FILL, max_facets=MAX_FACETS, today=None):
+    """
+    Pack (country, activity_id, start) keys into facet-list queries.
+
+    Keys sharing a start period and the same set of activities are packed
+    first-fit decreasing until the estimated rows reach fill * length.
+    Pairs without an estimate get a query of their own; a country whose
+    estimate alone exceeds that is split into date ranges (split_range).
+
+    Returns a list of dicts with 'countries', 'activities', 'start', 'end'
+    (None = up to the latest period) and 'rows'.
+    """
+    capacity = length * fill
+    by_start = defaultdict(lambda: defaultdict(set))
+    for country, activity_id, start in keys:
+        by_start[start][country].add(activity_id)
+
+    batches = []
+    for start, by_country in by_start.items():
+        by_activities = defaultdict(list)
+        for country, activities in by_country.items():
+            by_activities[frozenset(activities)].append(country)
+
+        for activities, countries in by_activities.items():
+            sized = []
+            for country in countries:
+                known = [estimates.get((country, a)) for a in activities]
+                rows = sum(known) if None not in known else None
+                sized.append((rows, country))
+            # Unknown sizes first, then largest first
+            sized.sort(key=lambda x: (x[0] is not None, -(x[0] or 0), x[1]))
+
+            bins = []
+            for rows, country in sized:
+                if rows is not None and rows > capacity:
+                    for part_start, part_end, part_rows in split_range(start, rows, int(capacity), today):
+                        batches.append({"countries": [country], "activities": sorted(activities),
+                                        "start": part_start, "end": part_end, "rows": part_rows})
+                elif rows is not None:
+                    for b in bins:
+                        if b["rows"] is not None and b["rows"] + rows <= capacity \
+                                and len(b["countries"]) < max_facets:
+                            b["countries"].append(country)
+                            b["rows"] += rows
+                            break
+                    else:
+                        bins.append({"countries": [country], "rows": rows})
+                else:
+                    bins.append({"countries": [country], "rows": None})
+            for b in bins:
+                batches.append({"countries": b["countries"], "activities": sorted(activities),
+                                "start": start, "end": None, "rows": b["rows"]})
+    return batches
+
+
+def split_rows(rows):
+    """Group combined response rows by (countryRegionId, activityId)."""
+    out = defaultdict(list)
+    for row in rows:
+        out[(row["countryRegionId"], str(row["activityId"]))].append(row)
+    return out
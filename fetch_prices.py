@@ -1,9 +1,15 @@
 # fetch_prices.py
 import os
-import requests
 import pandas as pd
 from dotenv import load_dotenv
 from datetime import datetime
+from storage import write_parquet_from_csv
+from stream_writer import AtomicCSVWriter, print_peak_rss
+from spot_derived import DERIVED_PATH, update_derived
+from kpi_index import kpi_path, update_index
+from eia_client import API_ROOT, default_client
+from spot_engine import SPOT_SERIES
+from snapshots import snapshots
 
 # Load API key from .env
 load_dotenv()
@@ -15,73 +21,81 @@ os.makedirs(DATA_DIR, exist_ok=True)
 CSV_PATH = os.path.join(DATA_DIR, "prices.csv")
 
 # Parameters
-PRODUCT_NAMES = {
-    "WTI Crude Oil": "RWTC",   # WTI Cushing
-    "UK Brent Crude Oil": "RBRTE"  # Europe Brent
-}
+# Series to fetch: every spot series configured for the dashboard (spot_engine.SPOT_SERIES)
+PRODUCT_NAMES = {cfg["label"]: cfg["series"] for cfg in SPOT_SERIES.values()}
 FREQUENCY = "daily"  # daily prices
 START_DATE = "2015-01-01"  # adjust as needed
 LENGTH = 5000  # max rows per call
 
-EIA_URL = "https://api.eia.gov/v2/petroleum/pri/spt/data/"
+SERIES_NAMES = {series: name for name, series in PRODUCT_NAMES.items()}
 
-def fetch_prices():
-    all_data = []
-    offset = 0
+EIA_URL = f"{API_ROOT}/petroleum/pri/spt/data/"
 
-    while True:
-        params = {
-            "api_key": EIA_API_KEY,
-            "frequency": FREQUENCY,
-            "data[0]": "value",
-            "sort[0][column]": "period",
-            "sort[0][direction]": "desc",
-            "offset": offset,
-            "length": LENGTH,
-        }
+PRICE_COLUMNS = ["period", "product", "product-name", "series", "process-name", "series-description", "value", "units"]
 
-        # Add facets for products
-        for i, p in enumerate(PRODUCT_NAMES):
-            params[f"facets[product][{i}]"] = p
-
-        # Start date
-        params["start"] = START_DATE
-
-        response = requests.get(EIA_URL, params=params)
-        response.raise_for_status()
-        data = response.json()["response"]["data"]
-
-        if not data:
-            break
-
-        for row in data:
-            row["product-name"] = PRODUCT_NAMES.get(row["product"], row["product"])
-        all_data.extend(data)
-
-        if len(data) < LENGTH:
-            break
-        offset += LENGTH
-
-    # Convert to DataFrame
-    df = pd.DataFrame(all_data)
-    if df.empty:
-        print("No data retrieved!")
-        return df
-
-    # Keep relevant columns
-    df = df[["period", "product","product-name","process-name","series-description", "value", "units"]]
+def clean_prices(rows: list) -> pd.DataFrame:
+    """Convert one page of raw API rows to the typed output columns."""
+    for row in rows:
+        row["product-name"] = SERIES_NAMES.get(row.get("series"), row.get("product-name", row["product"]))
+    df = pd.DataFrame(rows).reindex(columns=PRICE_COLUMNS)
 
     # Clean types
     df["period"] = pd.to_datetime(df["period"], errors="coerce")
     df["value"] = pd.to_numeric(df["value"], errors="coerce")
-
-    # Sort by period
-    df = df.sort_values(["period","product"]).reset_index(drop=True)
-
-    # Save CSV
-    df.to_csv(CSV_PATH, index=False)
-    print(f"Prices data saved to {CSV_PATH}, total rows: {len(df)}")
     return df
 
+def fetch_prices() -> int:
+    """
+    Stream all pages into prices.csv (atomically replaced) and its Parquet copy.
+
+    Pages are requested sorted by period, product and series, so each converted
+    page is appended as it arrives and memory stays at a few pages.
+    Returns the number of rows written.
+    """
+    params = {
+        "api_key": EIA_API_KEY,
+        "frequency": FREQUENCY,
+        "data[0]": "value",
+        "sort[0][column]": "period",
+        "sort[0][direction]": "asc",
+        "sort[1][column]": "product",
+        "sort[1][direction]": "asc",
+        "sort[2][column]": "series",  # several series share a product code
+        "sort[2][direction]": "asc",
+    }
+
+    # Add facets for the series of each product
+    for i, series in enumerate(PRODUCT_NAMES.values()):
+        params[f"facets[series][{i}]"] = series
+
+    # Start date
+    params["start"] = START_DATE
+
+    # Save CSV page by page; the old file stays in place if nothing comes back
+    with AtomicCSVWriter(CSV_PATH, PRICE_COLUMNS, replace_if_empty=False) as out:
+        for rows in default_client().iter_pages(EIA_URL, params, LENGTH):
+            out.write(clean_prices(rows))
+    if out.rows == 0:
+        print("No data retrieved!")
+        return 0
+    print(f"Prices data saved to {CSV_PATH}, total rows: {out.rows}")
+
+    # Typed, partitioned copy for the dashboard loaders
+    pq_path = write_parquet_from_csv(CSV_PATH)
+    if pq_path:
+        print(f"Prices data saved to {pq_path}")
+    # Derived Brent/WTI/spread series for load_spot_data
+    derived = update_derived(CSV_PATH)
+    print(f"Derived spot series saved to {DERIVED_PATH}")
+    # Latest-value index for the landing page KPIs
+    update_index(CSV_PATH, derived)
+    print(f"KPI index saved to {kpi_path(CSV_PATH)}")
+    print_peak_rss()
+    return out.rows
+
 if __name__ == "__main__":
-    fetch_prices()
+    if fetch_prices():
+        # Readers resolve a published dataset through its snapshot: publish this refresh too
+        version = snapshots.publish_if_tracked("prices")
+        if version:
+            print(f"Published prices snapshot {version}")
@@ -0,0 +1,125 @@
+# figure_cache.py
+"""Process-wide cache of built Plotly figures.
+
+Chart helpers decorated with `cached_figure` are keyed on their name and
+their inputs: frames by their data version (data_cache.version_of: the
+loader's source files plus the series, slice bounds, aggregation and
+selection that derived the frame), everything else (MA / volatility
+windows, titles, ...) by value. Only frames built outside that lineage
+(small per-call tables) are fingerprinted by content, in row order. The figure is stored as its JSON string in an LRU
+with a size cap, so a rerun where only an unrelated widget changed loads
+the figure instead of rebuilding it.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+from data_cache import _freeze, version_of
+
+MAX_BYTES = int(os.getenv("OIL_DASH_FIGURE_CACHE_MB", "64")) * 1024 * 1024
+
+
+# --- Key ---
+def _fingerprint(obj):
+    """Hashable stand-in for a chart input."""
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        columns = tuple(obj.columns) if isinstance(obj, pd.DataFrame) else obj.name
+        version = version_of(obj)
+        if version is not None:
+            return ("version", version, obj.shape, columns)
+        rows = pd.util.hash_pandas_object(obj).to_numpy() if obj.size else b""
+        return ("frame", obj.shape, columns, hashlib.sha1(rows).hexdigest())
+    if isinstance(obj, np.ndarray):
+        return ("array", obj.shape, str(obj.dtype), hash(np.ascontiguousarray(obj).tobytes()))
+    if isinstance(obj, (list, tuple)):
+        return tuple(_fingerprint(o) for o in obj)
+    return _freeze(obj)
+
+
+class FigureCache:
+    """Thread-safe LRU of figure JSON with hit counters and time saved."""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (json, build seconds)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.seconds_saved = 0.0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, payload, build_seconds):
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= len(self._entries.pop(key)[0])
+            self._entries[key] = (payload, build_seconds)
+            self.current_bytes += len(payload)
+            while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+                self.evictions += 1
+
+    def record_saved(self, seconds):
+        with self._lock:
+            self.seconds_saved += max(seconds, 0.0)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+                "seconds_saved": self.seconds_saved,
+            }
+
+
+# Shared by every session of this process
+figure_cache = FigureCache()
+
+
+def cached_figure(func):
+    """Decorator caching the figure a chart builder returns in `figure_cache`."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (func.__qualname__, _fingerprint(args), _fingerprint(sorted(kwargs.items())))
+        entry = figure_cache.get(key)
+        if entry is not None:
+            payload, build_seconds = entry
+            import plotly.graph_objects as go  # loaded already by the build that filled the entry
+            start = time.perf_counter()
+            # The payload came from a validated figure, skip re-validating it
+            fig = go.Figure(json.loads(payload), _validate=False)
+            figure_cache.record_saved(build_seconds - (time.perf_counter() - start))
+            return fig
+        start = time.perf_counter()
+        fig = func(*args, **kwargs)
+        figure_cache.put(key, fig.to_json(), time.perf_counter() - start)
+        return fig
+    return wrapper
@@ -0,0 +1,85 @@
+# geo.py
+"""Country dimension for the import flows.
+
+Coordinates are not stored on the fact rows (us_crude_imports.csv);
+they come from one row per country in
+world_country_and_usa_states_latitude_and_longitude_values.csv, keyed by
+ISO code. CountryIndex resolves origin names to codes and coordinates on
+demand, so a map only looks up the origins it draws, and a new origin is
+a row added to the dimension rather than a rewrite of the facts.
+
+The facts carry the origin's name only (no originId column), so the join
+is on the country name as spelled in both files; an origin spelled
+differently from the dimension gets no code or coordinates.
+
+`python geo.py` reports fact origins missing from the dimension.
+"""
+import numpy as np
+import pandas as pd
+
+WORLD_PATH = "data/world_country_and_usa_states_latitude_and_longitude_values.csv"
+IMPORTS_PATH = "data/us_crude_imports.csv"
+
+
+def read_countries(path=WORLD_PATH):
+    """Country rows (code, name, latitude, longitude) of the world file."""
+    # keep_default_na=False: "NA" is Namibia's code, not a missing value
+    world = pd.read_csv(path, usecols=["country_code", "latitude", "longitude", "country"],
+                        keep_default_na=False, na_values=[""])
+    world = world.dropna(subset=["country_code", "country"])
+    return world.rename(columns={"country_code": "code", "country": "name"})[
+        ["code", "name", "latitude", "longitude"]].reset_index(drop=True)
+
+
+class CountryIndex:
+    """Indexed lookups by country name or ISO code."""
+
+    def __init__(self, countries):
+        self.codes = countries["code"].to_numpy()
+        self.names = countries["name"].to_numpy()
+        self.latitude = countries["latitude"].to_numpy(dtype="float64")
+        self.longitude = countries["longitude"].to_numpy(dtype="float64")
+        self._by_code = pd.Index(self.codes)
+        self._by_name = pd.Index(self.names)
+
+    def _positions(self, index, keys):
+        return index.get_indexer(pd.Index(keys))
+
+    def code_of(self, names):
+        """ISO codes for country names (None where unknown)."""
+        pos = self._positions(self._by_name, names)
+        return np.where(pos >= 0, self.codes[pos], None)
+
+    def locate(self, names):
+        """(code, latitude, longitude) frame for country names, NaN where unknown."""
+        pos = self._positions(self._by_name, names)
+        found = pos >= 0
+        return pd.DataFrame({
+            "name": list(names),
+            "code": np.where(found, self.codes[pos], None),
+            "latitude": np.where(found, self.latitude[pos], np.nan),
+            "longitude": np.where(found, self.longitude[pos], np.nan),
+        })
+
+    def missing(self, names):
+        """Names not in the dimension."""
+        names = pd.unique(pd.Series(names))
+        return [n for n, p in zip(names, self._positions(self._by_name, names)) if p < 0]
+
+
+def attach_origin_geo(df, index, name_column="originName"):
+    """df with originCode / originLat / originLon joined from the dimension."""
+    names = pd.unique(df[name_column])
+    geo = index.locate(names).rename(columns={
+        "name": name_column, "code": "originCode", "latitude": "originLat", "longitude": "originLon"})
+    return df.merge(geo, on=name_column, how="left")
+
+
+if __name__ == "__main__":
+    index = CountryIndex(read_countries())
+    origins = pd.read_csv(IMPORTS_PATH, usecols=["originName"])["originName"]
+    missing = index.missing(origins)
+    if missing:
+        print(f"Origins missing from {WORLD_PATH}: {', '.join(missing)}")
+    else:
+        print(f"All {origins.nunique()} origins resolve to a country.")
@@ -0,0 +1,249 @@
+# http_cache.py
+"""On-disk cache of EIA API responses.
+
+EIAClient.get_json looks every request up here first. Entries are keyed
+by the URL path and the normalized query parameters (api_key removed, so keys
+and fixtures can be shared), stored gzip-compressed under data/.http_cache
+with a small metadata file, and evicted least-recently-used beyond a size
+cap.
+
+- A fresh entry (younger than the TTL) is served without a request.
+- A stale entry is revalidated with If-None-Match / If-Modified-Since
+  when the server sent an ETag / Last-Modified; a 304 refreshes it.
+- Replay mode serves only from the cache and fails on a miss, so the
+  fetchers run offline against recorded responses. Request plans that
+  depend on the date or on local data (fetch_activity's batches) are
+  recorded next to the responses (`plan`) and reused in replay, so the
+  recorded request keys stay valid as the calendar moves.
+
+Environment:
+- EIA_HTTP_CACHE: on (default), off, refresh (always revalidate) or replay
+- EIA_HTTP_CACHE_DIR: cache directory (default data/.http_cache)
+- EIA_HTTP_CACHE_TTL: seconds an entry is fresh (default 3600)
+- EIA_HTTP_CACHE_MB: size cap (default 256)
+
+`python http_cache.py [stats|clear]` inspects or empties the cache.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from urllib.parse import urlparse
+
+CACHE_DIR = os.path.join("data", ".http_cache")
+MODES = ("on", "off", "refresh", "replay")
+STRIP_PARAMS = {"api_key"}
+
+
+class CacheMiss(LookupError):
+    """Raised in replay mode for a request that was never recorded."""
+
+
+def normalize_params(params):
+    """Sorted (name, value) pairs without the API key; list values expanded."""
+    items = []
+    for name, value in (params or {}).items():
+        if name in STRIP_PARAMS:
+            continue
+        values = value if isinstance(value, (list, tuple)) else [value]
+        items.extend((str(name), str(v)) for v in values)
+    return sorted(items)
+
+
+def cache_key(url, params):
+    """Hash of the URL path and normalized parameters (host-independent, so
+    responses recorded against eia_stub replay against the real API root)."""
+    raw = json.dumps([urlparse(url).path.rstrip("/"), normalize_params(params)])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class Entry:
+    """A cached response: metadata plus the compressed body on disk."""
+
+    def __init__(self, cache, key, meta):
+        self.cache, self.key, self.meta = cache, key, meta
+
+    @property
+    def fresh(self):
+        return time.time() - self.meta["stored_at"] < self.cache.ttl
+
+    def conditional_headers(self):
+        headers = {}
+        if self.meta.get("etag"):
+            headers["If-None-Match"] = self.meta["etag"]
+        if self.meta.get("last_modified"):
+            headers["If-Modified-Since"] = self.meta["last_modified"]
+        return headers
+
+    def json(self):
+        with gzip.open(self.cache._body_path(self.key), "rb") as f:
+            return json.loads(f.read())
+
+
+class ResponseCache:
+    """Compressed, size-capped response store keyed by normalized query."""
+
+    def __init__(self, root=CACHE_DIR, ttl=3600, max_bytes=256 * 1024 * 1024, mode="on"):
+        if mode not in MODES:
+            raise ValueError(f"EIA_HTTP_CACHE must be one of {MODES}, got {mode!r}")
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._size = None  # bytes on disk, computed on first store
+
+    @classmethod
+    def from_env(cls):
+        """Cache configured from EIA_HTTP_CACHE*; None when turned off."""
+        mode = os.getenv("EIA_HTTP_CACHE", "on")
+        if mode == "off":
+            return None
+        return cls(root=os.getenv("EIA_HTTP_CACHE_DIR", CACHE_DIR),
+                   ttl=float(os.getenv("EIA_HTTP_CACHE_TTL", "3600")),
+                   max_bytes=int(os.getenv("EIA_HTTP_CACHE_MB", "256")) * 1024 * 1024,
+                   mode=mode)
+
+    # --- Paths ---
+    def _base(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def _body_path(self, key):
+        return self._base(key) + ".json.gz"
+
+    def _meta_path(self, key):
+        return self._base(key) + ".meta.json"
+
+    # --- Lookup / store ---
+    def lookup(self, url, params):
+        """Entry for the request, or None."""
+        key = cache_key(url, params)
+        try:
+            with open(self._meta_path(key)) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if not os.path.exists(self._body_path(key)):
+            return None
+        os.utime(self._meta_path(key))  # recency for eviction
+        return Entry(self, key, meta)
+
+    def store(self, url, params, body, headers=None):
+        """Save a response body (bytes) with its validators."""
+        headers = headers or {}
+        key = cache_key(url, params)
+        os.makedirs(os.path.dirname(self._base(key)), exist_ok=True)
+        compressed = gzip.compress(body, compresslevel=6)
+        meta = {
+            "url": url,
+            "params": normalize_params(params),
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "stored_at": time.time(),
+            "size": len(compressed),
+        }
+        self._write(self._body_path(key), compressed)
+        self._write(self._meta_path(key), json.dumps(meta).encode())
+        with self._lock:
+            if self._size is None:
+                self._size = self._disk_usage()
+            else:
+                self._size += len(compressed)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def revalidated(self, entry):
+        """A 304 came back: the entry is fresh again."""
+        entry.meta["stored_at"] = time.time()
+        self._write(self._meta_path(entry.key), json.dumps(entry.meta).encode())
+
+    @staticmethod
+    def _write(path, data):
+        tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    # --- Recorded plans ---
+    def _plan_path(self, name):
+        return os.path.join(self.root, "plans", f"{name}.json")
+
+    def plan(self, name, build):
+        """
+        The request plan `name`: build() (recorded for replay) or, in replay
+        mode, the plan recorded with the responses.
+        """
+        path = self._plan_path(name)
+        if self.mode == "replay":
+            try:
+                with open(path) as f:
+                    return json.load(f)
+            except FileNotFoundError:
+                raise CacheMiss(f"replay mode: no recorded plan {name!r}")
+        value = build()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._write(path, json.dumps(value).encode())
+        return value
+
+    # --- Size ---
+    def _entries(self):
+        """(meta path, last used, compressed size) of every entry."""
+        out = []
+        if not os.path.isdir(self.root):
+            return out
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for f in os.scandir(shard.path):
+                if f.name.endswith(".meta.json"):
+                    body = f.path[:-len(".meta.json")] + ".json.gz"
+                    size = os.path.getsize(body) if os.path.exists(body) else 0
+                    out.append((f.path, f.stat().st_mtime, size))
+        return out
+
+    def _disk_usage(self):
+        return sum(size for _, _, size in self._entries())
+
+    def _evict(self):
+        """Remove least recently used entries until under 90% of the cap."""
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        self._size = sum(size for _, _, size in entries)
+        for meta_path, _, size in entries:
+            if self._size <= 0.9 * self.max_bytes:
+                break
+            for path in (meta_path, meta_path[:-len(".meta.json")] + ".json.gz"):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._size -= size
+
+    def stats(self):
+        entries = self._entries()
+        return {"entries": len(entries), "bytes": sum(s for _, _, s in entries),
+                "max_bytes": self.max_bytes, "mode": self.mode, "root": self.root}
+
+    def clear(self):
+        shutil.rmtree(os.path.join(self.root, "plans"), ignore_errors=True)
+        for meta_path, _, _ in self._entries():
+            for path in (meta_path, meta_path[:-len(".meta.json")] + ".json.gz"):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        with self._lock:
+            self._size = 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or empty the EIA response cache.")
+    parser.add_argument("command", choices=["stats", "clear"], nargs="?", default="stats")
+    args = parser.parse_args()
+    cache = ResponseCache.from_env() or ResponseCache(root=os.getenv("EIA_HTTP_CACHE_DIR", CACHE_DIR))
+    if args.command == "clear":
+        cache.clear()
+    print(json.dumps(cache.stats(), indent=2))
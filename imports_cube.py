@@ -0,0 +1,102 @@
+# imports_cube.py
+"""In-memory cube of US crude imports: year x month x origin x grade.
+
+Built once per version of us_crude_imports.csv (see
+utils.load_imports_cube). Origins and grades are dictionary-encoded, years
+and months are integer axes, and quantities live in one dense numpy array,
+so a year / country selection is array indexing and the yearly roll-ups
+(totals per origin, top origins per year) are precomputed.
+"""
+import numpy as np
+import pandas as pd
+
+from data_cache import derived
+
+
+class ImportsCube:
+    """Dense quantity cube with per-year roll-ups."""
+
+    def __init__(self, df):
+        df = df[df["quantity"].notna()]
+        period = pd.to_datetime(df["period"], errors="coerce")
+        valid = period.notna().to_numpy()
+        df, period = df[valid], period[valid]
+
+        years = period.dt.year.to_numpy()
+        self.years = np.unique(years)
+        year_idx = np.searchsorted(self.years, years)
+        month_idx = period.dt.month.to_numpy() - 1
+        origin_idx, origins = pd.factorize(df["originName"], sort=True)
+        grade_idx, grades = pd.factorize(df["gradeName"], sort=True)
+        self.origins, self.grades = list(origins), list(grades)
+
+        self.data = np.zeros((len(self.years), 12, len(self.origins), len(self.grades)))
+        np.add.at(self.data, (year_idx, month_idx, origin_idx, grade_idx),
+                  df["quantity"].to_numpy(dtype="float64"))
+
+        # Roll-ups
+        self.year_origin = self.data.sum(axis=(1, 3))  # (year, origin)
+        self.year_month = self.data.sum(axis=(2, 3))  # (year, month)
+        self.ranked = np.argsort(-self.year_origin, axis=1, kind="stable")  # origins by size per year
+        self._origin_pos = {name: i for i, name in enumerate(self.origins)}
+
+    def __sizeof__(self):
+        return self.data.nbytes + self.year_origin.nbytes + self.year_month.nbytes + self.ranked.nbytes
+
+    # --- Selection ---
+    def year_index(self, year):
+        i = np.searchsorted(self.years, int(year))
+        if i == len(self.years) or self.years[i] != int(year):
+            raise KeyError(f"no imports for year {year}")
+        return i
+
+    def origin_mask(self, origins=None):
+        """Boolean mask over the origin axis (None = all origins)."""
+        if origins is None:
+            return np.ones(len(self.origins), dtype=bool)
+        mask = np.zeros(len(self.origins), dtype=bool)
+        mask[[self._origin_pos[o] for o in origins if o in self._origin_pos]] = True
+        return mask
+
+    # --- Roll-ups ---
+    @derived
+    def origin_totals(self, year, origins=None):
+        """Yearly total per selected origin, largest first, as (originName, quantity)."""
+        y, mask = self.year_index(year), self.origin_mask(origins)
+        order = self.ranked[y][mask[self.ranked[y]]]
+        return pd.DataFrame({"originName": [self.origins[i] for i in order],
+                             "quantity": self.year_origin[y, order]})
+
+    def top(self, year, n=2, origins=None):
+        """The n largest origins of a year as [(originName, quantity), ...]."""
+        totals = self.origin_totals(year, origins)
+        return list(totals.head(n).itertuples(index=False, name=None))
+
+    @derived
+    def yearly_totals(self, origins=None):
+        """Year x origin totals of the selected origins (columns largest first overall)."""
+        mask = self.origin_mask(origins)
+        table = self.year_origin[:, mask]
+        names = np.array(self.origins)[mask]
+        order = np.argsort(-table.sum(axis=0), kind="stable")
+        return pd.DataFrame(table[:, order], index=self.years, columns=names[order])
+
+    @derived
+    def yoy(self, origins=None):
+        """Total of the selected origins per year with the year-over-year change (%)."""
+        totals = pd.Series(self.year_origin[:, self.origin_mask(origins)].sum(axis=1), index=self.years)
+        return pd.DataFrame({"quantity": totals, "yoy": totals.pct_change() * 100})
+
+    @derived
+    def frame(self, year, origins=None):
+        """Long (period, originName, gradeName, quantity) rows of one year, zeros dropped."""
+        y, mask = self.year_index(year), self.origin_mask(origins)
+        block = self.data[y][:, mask, :]
+        month, origin, grade = np.nonzero(block)
+        origin_names = np.array(self.origins)[mask]
+        return pd.DataFrame({
+            "period": [f"{self.years[y]}-{m + 1:02d}-01" for m in month],
+            "originName": origin_names[origin],
+            "gradeName": np.array(self.grades)[grade],
+            "quantity": block[month, origin, grade],
+        })
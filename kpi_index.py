@@ -0,0 +1,170 @@
+# kpi_index.py
+"""Latest-value index for the landing page KPIs.
+
+For every (activity, product, country) of the S&D datasets and every
+spot series, the index holds the last two observations with their
+periods. It is built at ingest, right after the fetchers write a dataset,
+as one small CSV per dataset (data/kpi/<dataset>.csv), so main.py renders
+its KPIs without loading the full datasets.
+
+Observations are ordered by period before taking the last two, so
+month-over-month changes are right whatever order the source file is in
+(fetch_activity writes periods newest first). Values follow the loaders:
+S&D rows with a missing or non-positive value are skipped.
+
+`read_index` is the dashboard's read path: when a dataset's index is
+missing or older than the source it builds it in memory without writing
+(the files may be a published snapshot). `python kpi_index.py` rebuilds
+and writes all of them.
+"""
+import os
+
+import pandas as pd
+
+from spot_derived import SERIES, load_derived, update_derived
+from storage import read_parquet
+
+DATASETS = ["prices", "production", "consumption", "stocks"]
+COLUMNS = ["dataset", "key", "product", "period", "value", "prev_period", "prev_value"]
+SPOT_SERIES = ["brent", "wti", "spread"]
+
+
+def kpi_path(csv_path):
+    """data/production.csv -> data/kpi/production.csv"""
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(os.path.dirname(csv_path), "kpi", f"{stem}.csv")
+
+
+# --- Build ---
+def last_two(df, keys):
+    """Last and previous observation per key group, by period: keys + period, value, prev_period, prev_value."""
+    df = df.sort_values([*keys, "period"], kind="stable")
+    rank = df.groupby(keys, observed=True, sort=False).cumcount(ascending=False).to_numpy()
+    last = df[rank == 0].reset_index(drop=True)
+    prev = df[rank == 1].rename(columns={"period": "prev_period", "value": "prev_value"})
+    return last.merge(prev, on=keys, how="left")
+
+
+def activity_kpis(csv_path):
+    """Index rows of one S&D dataset: key = country, product = productName."""
+    cols = ["period", "productName", "countryRegionId", "value"]
+    df = read_parquet(csv_path, columns=cols, filters=[("value", ">", 0)])
+    if df is None:
+        df = pd.read_csv(csv_path, usecols=cols)
+        df["period"] = pd.to_datetime(df["period"], errors="coerce")
+        df["value"] = pd.to_numeric(df["value"], errors="coerce")
+    df = df[df["period"].notna() & (df["value"] > 0)]
+    df = df.astype({"productName": str, "countryRegionId": str})
+    out = last_two(df, ["productName", "countryRegionId"])
+    return out.rename(columns={"countryRegionId": "key", "productName": "product"})
+
+
+def spot_kpis(derived):
+    """Index rows of the derived spot series: key = series, product = EIA code."""
+    frames = []
+    for name in SPOT_SERIES:
+        rows = derived[derived[f"has_{name}"]] if f"has_{name}" in derived else derived
+        frames.append(pd.DataFrame({"key": name, "product": SERIES.get(name, ""),
+                                    "period": rows["period"].to_numpy(), "value": rows[name].to_numpy()}))
+    return last_two(pd.concat(frames, ignore_index=True), ["key", "product"])
+
+
+def _derived_path(csv_path):
+    return os.path.join(os.path.dirname(csv_path), "spot_derived.parquet")
+
+
+def build_index(csv_path, derived=None):
+    """Index rows of one dataset, in memory."""
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    if stem == "prices":
+        if derived is None:
+            derived = load_derived(csv_path, path=_derived_path(csv_path))
+        df = spot_kpis(derived)
+    else:
+        df = activity_kpis(csv_path)
+    df.insert(0, "dataset", stem)
+    return df[COLUMNS]
+
+
+def update_index(csv_path, derived=None):
+    """Build and atomically write the index of one dataset (ingest only); returns it."""
+    if derived is None and os.path.basename(csv_path) == "prices.csv":
+        derived = update_derived(csv_path, path=_derived_path(csv_path))
+    df = build_index(csv_path, derived)
+    path = kpi_path(csv_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    return df
+
+
+def read_index(csv_path):
+    """Index of one dataset; built in memory (not written) if missing or older than the source."""
+    path = kpi_path(csv_path)
+    if not os.path.exists(path) or (
+            os.path.exists(csv_path) and os.path.getmtime(path) < os.path.getmtime(csv_path)):
+        if not os.path.exists(csv_path):
+            return pd.DataFrame(columns=COLUMNS)
+        return build_index(csv_path)
+    # keep_default_na=False: country codes such as "NA" are not missing values
+    df = pd.read_csv(path, dtype={"dataset": str, "key": str, "product": str},
+                     keep_default_na=False, na_values={"value": [""], "prev_value": [""]})
+    for col in ["period", "prev_period"]:
+        df[col] = pd.to_datetime(df[col].replace("", None))
+    return df
+
+
+# --- Lookups ---
+class KpiIndex:
+    """Dictionary lookups of the latest observations by (dataset, key, product)."""
+
+    def __init__(self, frame):
+        self.frame = frame.reset_index(drop=True)
+        self._period = pd.to_datetime(self.frame["period"]).to_numpy()
+        self._prev_period = pd.to_datetime(self.frame["prev_period"]).to_numpy()
+        self._value = self.frame["value"].to_numpy(dtype="float64")
+        self._prev_value = self.frame["prev_value"].to_numpy(dtype="float64")
+        self._rows = {}
+        for i, (dataset, key, product) in enumerate(zip(frame["dataset"], frame["key"], frame["product"])):
+            self._rows.setdefault((dataset, key), {})[product] = i
+
+    def keys(self, dataset, product=None):
+        """Sorted keys (countries or series) of a dataset, optionally having product."""
+        return sorted(key for (d, key), products in self._rows.items()
+                      if d == dataset and (product is None or product in products))
+
+    def get(self, dataset, key, product=None):
+        """
+        Latest observation as {value, change, period, prev_period}.
+
+        change is the percent change from the previous observation (0 when
+        there is none). Without product, the product with the most recent
+        period is taken (the consumption and stocks datasets have one).
+        Missing entries give value 0.
+        """
+        products = self._rows.get((dataset, key), {})
+        if product is not None:
+            i = products.get(product)
+        elif products:
+            i = max(products.values(), key=lambda r: self._period[r])
+        else:
+            i = None
+        if i is None:
+            return {"value": 0.0, "change": 0.0, "period": None, "prev_period": None}
+        value, prev = self._value[i], self._prev_value[i]
+        change = (value / prev - 1) * 100 if prev == prev and prev != 0 else 0.0  # prev == prev: not NaN
+        prev_period = self._prev_period[i]
+        return {
+            "value": float(value),
+            "change": float(change),
+            "period": pd.Timestamp(self._period[i]),
+            "prev_period": pd.Timestamp(prev_period) if not pd.isna(prev_period) else None,
+        }
+
+
+if __name__ == "__main__":
+    for dataset in DATASETS:
+        csv_path = os.path.join("data", f"{dataset}.csv")
+        if os.path.exists(csv_path):
+            print(f"{kpi_path(csv_path)}: {len(update_index(csv_path))} rows")
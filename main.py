@@ -1,6 +1,8 @@
 # Main.py
 import streamlit as st
-from utils import load_and_clean, load_spot_data
+from utils import load_kpi_index, kpi_periods, cache_stats_panel, CRUDE_PRODUCT, begin_page_trace, performance_panel
+
+trace = begin_page_trace("Main")
 
 st.set_page_config(page_title="Global Oil Dashboard", layout="wide")
 st.title("Global Oil Dashboard")
@@ -8,49 +10,43 @@ st.markdown("---")
 st.markdown("KPIs: oil production, consumption, and stocks.")
 
 
-# --- Load datasets ---
-prod = load_and_clean("data/production.csv", filter_crude=True)
-cons = load_and_clean("data/consumption.csv")
-stocks = load_and_clean("data/stocks.csv")
-
-brent, wti, spread, prices = load_spot_data()
+# --- Load the KPI index (last two observations per series) ---
+kpis = load_kpi_index()
 
 # --- Sidebar: select one country per KPI ---
-available_countries = sorted(set(prod["countryRegionId"]) | set(cons["countryRegionId"]) | set(stocks["countryRegionId"]))
+available_countries = sorted(set(kpis.keys("production", CRUDE_PRODUCT)) | set(kpis.keys("consumption")) | set(kpis.keys("stocks")))
 
 prod_country = st.sidebar.selectbox("Select Production Country", available_countries, index=available_countries.index("USA") if "USA" in available_countries else 0)
 cons_country = st.sidebar.selectbox("Select Consumption Country", available_countries, index=available_countries.index("USA") if "USA" in available_countries else 0)
 stocks_country = st.sidebar.selectbox("Select Stocks Country", available_countries, index=available_countries.index("USA") if "USA" in available_countries else 0)
+cache_stats_panel()
 
 # --- 3 Columns: KPIs ---
 col1, col2, col3 = st.columns(3)
 
 # Production KPI
 with col1:
-    df = prod[prod["countryRegionId"] == prod_country]
-    last_val = df["value"].iloc[-1] if not df.empty else 0
-    last_chg = df["value"].pct_change().iloc[-1] * 100 if len(df) > 1 else 0
-    st.metric(f"Last Month Production ({prod_country})", f"{last_val:.1f} TBPD", f"{last_chg:+.1f}%")
+    kpi = kpis.get("production", prod_country, CRUDE_PRODUCT)
+    st.metric(f"Last Month Production ({prod_country})", f"{kpi['value']:.1f} TBPD", f"{kpi['change']:+.1f}%",
+              help=kpi_periods(kpi))
 
 # Consumption KPI
 with col2:
-    df = cons[cons["countryRegionId"] == cons_country]
-    last_val = df["value"].iloc[-1] if not df.empty else 0
-    last_chg = df["value"].pct_change().iloc[-1] * 100 if len(df) > 1 else 0
-    st.metric(f"Last Month Consumption ({cons_country})", f"{last_val:.1f} TBPD", f"{last_chg:+.1f}%")
+    kpi = kpis.get("consumption", cons_country)
+    st.metric(f"Last Month Consumption ({cons_country})", f"{kpi['value']:.1f} TBPD", f"{kpi['change']:+.1f}%",
+              help=kpi_periods(kpi))
 
 # Stocks KPI
 with col3:
-    df = stocks[stocks["countryRegionId"] == stocks_country]
-    last_val = df["value"].iloc[-1] if not df.empty else 0
-    last_chg = df["value"].pct_change().iloc[-1] * 100 if len(df) > 1 else 0
-    st.metric(f"Last Month Stocks ({stocks_country})", f"{last_val:.1f} MBBL", f"{last_chg:+.1f}%")
+    kpi = kpis.get("stocks", stocks_country)
+    st.metric(f"Last Month Stocks ({stocks_country})", f"{kpi['value']:.1f} MBBL", f"{kpi['change']:+.1f}%",
+              help=kpi_periods(kpi))
 
 st.markdown("---")
 st.markdown("KPIs: Brent, WTI and their Spread.")
-wti_last = wti.iloc[-1]
-brent_last = brent.iloc[-1]
-spread_last = spread.iloc[-1]
+wti_last = kpis.get("prices", "wti")
+brent_last = kpis.get("prices", "brent")
+spread_last = kpis.get("prices", "spread")
 
 # --- 3 Columns: KPIs for Spot Prices ---
 
@@ -69,4 +65,6 @@ st.markdown(
     **Source:** [U.S. Energy Information Administration (EIA) International Data API](https://www.eia.gov/opendata/browser)
     """,
     unsafe_allow_html=True,
-)
\ No newline at end of file
+)
+
+performance_panel(trace)
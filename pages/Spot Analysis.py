@@ -1,73 +1,85 @@
 # pages/Spot Prices.py
 import streamlit as st
-import pandas as pd
-from datetime import datetime
-from utils import apply_time_filter, plot_price_chart, plot_returns_with_vol, sub_metrics, aggregate_prices, load_spot_data
+from utils import apply_time_filter, slice_period, plot_price_chart, plot_returns_with_vol, plot_spread_matrix, ma_window_inputs, vol_window_input, sub_metrics, aggregate_prices, load_spot_engine, show_chart, begin_page_trace, performance_panel
+
+trace = begin_page_trace("Spot Analysis")
 
 # --- DATA --- #
-# load prices data
-brent, wti, spread, prices = load_spot_data()
+# load every configured spot series and combination (spot_engine.py)
+engine = load_spot_engine()
+available = engine.available()
 
 # --- GLOBAL USER INPUTS --- #
 
 # timeframe filter input 
 time_filter = st.sidebar.radio(
-    "Timeframe",["1W", "1M", "3M", "6M", "YTD", "1Y", "5Y", "10Y", "Max"], index=1)
+    "Timeframe",["1W", "1M", "3M", "6M", "YTD", "1Y", "5Y", "10Y", "Max", "Custom"], index=1)
+
+# custom date range: a narrow range is drawn at full resolution
+if time_filter == "Custom":
+    first_date, last_date = engine.dates[0].date(), engine.dates[-1].date()
+    date_range = st.sidebar.date_input(
+        "Date range", value=(max(first_date, last_date.replace(year=last_date.year - 1)), last_date),
+        min_value=first_date, max_value=last_date)
 
 # aggregation frequency input
-freq = st.sidebar.radio('Price Aggregation', ['Daily', 'Weekly', 'Monthly'], index=1)
+freq = st.sidebar.radio('Price Aggregation', ['Daily', 'Weekly', 'Monthly', 'Quarterly', 'Yearly'], index=1)
+
+# series and spreads to show, three per row
+selected = st.sidebar.multiselect(
+    "Series", available, [k for k in ["wti", "brent", "spread"] if k in available],
+    format_func=lambda key: engine.config(key)["label"])
 # --- DASHBOARD PAGE --- #
 
 st.set_page_config(layout="wide")
-st.title("Brent & WTI Spot Prices")
-st.markdown(f"Latest Data Available: {prices['period'].max().date()}")
-
-# Aplly aggregation
-brent = aggregate_prices(brent, freq)
-wti = aggregate_prices(wti, freq)
-spread = aggregate_prices(spread, freq)
-
-# Apply time filter
-brent = apply_time_filter(brent, time_filter)
-wti = apply_time_filter(wti, time_filter)
-spread = apply_time_filter(spread, time_filter)
+st.title("Spot Prices & Spreads")
+st.markdown(f"Latest Data Available: {engine.latest_date().date()}")
 
-# 3 columns
-col1, col2, col3 = st.columns(3)
+def spot_view(key):
+    """Aggregated, time-filtered frame of one series or combination."""
+    if time_filter == "Custom":
+        # Slice the daily rows first: aggregated buckets are labelled with their end date
+        start, end = (list(date_range) * 2)[:2] if len(date_range) else (None, None)
+        return aggregate_prices(slice_period(engine.frame(key), start, end), freq)
+    return apply_time_filter(aggregate_prices(engine.frame(key), freq), time_filter)
 
-# --- WTI ---
-with col1:
-    st.header("WTI Crude Oil")
-    last_val, last_change = wti["value"].iloc[-1], wti["change"].iloc[-1]
-    st.metric("Last Close Price", f"{last_val:.2f} $/BBL", f"{last_change:.2f}%")
-    sub_metrics(wti, "High", "Low", time_filter, "$/BBL")
+def spot_column(key):
+    """Header, last value, high / low, price chart with MAs and returns chart of one series."""
+    cfg = engine.config(key)
+    df = spot_view(key)
+    unit, short = cfg["unit"], cfg["short"]
+    is_spread = "legs" in cfg
+    st.header(cfg["label"])
+    if df.empty:
+        st.warning(f"No {short} data in this timeframe.")
+        return
+    last_val, last_chg = df["value"].iloc[-1], df["change"].iloc[-1]
+    st.metric("Current Spread" if is_spread else "Last Price", f"{last_val:.2f} {unit}", f"{last_chg:.2f}%")
+    sub_metrics(df, "High", "Low", time_filter, unit)
     st.markdown("---")
-    st.plotly_chart(plot_price_chart(wti,"WTI", "WTI Crude Spot Price", "Close Price ($/BBL)"), use_container_width=True)
+    fast_k, slow_k = ma_window_inputs(short)
+    show_chart(plot_price_chart(df, short, cfg["label"] if is_spread else f"{cfg['label']} Spot Price",
+                                f"{'Spread' if is_spread else 'Close Price'} ({unit})",
+                                fast_k=fast_k, slow_k=slow_k), use_container_width=True)
     st.markdown("---")
-    st.plotly_chart(plot_returns_with_vol(wti, "WTI"), use_container_width=True)
+    vol_k = vol_window_input(short)
+    show_chart(plot_returns_with_vol(df, short, k=vol_k), use_container_width=True)
 
-# --- Brent ---
-with col2:
-    st.header("Brent Crude Oil")
-    last_val, last_chg = brent["value"].iloc[-1], brent["change"].iloc[-1]
-    st.metric("Last Price", f"{last_val:.2f} $/BBL", f"{last_chg:.2f}%")
-    sub_metrics(brent, "High", "Low", time_filter, "$/BBL")
-    st.markdown("---")
-    st.plotly_chart(plot_price_chart(brent, "Brent","Brent Crude Spot Price", "Close Price ($/BBL)"), use_container_width=True)
-    st.markdown("---")
-    st.plotly_chart(plot_returns_with_vol(brent, "Brent"), use_container_width=True)
+for row in range(0, len(selected), 3):
+    for col, key in zip(st.columns(3), selected[row:row + 3]):
+        with col:
+            spot_column(key)
 
-# --- Spread ---
-with col3:
-    st.header("Brent - WTI Spread")
-    last_val, last_chg = spread["value"].iloc[-1], spread["change"].iloc[-1]
-    st.metric("Current Spread", f"{last_val:.2f} $/BBL", f"{last_chg:.2f}%")
-    sub_metrics(spread, "High", "Low", time_filter, "$/BBL")
-    st.markdown("---")
-    st.plotly_chart(plot_price_chart(spread, "Spread","Brent-WTI Spread", "Spread ($/BBL)"), use_container_width=True)
+# --- All-pairs spreads --- #
+if len(engine.keys) > 1:
     st.markdown("---")
-    st.plotly_chart(plot_returns_with_vol(spread, "Spread"), use_container_width=True)
-
+    st.header("Spread Matrix")
+    as_of = (list(date_range) * 2)[1] if time_filter == "Custom" and len(date_range) else None
+    shown = [k for k in selected if k in engine.keys]
+    matrix = engine.spread_matrix(shown if len(shown) > 1 else None, date=as_of)
+    st.caption("Row minus column, last prices in $/BBL (products converted at 42 gallons per barrel).")
+    show_chart(plot_spread_matrix(matrix, f"Spreads as of {(as_of or engine.latest_date().date())}"),
+               use_container_width=True)
 
 st.markdown("---")
 st.markdown(
@@ -75,4 +87,6 @@ st.markdown(
     **Source:** [U.S. Energy Information Administration (EIA) International Data API](https://www.eia.gov/opendata/browser/petroleum/pri/spt)
     """,
     unsafe_allow_html=True,
-)
\ No newline at end of file
+)
+
+performance_panel(trace)
@@ -1,27 +1,21 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-from utils import apply_time_filter_snd, load_and_clean, plot_section
+from utils import load_snd_matrix, plot_section, SND_MEASURES, begin_page_trace, performance_panel
+
+trace = begin_page_trace("Supply & Demand")
 
 st.title("International Crude Market Overview")
 st.subheader("Production, Consumption, and Stocks Monthly Time Series")
 
-# Sidebar: time range
+# Sidebar: time range and measure
 time_filter = st.sidebar.radio(
     "Select Time Range",["All", "Last 1 Year", "Last 5 Years", "Last 10 Years"],index=1)
+measure = st.sidebar.radio("Show", list(SND_MEASURES), index=0)
 
-# Load datasets
-prod = load_and_clean("data/production.csv", filter_crude=True)
-cons = load_and_clean("data/consumption.csv")
-stocks = load_and_clean("data/stocks.csv")
-
-# Apply time filter
-prod = apply_time_filter_snd(prod, time_filter)
-cons = apply_time_filter_snd(cons, time_filter)
-stocks = apply_time_filter_snd(stocks, time_filter)
+# Load datasets: one period x country matrix per activity, shared by every section
+matrix = load_snd_matrix()
 
-# Global sidebar countries
-available_countries = sorted(set(prod["countryRegionId"]) | set(cons["countryRegionId"]) | set(stocks["countryRegionId"]))
+# Global sidebar countries (and country groups, summed over their reporting members)
+available_countries = matrix.available()
 global_countries = st.sidebar.multiselect("Select countries (global)",available_countries,["USA", "OPEC"])
 
 # Layout: 3 columns
@@ -29,15 +23,22 @@ col1, col2, col3 = st.columns(3)
 
 with col1:
     prod_countries = st.multiselect("Countries for Production", available_countries, global_countries, key="prod_select")
-    plot_section(prod, "Production", prod_countries, global_countries)
+    plot_section(matrix, "Production", prod_countries, global_countries, time_filter, measure)
 
 with col2:
     cons_countries = st.multiselect("Countries for Consumption", available_countries, global_countries, key="cons_select")
-    plot_section(cons, "Consumption", cons_countries, global_countries)
+    plot_section(matrix, "Consumption", cons_countries, global_countries, time_filter, measure)
 
 with col3:
     stocks_countries = st.multiselect("Countries for Stocks", available_countries, global_countries, key="stocks_select")
-    plot_section(stocks, "Stocks", stocks_countries, global_countries)
+    plot_section(matrix, "Stocks", stocks_countries, global_countries, time_filter, measure)
+
+# Balance: crude production minus refined products consumption
+st.divider()
+st.subheader("Production − Consumption Balance")
+st.caption("Crude oil production minus refined petroleum products consumption, per country or group.")
+balance_countries = st.multiselect("Countries for Balance", available_countries, global_countries, key="balance_select")
+plot_section(matrix, "Balance", balance_countries, global_countries, time_filter, measure)
 
 
 # --- Footer ---
@@ -51,3 +52,5 @@ st.markdown(
     """,
     unsafe_allow_html=True,
 )
+
+performance_panel(trace)
@@ -0,0 +1,55 @@
+# price_pyramid.py
+"""Multi-resolution aggregates of one daily price series.
+
+build_pyramid resamples a daily (period, value, ...) frame once into
+daily, weekly, monthly, quarterly and yearly levels. Every level keeps the
+frame's columns at their last value in the bucket (as aggregate_prices
+always did) plus high/low/mean of `value`, and re-derives `returns` at the
+level's frequency. utils.aggregate_prices looks levels up from a pyramid
+built once per loaded frame.
+"""
+import pandas as pd
+
+# Sidebar label -> pandas resample rule (None = daily, no resampling)
+RESOLUTIONS = {
+    "Daily": None,
+    "Weekly": "W-FRI",
+    "Monthly": "ME",
+    "Quarterly": "QE",
+    "Yearly": "YE",
+}
+# Aliases used before pandas 2.2
+_LEGACY_RULES = {"ME": "M", "QE": "Q", "YE": "A"}
+
+
+def _resample(df, rule):
+    try:
+        return df.resample(rule)
+    except ValueError:
+        return df.resample(_LEGACY_RULES.get(rule, rule))
+
+
+def build_level(df, rule):
+    """One pyramid level: last value per bucket plus high/low/mean."""
+    if rule is None:
+        level = df.copy()
+        level["high"] = level["low"] = level["mean"] = level["value"]
+        return level.reset_index(drop=True)
+
+    indexed = df.set_index("period")
+    resampled = _resample(indexed, rule)
+    level = resampled.last()
+    stats = _resample(indexed["value"], rule).agg(["max", "min", "mean"])
+    level["high"], level["low"], level["mean"] = stats["max"], stats["min"], stats["mean"]
+    level = level.reset_index()
+    # Precomputed returns are daily, re-derive them at this frequency
+    if "returns" in level.columns:
+        level["returns"] = level["value"].pct_change() * 100
+    return level
+
+
+def build_pyramid(df):
+    """All RESOLUTIONS levels of a daily single-series frame."""
+    df = df.copy()
+    df["period"] = pd.to_datetime(df["period"], errors="coerce")
+    return {freq: build_level(df, rule) for freq, rule in RESOLUTIONS.items()}
@@ -0,0 +1,147 @@
+# rolling.py
+"""Rolling mean / standard deviation for any window from prefix sums.
+
+RollingStats keeps cumulative sums, sums of squares and NaN counts of one
+series, so the moving average and rolling std for any window k come back
+from a few vectorized differences of array slices instead of a new pandas
+rolling pass. Results follow pandas' `rolling(k).mean()` / `.std()` (min_periods=k: any
+NaN in the window gives NaN). Non-finite values (e.g. the inf returns of a
+spread that touches zero) count as missing, so only the windows holding
+them are NaN.
+
+For the variance the sums restart every BLOCK points and are centered on
+the block mean, so they stay small and do not lose precision on long,
+trending histories. A window spans at most two blocks (k <= BLOCK); the
+two parts are merged with Chan's parallel variance formula. The sums of
+squares are differences of block prefixes, so an outlier earlier in the
+block leaves rounding noise of the order eps * prefix in later windows;
+sums of squared deviations below that noise are taken as 0, so a constant
+window has a std of exactly 0 as in pandas.
+"""
+import numpy as np
+
+BLOCK = 256  # covers the 1-250 windows of the dashboard inputs
+EPS = np.finfo("float64").eps
+
+
+class RollingStats:
+    """Prefix-sum engine for one series (array-like of floats)."""
+
+    def __init__(self, values, block=BLOCK):
+        x = np.asarray(values, dtype="float64")
+        self.n = n = len(x)
+        self.block = block
+        self._values = x
+        self._wider = {}  # engines with a larger block, for k > block
+
+        nan = ~np.isfinite(x)
+        self._nans = np.concatenate(([0], np.cumsum(nan)))
+        x0 = np.where(nan, 0.0, x)
+        # Means only need plain prefix sums (centered on the overall mean)
+        self.shift = x0.sum() / max(n - int(nan.sum()), 1)
+        self._s1 = np.concatenate(([0.0], np.cumsum(np.where(nan, 0.0, x - self.shift))))
+
+        # Block-local sums for the variance
+        nblocks = -(-n // block)
+        pad = nblocks * block - n
+        xb = np.concatenate((x0, np.zeros(pad))).reshape(nblocks, block)
+        counts = np.concatenate((~nan, np.zeros(pad, dtype=bool))).reshape(nblocks, block).sum(axis=1)
+        means = xb.sum(axis=1) / np.maximum(counts, 1)
+        c = np.concatenate((np.where(nan, 0.0, x - np.repeat(means, block)[:n]), np.zeros(pad)))
+        c = c.reshape(nblocks, block)
+        p1 = np.cumsum(c, axis=1)
+        p2 = np.cumsum(c * c, axis=1)
+        # Inclusive prefix within the block, and the same value just before each position
+        self._p1, self._p2 = p1.ravel()[:n], p2.ravel()[:n]
+        self._q1 = np.concatenate(([0.0], self._p1))[:n]
+        self._q2 = np.concatenate(([0.0], self._p2))[:n]
+        self._q1[::block] = 0.0
+        self._q2[::block] = 0.0
+        self._pos = np.arange(n) % block
+        # Per position: block mean, and block totals of the block it belongs to
+        self._m = np.repeat(means, block)[:n]
+        self._t1 = np.repeat(p1[:, -1], block)[:n]
+        self._t2 = np.repeat(p2[:, -1], block)[:n]
+        self._len = np.repeat(np.minimum(block, n - np.arange(nblocks) * block), block)[:n]
+
+    def _valid(self, k):
+        return (self._nans[k:] - self._nans[:-k]) == 0
+
+    def _engine(self, k):
+        if k <= self.block:
+            return self
+        if k not in self._wider:
+            self._wider[k] = RollingStats(self._values, block=k)
+        return self._wider[k]
+
+    def _m2(self, k):
+        """Sum of squared deviations for windows ending at positions k-1 .. n-1."""
+        n, B = self.n, self.block
+        # Window = [s, e]; slices below are indexed by s (0 .. n-k) or e (k-1 .. n-1)
+        p1e, p2e, me, pos_e = self._p1[k - 1:], self._p2[k - 1:], self._m[k - 1:], self._pos[k - 1:]
+        q1s, q2s, ms, pos_s = self._q1[:n - k + 1], self._q2[:n - k + 1], self._m[:n - k + 1], self._pos[:n - k + 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Window inside one block
+            s1, s2 = p1e - q1s, p2e - q2s
+            m2 = s2 - s1 * s1 / k
+            # Size of the prefix sums the window's sums of squares were taken from
+            scale = p2e.copy()
+
+            # Window across two blocks: suffix of the start block + prefix of the end block
+            split = pos_s + k > B
+            if split.any():
+                n_a = (self._len[:n - k + 1] - pos_s)[split]
+                n_b = pos_e[split] + 1
+                s1a = (self._t1[:n - k + 1] - q1s)[split]
+                s2a = (self._t2[:n - k + 1] - q2s)[split]
+                s1b, s2b = p1e[split], p2e[split]
+                delta = (s1b / n_b + me[split]) - (s1a / n_a + ms[split])
+                m2[split] = (s2a - s1a * s1a / n_a) + (s2b - s1b * s1b / n_b) + delta * delta * n_a * n_b / k
+                scale[split] += self._t2[:n - k + 1][split]
+        # Below the rounding noise of the prefix differences: a constant window
+        m2[m2 <= B * EPS * scale] = 0.0
+        return m2
+
+    def mean(self, k):
+        """Rolling mean over k periods, aligned with the input (NaN for the first k-1)."""
+        out = np.full(self.n, np.nan)
+        if 1 <= k <= self.n:
+            mean = (self._s1[k:] - self._s1[:-k]) / k + self.shift
+            out[k - 1:] = np.where(self._valid(k), mean, np.nan)
+        return out
+
+    def std(self, k, ddof=1):
+        """Rolling standard deviation over k periods (sample std by default)."""
+        out = np.full(self.n, np.nan)
+        if ddof < k <= self.n:
+            var = np.maximum(self._engine(k)._m2(k) / (k - ddof), 0.0)
+            out[k - 1:] = np.where(self._valid(k), np.sqrt(var), np.nan)
+        return out
+
+    def batch(self, windows, ddof=1):
+        """
+        Means and stds for many windows at once.
+
+        Returns (means, stds), each an array of shape (len(windows), n).
+        """
+        windows = list(windows)
+        means = np.full((len(windows), self.n), np.nan)
+        stds = np.full((len(windows), self.n), np.nan)
+        for i, k in enumerate(windows):
+            means[i] = self.mean(k)
+            stds[i] = self.std(k, ddof)
+        return means, stds
+
+
+def rolling_batch(series, windows, ddof=1):
+    """
+    Rolling means and stds for several series and windows.
+
+    series: {name: values}, e.g. {"WTI": ..., "Brent": ..., "Spread": ...}
+    Returns {name: {"mean": (len(windows), n) array, "std": ...}}.
+    """
+    out = {}
+    for name, values in series.items():
+        means, stds = RollingStats(values).batch(windows, ddof)
+        out[name] = {"mean": means, "std": stds}
+    return out
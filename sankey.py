@@ -0,0 +1,96 @@
+# sankey.py
+"""Vectorized node / link arrays for the US imports Sankey diagram.
+
+Origins (and grades / months) are turned into categorical codes once and
+the link values summed with np.bincount, so the whole 2010-present history
+is aggregated in one pass instead of a `nodes.index()` lookup per row.
+
+Aggregation levels:
+- "origin": one link per origin -> USA (yearly total)
+- "grade":  origin -> grade -> USA
+- "month":  one link per origin and month -> USA (monthly sublinks)
+
+max_links caps the number of links: the smallest origins are folded into
+one "Other" node until the diagram fits (as far as possible: "Other"
+itself keeps one link per month or grade).
+"""
+import numpy as np
+import pandas as pd
+
+LEVELS = ("origin", "grade", "month")
+OTHER = "Other"
+
+
+def _codes(values):
+    """(codes, labels) of a column, labels in order of first appearance."""
+    codes, labels = pd.factorize(values, sort=False)
+    return codes, list(labels)
+
+
+def _fold_tail(origin_codes, origins, quantity, links_per_origin, max_links):
+    """Map the smallest origins to OTHER so at most max_links links remain."""
+    totals = np.bincount(origin_codes, weights=quantity, minlength=len(origins))
+    order = np.argsort(-totals, kind="stable")
+    if links_per_origin[order].sum() <= max_links:
+        return origin_codes, origins
+    # Room left for the kept origins once OTHER takes its own links
+    other_links = links_per_origin.max()
+    kept = np.cumsum(links_per_origin[order]) <= max(max_links - other_links, 0)
+    keep = order[kept]
+    remap = np.full(len(origins), len(keep))
+    remap[keep] = np.arange(len(keep))
+    return remap[origin_codes], [origins[i] for i in keep] + [OTHER]
+
+
+def build_sankey_links(df, level="origin", target_name="USA", max_links=None):
+    """
+    Node labels and link arrays for an imports frame.
+
+    df: columns ['originName', 'quantity'] (+ 'gradeName' for level
+    "grade", 'period' for level "month").
+    Returns (nodes, source, target, values); source/target index nodes.
+    """
+    if level not in LEVELS:
+        raise ValueError(f"level must be one of {LEVELS}, got {level!r}")
+    df = df[df["quantity"].notna()]
+    quantity = df["quantity"].to_numpy(dtype="float64")
+    origin_codes, origins = _codes(df["originName"].to_numpy())
+
+    if level == "grade":
+        detail_codes, details = _codes(df["gradeName"].to_numpy())
+    elif level == "month":
+        detail_codes, details = _codes(df["period"].astype(str).str[:7].to_numpy())  # YYYY-MM
+    else:
+        detail_codes, details = np.zeros(len(df), dtype=int), [None]
+    n_detail = len(details)
+
+    if max_links is not None and len(origins):
+        pairs = np.unique(origin_codes * n_detail + detail_codes)
+        links_per_origin = np.bincount(pairs // n_detail, minlength=len(origins))
+        if level == "grade":  # plus the grade -> target links
+            max_links -= n_detail
+        origin_codes, origins = _fold_tail(origin_codes, origins, quantity, links_per_origin, max_links)
+
+    # Sum quantities per (origin, detail) pair
+    flows = np.bincount(origin_codes * n_detail + detail_codes, weights=quantity,
+                        minlength=len(origins) * n_detail)
+    pair = np.flatnonzero(flows)
+    src, det, values = pair // n_detail, pair % n_detail, flows[pair]
+
+    nodes = list(origins)
+    if level == "grade":
+        # origin -> grade, then grade -> target
+        grade_nodes = len(nodes) + np.arange(n_detail)
+        target = len(nodes) + n_detail
+        nodes += list(details) + [target_name]
+        grade_totals = np.bincount(det, weights=values, minlength=n_detail)
+        used = np.flatnonzero(grade_totals)
+        source = np.concatenate((src, grade_nodes[used]))
+        target_idx = np.concatenate((grade_nodes[det], np.full(len(used), target)))
+        values = np.concatenate((values, grade_totals[used]))
+        return nodes, source, target_idx, values
+
+    if target_name not in nodes:
+        nodes.append(target_name)
+    target = nodes.index(target_name)
+    return nodes, src, np.full(len(src), target), values
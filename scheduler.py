@@ -0,0 +1,149 @@
+# scheduler.py
+"""Background refresh of the EIA datasets.
+
+Runs next to the dashboard and keeps data/ fresh without manual fetches:
+prices daily, each S&D activity on its own cadence (incremental fetches,
+EIA publishes these monthly). After a successful fetch the dataset is
+published as a new snapshot (see snapshots.py) and the manifest flipped;
+running dashboards pick the new version up on their next rerun and
+reload only that dataset. Failed jobs are retried after RETRY_SECONDS.
+
+Last run times are kept in data/snapshots/scheduler.json, so a restart
+does not refetch everything.
+
+    python scheduler.py              # run forever
+    python scheduler.py --once       # run the jobs that are due, then exit
+    python scheduler.py --run prices # run one job now
+    python scheduler.py --status
+"""
+import argparse
+import json
+import os
+import time
+import traceback
+
+from snapshots import SNAPSHOT_DIR, snapshots
+
+HOUR = 3600
+DAY = 24 * HOUR
+RETRY_SECONDS = HOUR
+STATE_PATH = os.path.join(SNAPSHOT_DIR, "scheduler.json")
+
+
+# --- Jobs ---
+def _fetch_prices():
+    from fetch_prices import fetch_prices
+    return fetch_prices()
+
+
+def _fetch_activity(name, activity_id):
+    def run():
+        from fetch_activity import fetch_activity
+        return fetch_activity(name, activity_id, incremental=True)
+    return run
+
+
+# job name (= snapshot dataset) -> (cadence in seconds, fetch function returning rows written)
+JOBS = {
+    "prices": (DAY, _fetch_prices),
+    "production": (7 * DAY, _fetch_activity("Production", "1")),
+    "consumption": (7 * DAY, _fetch_activity("Consumption", "2")),
+    "stocks": (14 * DAY, _fetch_activity("Stocks", "5")),
+}
+
+
+# --- State ---
+def load_state(path=STATE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_state(state, path=STATE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def next_due(name, state):
+    """Time the job should run next (0 if it never ran)."""
+    job = state.get(name, {})
+    every = JOBS[name][0]
+    if job.get("error"):
+        return job.get("last_run", 0) + min(every, RETRY_SECONDS)
+    return job.get("last_success", 0) + every
+
+
+def run_job(name, state):
+    """Fetch and publish one dataset; records the outcome in state. Returns the new version or None."""
+    _, fetch = JOBS[name]
+    started = time.time()
+    entry = state.setdefault(name, {})
+    entry["last_run"] = started
+    try:
+        rows = fetch()
+        version = snapshots.publish(name) if rows else None
+    except Exception as exc:  # keep the scheduler alive, retry later
+        entry["error"] = f"{type(exc).__name__}: {exc}"
+        traceback.print_exc()
+        print(f"[scheduler] {name} failed, retry in {RETRY_SECONDS // 60} min")
+        return None
+    entry.update(last_success=started, error=None, rows=rows, seconds=round(time.time() - started, 1))
+    if version:
+        entry["version"] = version
+        print(f"[scheduler] {name}: published {version} ({rows} rows)")
+    else:
+        print(f"[scheduler] {name}: unchanged ({rows} rows)")
+    return version
+
+
+def run_due(state, now=None):
+    """Run every job that is due; returns the names that ran."""
+    now = now or time.time()
+    ran = []
+    for name in JOBS:
+        if next_due(name, state) <= now:
+            run_job(name, state)
+            save_state(state)
+            ran.append(name)
+    return ran
+
+
+def run_forever(poll_seconds=60):
+    state = load_state()
+    while True:
+        run_due(state)
+        wake = min(next_due(name, state) for name in JOBS)
+        time.sleep(min(max(wake - time.time(), 1), poll_seconds))
+
+
+def status(state):
+    for name in JOBS:
+        job = state.get(name, {})
+        due = next_due(name, state)
+        print(f"{name:<12} version {snapshots.versions().get(name, '-'):<28} "
+              f"next {time.strftime('%Y-%m-%d %H:%M', time.localtime(due)) if due else 'now':<16} "
+              f"{'error: ' + job['error'] if job.get('error') else ''}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh and publish the EIA datasets on a schedule.")
+    parser.add_argument("--once", action="store_true", help="run the due jobs and exit")
+    parser.add_argument("--run", choices=list(JOBS), nargs="+", help="run these jobs now and exit")
+    parser.add_argument("--status", action="store_true", help="show versions and next runs")
+    args = parser.parse_args()
+    if args.status:
+        status(load_state())
+    elif args.run:
+        state = load_state()
+        for name in args.run:
+            run_job(name, state)
+        save_state(state)
+    elif args.once:
+        run_due(load_state())
+    else:
+        run_forever()
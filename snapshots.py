@@ -0,0 +1,235 @@
+# snapshots.py
+"""Versioned, immutable snapshots of the fetched datasets.
+
+The fetchers write their outputs into data/ as before. Publishing a
+dataset copies (hard-links where possible) its files into a new version
+directory, data/snapshots/<dataset>/<version>/, laid out like data/, and
+then atomically replaces data/snapshots/current.json, the manifest that
+points every dataset at its current version. A version whose source
+digest equals the current one is not published, so an unchanged refresh
+does not make the dashboards reload anything.
+
+The loaders map their data/ paths through `resolve`, which returns the
+file inside the dataset's current version (or the data/ path itself when
+the dataset has never been published). Once a dataset is published,
+readers only see new data through a new version: the scheduler publishes
+after each fetch, and a manual `python fetch_prices.py` /
+`python fetch_activity.py` run publishes the datasets it wrote through
+`publish_if_tracked`. Version directories are never
+modified after publication, so a reader holding an older version keeps
+reading consistent files while a newer one is flipped in; the last KEEP
+versions of every dataset are kept on disk.
+
+`python snapshots.py` lists the current versions, `python snapshots.py
+publish prices` publishes data/ as it is.
+"""
+import argparse
+import contextvars
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # no inter-process lock (Windows): a single publisher is assumed
+    fcntl = None
+
+DATA_DIR = "data"
+SNAPSHOT_DIR = os.path.join(DATA_DIR, "snapshots")
+MANIFEST = "current.json"
+KEEP = 3  # versions kept per dataset, for readers still on an older one
+
+# Dataset -> its files and directories, relative to data/. The first entry is
+# the source file the version digest is computed from; the others derive from it.
+DATASETS = {
+    "prices": ["prices.csv", os.path.join("parquet", "prices"), "spot_derived.parquet",
+               os.path.join("kpi", "prices.csv")],
+    "production": ["production.csv", os.path.join("parquet", "production"), os.path.join("kpi", "production.csv")],
+    "consumption": ["consumption.csv", os.path.join("parquet", "consumption"), os.path.join("kpi", "consumption.csv")],
+    "stocks": ["stocks.csv", os.path.join("parquet", "stocks"), os.path.join("kpi", "stocks.csv")],
+}
+
+_pinned = contextvars.ContextVar("oil_dash_manifest", default=None)
+
+
+def file_digest(path, chunk=1 << 20):
+    """sha1 of a file's content."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _link_or_copy(src, dst):
+    """Hard-link src to dst (files are only ever replaced, never edited in place), else copy."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)  # keeps mtime, which spot_derived checks
+    return dst
+
+
+class SnapshotStore:
+    """Publish dataset versions and resolve data/ paths to the current ones."""
+
+    def __init__(self, root=SNAPSHOT_DIR, data_dir=DATA_DIR, keep=KEEP):
+        self.root = root
+        self.data_dir = data_dir
+        self.keep = keep
+        self._cached = (None, {})  # (manifest file signature, manifest)
+        self._lock = threading.Lock()
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.root, MANIFEST)
+
+    # --- Manifest ---
+    def current(self):
+        """The manifest {"datasets": {name: {version, digest, published_at}}}; {} if none."""
+        try:
+            st = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return {}
+        sig = (st.st_ino, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            if self._cached[0] == sig:
+                return self._cached[1]
+        # The file is only ever replaced whole, so this never sees a partial write
+        with open(self.manifest_path) as f:
+            manifest = json.load(f)
+        with self._lock:
+            self._cached = (sig, manifest)
+        return manifest
+
+    def versions(self):
+        """{dataset: current version}."""
+        return {name: entry["version"] for name, entry in self.current().get("datasets", {}).items()}
+
+    @contextmanager
+    def pinned(self):
+        """Resolve every path inside the block against one manifest (no mixed versions)."""
+        if _pinned.get() is not None:
+            yield _pinned.get()
+            return
+        token = _pinned.set(self.current())
+        try:
+            yield _pinned.get()
+        finally:
+            _pinned.reset(token)
+
+    def resolve(self, path):
+        """Path of a data/ file inside its dataset's current version, else path unchanged."""
+        rel = os.path.relpath(os.path.abspath(path), os.path.abspath(self.data_dir))
+        if rel.startswith(os.pardir):
+            return path
+        manifest = _pinned.get()
+        if manifest is None:
+            manifest = self.current()
+        entries = manifest.get("datasets", {})
+        for name, files in DATASETS.items():
+            if name in entries and any(rel == f or rel.startswith(f + os.sep) for f in files):
+                return os.path.join(self.root, name, entries[name]["version"], rel)
+        return path
+
+    # --- Publish ---
+    @contextmanager
+    def _publish_lock(self):
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, ".lock"), "w") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def publish(self, name, source_dir=None):
+        """
+        Snapshot dataset `name` from source_dir (default data/) and make it current.
+
+        Returns the new version, or None when the source is missing or has
+        the same digest as the current version.
+        """
+        source_dir = source_dir or self.data_dir
+        files = DATASETS[name]
+        source = os.path.join(source_dir, files[0])
+        if not os.path.exists(source):
+            return None
+        digest = file_digest(source)
+        with self._publish_lock():
+            manifest = self.current()
+            entry = manifest.get("datasets", {}).get(name)
+            if entry is not None and entry["digest"] == digest:
+                return None
+
+            version = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime()) + "-" + digest[:8]
+            folder = os.path.join(self.root, name)
+            tmp = os.path.join(folder, f".{version}.tmp-{os.getpid()}")
+            shutil.rmtree(tmp, ignore_errors=True)
+            for rel in files:
+                src, dst = os.path.join(source_dir, rel), os.path.join(tmp, rel)
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                if os.path.isdir(src):
+                    shutil.copytree(src, dst, copy_function=_link_or_copy)
+                elif os.path.exists(src):
+                    _link_or_copy(src, dst)
+            os.replace(tmp, os.path.join(folder, version))
+
+            # Flip the pointer: one atomic replace of the manifest
+            datasets = dict(manifest.get("datasets", {}))
+            datasets[name] = {"version": version, "digest": digest, "published_at": time.time()}
+            tmp_manifest = f"{self.manifest_path}.tmp-{os.getpid()}"
+            with open(tmp_manifest, "w") as f:
+                json.dump({"datasets": datasets, "updated_at": time.time()}, f, indent=2)
+            os.replace(tmp_manifest, self.manifest_path)
+            self.prune(name, keep_version=version)
+        return version
+
+    def publish_if_tracked(self, name):
+        """
+        Publish `name` if readers resolve it through the manifest (it was
+        published before), so a refresh of data/ outside the scheduler is
+        not hidden behind the older version. Returns the new version or None.
+        """
+        if name not in self.versions():
+            return None
+        return self.publish(name)
+
+    def history(self, name):
+        """Published versions of a dataset, oldest first."""
+        folder = os.path.join(self.root, name)
+        if not os.path.isdir(folder):
+            return []
+        return sorted(v for v in os.listdir(folder) if not v.startswith("."))
+
+    def prune(self, name, keep_version=None):
+        """Remove all but the newest `keep` versions (never the current one)."""
+        current = keep_version or self.versions().get(name)
+        for version in self.history(name)[:-self.keep]:
+            if version != current:
+                shutil.rmtree(os.path.join(self.root, name, version), ignore_errors=True)
+
+
+# Shared by the loaders and the scheduler of this process
+snapshots = SnapshotStore()
+
+
+def resolve(path):
+    """data/ path -> the same file in its dataset's current snapshot."""
+    return snapshots.resolve(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List or publish dataset snapshots.")
+    parser.add_argument("command", choices=["list", "publish"], nargs="?", default="list")
+    parser.add_argument("datasets", nargs="*", help=f"datasets to publish (default all: {', '.join(DATASETS)})")
+    args = parser.parse_args()
+    if args.command == "publish":
+        for name in args.datasets or DATASETS:
+            version = snapshots.publish(name)
+            print(f"{name}: {version or 'unchanged'}")
+    else:
+        for name, version in sorted(snapshots.versions().items()):
+            print(f"{name}: {version} ({len(snapshots.history(name))} kept)")
@@ -0,0 +1,148 @@
+# snd_matrix.py
+"""Aligned period x country matrices of the Supply & Demand datasets.
+
+Built once per version of production / consumption / stocks (see
+utils.load_snd_matrix). All activities share one monthly period axis
+(every month from the first to the last observation, so a 12-row shift is
+a year) and one country axis; a value is NaN where a country does not
+report. Country groupings (OPEC members, G7, ...) are boolean membership
+masks over the country axis, summed with one matrix product, and appear as
+extra columns next to the countries.
+
+The production - consumption balance, year-over-year changes and trailing
+12-month means are computed in __init__ for every activity and column at
+once, so the page's sections only index rows and columns.
+"""
+import numpy as np
+import pandas as pd
+
+from data_cache import derived
+
+ACTIVITIES = ["Production", "Consumption", "Stocks"]
+BALANCE = "Balance"
+# EIA regional aggregates reported as countryRegionId; never summed into groups
+AGGREGATES = {"OPEC", "OPNO", "OPSA", "OPAF"}
+# Group -> member countryRegionIds (None = every reporting country)
+GROUPS = {
+    "OPEC members": ["DZA", "COG", "GNQ", "GAB", "IRN", "IRQ", "KWT", "LBY", "NGA", "SAU", "ARE", "VEN"],
+    "OPEC+ partners": ["AZE", "BHR", "BRN", "KAZ", "MYS", "MEX", "OMN", "RUS", "SSD", "SDN"],
+    "G7": ["CAN", "FRA", "DEU", "ITA", "JPN", "GBR", "USA"],
+    "All countries": None,
+}
+MEASURES = ["level", "yoy", "yoy_pct", "ttm"]
+WINDOW = 12  # months of the trailing mean and the year-over-year shift
+
+
+class SndMatrix:
+    """Period x column matrices per activity and measure, columns = countries + groups."""
+
+    def __init__(self, frames, groups=GROUPS):
+        """frames: activity -> long (period, countryRegionId, value) rows."""
+        frames = {name: df[df["value"].notna() & df["period"].notna()] for name, df in frames.items()}
+        stamps = [df["period"] for df in frames.values() if len(df)]
+        start = min(s.min() for s in stamps) if stamps else pd.Timestamp("2000-01-01")
+        end = max(s.max() for s in stamps) if stamps else start
+        self.periods = pd.date_range(start.to_period("M").to_timestamp(), end, freq="MS")
+        self.countries = sorted(set().union(*(df["countryRegionId"].unique() for df in frames.values())))
+        country_pos = pd.Index(self.countries)
+
+        # Membership masks: (group, country)
+        self.groups = list(groups)
+        self.masks = np.zeros((len(self.groups), len(self.countries)), dtype=bool)
+        for g, members in enumerate(groups.values()):
+            if members is None:
+                self.masks[g] = ~np.isin(self.countries, list(AGGREGATES))
+            else:
+                self.masks[g] = np.isin(self.countries, members)
+        self.columns = self.countries + self.groups
+        self._column_pos = {name: i for i, name in enumerate(self.columns)}
+
+        # Levels: (activity, period, country), then group sums of the reporting members
+        self.activities = list(frames)
+        levels = np.full((len(self.activities), len(self.periods), len(self.countries)), np.nan)
+        for a, df in enumerate(frames.values()):
+            rows = self.periods.get_indexer(df["period"].dt.to_period("M").dt.to_timestamp())
+            cols = country_pos.get_indexer(df["countryRegionId"])
+            levels[a, rows, cols] = df["value"].to_numpy(dtype="float64")
+        levels = np.concatenate((levels, self._group_sums(levels)), axis=2)
+        if "Production" in frames and "Consumption" in frames:
+            balance = levels[self.activities.index("Production")] - levels[self.activities.index("Consumption")]
+            levels = np.concatenate((levels, balance[None]), axis=0)
+            self.activities.append(BALANCE)
+
+        # Derived measures over every activity and column in one pass
+        self.data = {"level": levels, "ttm": _trailing_mean(levels, WINDOW)}
+        prev = np.full_like(levels, np.nan)
+        prev[:, WINDOW:] = levels[:, :-WINDOW]
+        self.data["yoy"] = levels - prev
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.data["yoy_pct"] = self.data["yoy"] / np.abs(prev) * 100
+        self.reported = ~np.isnan(levels)  # (activity, period, column)
+        self._activity_pos = {name: i for i, name in enumerate(self.activities)}
+
+    def _group_sums(self, levels):
+        """(activity, period, group) sums over the reporting members; NaN when none reports."""
+        reported = ~np.isnan(levels)
+        sums = np.where(reported, levels, 0.0) @ self.masks.T
+        counts = reported.astype("float64") @ self.masks.T
+        sums[counts == 0] = np.nan
+        return sums
+
+    def __sizeof__(self):
+        return sum(a.nbytes for a in self.data.values()) + self.reported.nbytes + self.masks.nbytes
+
+    # --- Selection ---
+    def column_index(self, names):
+        """Positions of the known columns among names (unknown names dropped)."""
+        return [self._column_pos[n] for n in names if n in self._column_pos]
+
+    def available(self, activity=None):
+        """Columns with at least one value (in activity, or in any activity)."""
+        reported = self.reported if activity is None else self.reported[[self._activity_pos[activity]]]
+        has = reported.any(axis=(0, 1))
+        return [name for name, ok in zip(self.columns, has) if ok]
+
+    def last_row(self, activity, columns=None):
+        """Index of the latest period with a value in activity (among columns), or -1."""
+        reported = self.reported[self._activity_pos[activity]]
+        if columns is not None:
+            reported = reported[:, self.column_index(columns)]
+        rows = np.flatnonzero(reported.any(axis=1))
+        return int(rows[-1]) if len(rows) else -1
+
+    @derived
+    def frame(self, activity, columns, measure="level", start=None):
+        """Wide period x column frame of one measure from start to the activity's latest period.
+
+        Columns without any value in the window are dropped.
+        """
+        a, cols = self._activity_pos[activity], self.column_index(columns)
+        end = self.last_row(activity, columns) + 1
+        first = self.periods.searchsorted(pd.Timestamp(start)) if start is not None else 0
+        first = min(first, end)
+        block = self.data[measure][a, first:end][:, cols]
+        keep = ~np.isnan(block).all(axis=0)
+        return pd.DataFrame(block[:, keep], index=self.periods[first:end],
+                            columns=[self.columns[c] for c, k in zip(cols, keep) if k])
+
+    @derived
+    def latest(self, activity, columns, measure="ttm"):
+        """One measure per column at the latest period any of columns reports, largest first."""
+        a, cols = self._activity_pos[activity], self.column_index(columns)
+        row = self.last_row(activity, columns)
+        if row < 0:
+            return pd.Series(dtype="float64")
+        values = self.data[measure][a, row, cols]
+        order = [i for i in np.argsort(-values, kind="stable") if not np.isnan(values[i])]
+        return pd.Series(values[order], index=[self.columns[cols[i]] for i in order])
+
+
+def _trailing_mean(x, k):
+    """Mean of the non-NaN values in the last k rows (axis 1), NaN when there are none."""
+    reported = ~np.isnan(x)
+    sums = np.cumsum(np.where(reported, x, 0.0), axis=1)
+    counts = np.cumsum(reported, axis=1)
+    sums[:, k:] -= sums[:, :-k].copy()
+    counts[:, k:] -= counts[:, :-k].copy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
@@ -0,0 +1,186 @@
+# spot_derived.py
+"""Derived spot-price series, materialized at ingest time.
+
+`update_derived` runs right after fetch_prices and writes one typed,
+versioned artifact (data/spot_derived.parquet) with the date-aligned
+Brent, WTI and Brent-WTI spread series and their percent changes and
+daily returns. When the new prices only append periods after the last
+derived one, only the new rows are derived (seeded with the last stored
+values) instead of recomputing the full history.
+
+`load_derived` is what utils.load_spot_data maps in; it only reads, and
+derives in memory when the artifact is missing, stale or pyarrow is not
+installed (the dashboard never writes into data/ or a published snapshot).
+"""
+import json
+import os
+
+import pandas as pd
+
+from storage import read_parquet
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # derive in memory on every load
+    pa = None
+    pq = None
+
+SCHEMA_VERSION = 1
+DERIVED_PATH = os.path.join("data", "spot_derived.parquet")
+META_KEY = b"spot_derived"
+
+# Output column prefix -> EIA product code
+SERIES = {"brent": "EPCBRENT", "wti": "EPCWTI"}
+
+
+# --- Source prices ---
+def read_prices(prices_path):
+    """Long prices frame (period, product, value) for the derived products."""
+    cols = ["period", "product", "value"]
+    prices = read_parquet(prices_path, columns=cols, filters=[("product", "in", list(SERIES.values()))])
+    if prices is None:
+        prices = pd.read_csv(prices_path, usecols=cols)
+        prices["period"] = pd.to_datetime(prices["period"], errors="coerce")
+        prices["value"] = pd.to_numeric(prices["value"], errors="coerce")
+    prices["product"] = prices["product"].astype(str)
+    prices["period"] = prices["period"].astype("datetime64[ns]")  # same hash from CSV or Parquet
+    prices = prices[prices["product"].isin(SERIES.values())]
+    return prices.sort_values(["period", "product"], kind="stable").reset_index(drop=True)
+
+
+def _source_signature(prices_path):
+    st = os.stat(prices_path)
+    return {"source_mtime_ns": st.st_mtime_ns, "source_size": st.st_size}
+
+
+def _is_current(meta, prices_path):
+    """Whether artifact metadata was written from prices_path as it is now."""
+    return all(meta.get(k) == v for k, v in _source_signature(prices_path).items())
+
+
+def _hash(prices):
+    return int(pd.util.hash_pandas_object(prices, index=False).sum())
+
+
+# --- Derivation ---
+def _pct(values, prev=None):
+    """Period-over-period change of values, continuing from `prev` if given."""
+    shifted = values.shift(1)
+    if prev is not None and len(values):
+        shifted.iloc[0] = prev
+    return values / shifted - 1
+
+
+def derive(prices, seed=None):
+    """
+    Wide, date-aligned frame of derived series for a long prices frame.
+
+    seed: last stored row per series ({"brent": value, ..., "spread": value})
+    to continue the changes of an existing artifact from.
+    """
+    seed = seed or {}
+    wide = prices.pivot(index="period", columns="product", values="value")
+    present = prices.assign(_row=True).pivot(index="period", columns="product", values="_row")
+    out = pd.DataFrame({"period": wide.index})
+
+    for name, product in SERIES.items():
+        values = wide[product].reset_index(drop=True) if product in wide else pd.Series(float("nan"), index=out.index)
+        has = present[product].notna().reset_index(drop=True) if product in present \
+            else pd.Series(False, index=out.index)
+        pct = _pct(values[has], seed.get(name))
+        out[name] = values
+        out[f"has_{name}"] = has
+        out[f"{name}_returns"] = (pct * 100).reindex(out.index)
+        out[f"{name}_change"] = out[f"{name}_returns"].round(2)
+
+    spread = out["brent"] - out["wti"]
+    if "spread" in seed and len(spread) and pd.isna(spread.iloc[0]):
+        spread.iloc[0] = seed["spread"]
+    out["spread"] = spread.ffill()
+    pct = _pct(out["spread"], seed.get("spread"))
+    out["spread_returns"] = pct * 100
+    out["spread_change"] = out["spread_returns"].round(2)
+    return out
+
+
+def _seed(derived):
+    """Last stored value of each series, to continue changes from."""
+    seed = {}
+    for name in SERIES:
+        rows = derived.loc[derived[f"has_{name}"], name]
+        if len(rows):
+            seed[name] = rows.iloc[-1]
+    if len(derived):
+        seed["spread"] = derived["spread"].iloc[-1]
+    return seed
+
+
+# --- Artifact ---
+def read_artifact(path=DERIVED_PATH):
+    """Return (derived frame, metadata) or (None, None)."""
+    if pq is None or not os.path.exists(path):
+        return None, None
+    table = pq.read_table(path)
+    meta = json.loads((table.schema.metadata or {}).get(META_KEY, b"{}"))
+    if meta.get("schema_version") != SCHEMA_VERSION:
+        return None, None
+    return table.to_pandas(), meta
+
+
+def write_artifact(derived, meta, path=DERIVED_PATH):
+    """Atomically write the derived frame with its metadata."""
+    if pq is None:
+        return None
+    table = pa.Table.from_pandas(derived, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[META_KEY] = json.dumps(meta).encode()
+    table = table.replace_schema_metadata(metadata)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+    return path
+
+
+def update_derived(prices_path, path=DERIVED_PATH):
+    """
+    Bring the derived artifact up to date with prices_path and return it.
+
+    Appended periods are derived incrementally; any other change to the
+    source (revisions, deletions) triggers a full recompute.
+    """
+    derived, meta = read_artifact(path)
+    if derived is not None and _is_current(meta, prices_path):
+        return derived
+
+    prices = read_prices(prices_path)
+    mode = "full"
+    if derived is not None and meta.get("last_period"):
+        last = pd.Timestamp(meta["last_period"])
+        old = prices[prices["period"] <= last]
+        if len(old) == meta.get("source_rows") and _hash(old) == meta.get("source_hash"):
+            new = prices[prices["period"] > last]
+            if len(new):
+                derived = pd.concat([derived, derive(new, _seed(derived))], ignore_index=True)
+            mode = "append"
+    if mode == "full":
+        derived = derive(prices)
+
+    meta = {
+        "schema_version": SCHEMA_VERSION,
+        **_source_signature(prices_path),
+        "source_rows": len(prices),
+        "source_hash": _hash(prices),
+        "last_period": str(prices["period"].max()) if len(prices) else None,
+        "mode": mode,
+    }
+    write_artifact(derived, meta, path)
+    return derived
+
+
+def load_derived(prices_path, path=DERIVED_PATH):
+    """Derived frame for prices_path, from the artifact when it is current (never writes it)."""
+    derived, meta = read_artifact(path)
+    if derived is not None and _is_current(meta, prices_path):
+        return derived
+    return derive(read_prices(prices_path))
@@ -0,0 +1,193 @@
+# spot_engine.py
+"""Date-aligned matrix of any number of EIA spot price series.
+
+SPOT_SERIES configures the series the fetcher requests and the Spot
+Analysis page shows; COMBINATIONS configures spreads and crack-style
+spreads as weights over those series. SpotEngine pivots the long prices
+frame once into a (date, series) array with one column per configured
+series that has data (NaN where a series has no print that day).
+
+Combinations are converted to $/BBL and computed for every date with one
+matrix product; any pair of series, or all of them, can be differenced
+the same way (SpotEngine.spreads / spread_matrix). Per-series frames
+(period, value, change, returns) follow spot_derived: changes are taken
+between a series' own consecutive prints, and a combination carries its
+last value over days where a leg has no print.
+"""
+import numpy as np
+import pandas as pd
+
+from data_cache import derived
+from storage import read_parquet
+
+GALLONS_PER_BARREL = 42
+
+# Key -> EIA series id, product code (identifies the rows of files written
+# without a series column), page header, short name (legends, widget keys), unit.
+# Daily spot prices of the EIA petroleum/pri/spt dataset.
+SPOT_SERIES = {
+    "wti": {"series": "RWTC", "product": "EPCWTI", "label": "WTI Crude Oil", "short": "WTI", "unit": "$/BBL"},
+    "brent": {"series": "RBRTE", "product": "EPCBRENT", "label": "Brent Crude Oil", "short": "Brent", "unit": "$/BBL"},
+    "gasoline_nyh": {"series": "EER_EPMRU_PF4_Y35NY_DPG", "label": "NY Harbor Conventional Gasoline",
+                     "short": "NYH Gasoline", "unit": "$/GAL"},
+    "gasoline_usgc": {"series": "EER_EPMRU_PF4_RGC_DPG", "label": "US Gulf Coast Conventional Gasoline",
+                      "short": "USGC Gasoline", "unit": "$/GAL"},
+    "rbob_la": {"series": "EER_EPMRR_PF4_Y05LA_DPG", "label": "Los Angeles RBOB Gasoline",
+                "short": "LA RBOB", "unit": "$/GAL"},
+    "heating_oil_nyh": {"series": "EER_EPD2F_PF4_Y35NY_DPG", "label": "NY Harbor No. 2 Heating Oil",
+                        "short": "NYH Heating Oil", "unit": "$/GAL"},
+    "ulsd_nyh": {"series": "EER_EPD2DXL0_PF4_Y35NY_DPG", "label": "NY Harbor Ultra-Low Sulfur Diesel",
+                 "short": "NYH ULSD", "unit": "$/GAL"},
+    "ulsd_usgc": {"series": "EER_EPD2DXL0_PF4_RGC_DPG", "label": "US Gulf Coast Ultra-Low Sulfur Diesel",
+                  "short": "USGC ULSD", "unit": "$/GAL"},
+    "ulsd_la": {"series": "EER_EPD2DXL0_PF4_Y05LA_DPG", "label": "Los Angeles CARB Diesel",
+                "short": "LA Diesel", "unit": "$/GAL"},
+    "jet_usgc": {"series": "EER_EPJK_PF4_RGC_DPG", "label": "US Gulf Coast Kerosene-Type Jet Fuel",
+                 "short": "USGC Jet", "unit": "$/GAL"},
+    "propane_mb": {"series": "EER_EPLLPA_PF4_Y44MB_DPG", "label": "Mont Belvieu Propane",
+                   "short": "Propane", "unit": "$/GAL"},
+}
+
+# Key -> header, short name and {series key: weight}; values in $/BBL
+COMBINATIONS = {
+    "spread": {"label": "Brent - WTI Spread", "short": "Spread", "legs": {"brent": 1, "wti": -1}},
+    "crack_321": {"label": "3-2-1 Crack Spread (NYH vs WTI)", "short": "3-2-1 Crack",
+                  "legs": {"gasoline_nyh": 2 / 3, "ulsd_nyh": 1 / 3, "wti": -1}},
+    "gasoline_crack": {"label": "Gasoline Crack (NYH vs Brent)", "short": "Gasoline Crack",
+                       "legs": {"gasoline_nyh": 1, "brent": -1}},
+    "diesel_crack": {"label": "Diesel Crack (NYH ULSD vs Brent)", "short": "Diesel Crack",
+                     "legs": {"ulsd_nyh": 1, "brent": -1}},
+    "jet_crack": {"label": "Jet Crack (USGC vs Brent)", "short": "Jet Crack", "legs": {"jet_usgc": 1, "brent": -1}},
+}
+
+PRICE_COLUMNS = ["period", "product", "series", "value"]
+
+
+# --- Source prices ---
+def read_spot_prices(prices_path):
+    """Long (period, series, value) frame of prices_path; series ids filled in from products if missing."""
+    prices = read_parquet(prices_path)
+    if prices is None:
+        prices = pd.read_csv(prices_path, usecols=lambda c: c in PRICE_COLUMNS)
+    prices = prices.reindex(columns=PRICE_COLUMNS)
+    by_product = {cfg["product"]: cfg["series"] for cfg in SPOT_SERIES.values() if "product" in cfg}
+    series = prices["series"].astype(object).where(prices["series"].notna(),
+                                                   prices["product"].astype(str).map(by_product))
+    return pd.DataFrame({
+        "period": pd.to_datetime(prices["period"], errors="coerce"),
+        "series": series,
+        "value": pd.to_numeric(prices["value"], errors="coerce"),
+    })
+
+
+def _ffill(x):
+    """Forward fill NaNs down axis 0 of a 2-D array."""
+    rows = np.where(np.isnan(x), 0, np.arange(len(x))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return np.take_along_axis(x, rows, axis=0)
+
+
+def _changes(values, present):
+    """Change in % from each value's previous print (NaN where there is no print)."""
+    prev = np.full_like(values, np.nan)
+    prev[1:] = _ffill(values)[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(present, (values / prev - 1) * 100, np.nan)
+
+
+class SpotEngine:
+    """(date, series) price matrix with combinations and pairwise spreads."""
+
+    def __init__(self, prices, series=SPOT_SERIES, combinations=COMBINATIONS):
+        prices = prices[prices["period"].notna() & prices["value"].notna()]
+        by_id = {cfg["series"]: key for key, cfg in series.items()}
+        prices = prices[prices["series"].isin(by_id)]
+        date_idx, dates = pd.factorize(prices["period"], sort=True)
+        self.dates = pd.DatetimeIndex(dates)
+        reported = set(prices["series"].unique())
+        self.keys = [key for key, cfg in series.items() if cfg["series"] in reported]
+        self._configs = {key: {"key": key, **series[key]} for key in self.keys}
+        self._pos = {key: i for i, key in enumerate(self.keys)}
+        col_idx = pd.Index([series[k]["series"] for k in self.keys]).get_indexer(prices["series"])
+
+        self.values = np.full((len(self.dates), len(self.keys)), np.nan)
+        self.values[date_idx, col_idx] = prices["value"].to_numpy(dtype="float64")
+        self.present = ~np.isnan(self.values)
+        self.per_barrel = np.array([GALLONS_PER_BARREL if series[k]["unit"] == "$/GAL" else 1.0
+                                    for k in self.keys])
+        self.barrels = self.values * self.per_barrel  # every series in $/BBL
+        self.returns = _changes(self.values, self.present)
+        # Row of each series' last print up to every date (-1 before its first)
+        self.last_print = np.where(self.present, np.arange(len(self.dates))[:, None], -1)
+        np.maximum.accumulate(self.last_print, axis=0, out=self.last_print)
+
+        # Combinations whose legs all have data: (combination, series) weights
+        self.combination_keys = [key for key, cfg in combinations.items()
+                                 if all(leg in self._pos for leg in cfg["legs"])]
+        self.weights = np.zeros((len(self.combination_keys), len(self.keys)))
+        for c, key in enumerate(self.combination_keys):
+            cfg = combinations[key]
+            self._configs[key] = {"key": key, "unit": "$/BBL", **cfg}
+            for leg, weight in cfg["legs"].items():
+                self.weights[c, self._pos[leg]] = weight
+        raw = np.nan_to_num(self.barrels) @ self.weights.T
+        complete = (~self.present).astype("float64") @ (self.weights != 0).T == 0
+        self.combined = _ffill(np.where(complete, raw, np.nan))
+        self.combined_present = ~np.isnan(self.combined)
+        self.combined_returns = _changes(self.combined, self.combined_present)
+        self._combo_pos = {key: i for i, key in enumerate(self.combination_keys)}
+        self._frames = {}
+
+    def __sizeof__(self):
+        arrays = (self.values, self.barrels, self.returns, self.last_print, self.combined, self.combined_returns)
+        return sum(a.nbytes for a in arrays) + sum(f.memory_usage().sum() for f in self._frames.values())
+
+    # --- Configuration ---
+    def available(self):
+        """Keys of the series and combinations with data, series first."""
+        return self.keys + self.combination_keys
+
+    def config(self, key):
+        """Config dict (key, label, short, unit, ...) of a series or combination."""
+        return self._configs[key]
+
+    # --- Series ---
+    @derived
+    def frame(self, key):
+        """(period, value, change, returns) rows of one series or combination, built once."""
+        df = self._frames.get(key)
+        if df is None:
+            if key not in self._configs:
+                raise KeyError(f"unknown spot series {key!r}")
+            if key in self._pos:
+                i = self._pos[key]
+                rows, values, returns = self.present[:, i], self.values[:, i], self.returns[:, i]
+            else:
+                i = self._combo_pos[key]
+                rows, values = self.combined_present[:, i], self.combined[:, i]
+                returns = self.combined_returns[:, i]
+            df = pd.DataFrame({"period": self.dates[rows], "value": values[rows],
+                               "change": np.round(returns[rows], 2), "returns": returns[rows]})
+            self._frames[key] = df
+        return df
+
+    def latest_date(self):
+        return self.dates[-1] if len(self.dates) else None
+
+    # --- Spreads ---
+    def spreads(self, pairs):
+        """(date, pair) matrix of a - b in $/BBL for [(a, b), ...] series keys."""
+        a = [self._pos[x] for x, _ in pairs]
+        b = [self._pos[y] for _, y in pairs]
+        return self.barrels[:, a] - self.barrels[:, b]
+
+    @derived
+    def spread_matrix(self, keys=None, date=None):
+        """All-pairs row - column spreads in $/BBL of each series' last print up to date."""
+        keys = keys if keys is not None else self.keys
+        cols = [self._pos[k] for k in keys if k in self._pos]
+        end = self.dates.searchsorted(pd.Timestamp(date), side="right") if date is not None else len(self.dates)
+        rows = self.last_print[end - 1, cols] if end else np.full(len(cols), -1)
+        last = np.where(rows >= 0, self.barrels[rows, cols], np.nan)
+        labels = [self._configs[self.keys[c]]["short"] for c in cols]
+        return pd.DataFrame(last[:, None] - last[None, :], index=labels, columns=labels)
@@ -0,0 +1,155 @@
+# storage.py
+"""Columnar (Parquet) storage for the datasets in data/.
+
+Fetchers write each dataset twice: the CSV that has always been there and
+a hive-partitioned Parquet dataset under data/parquet/<name>/ with typed
+columns (datetime period, float value, dictionary-encoded strings). The
+loaders read the Parquet copy when it exists, selecting only the columns
+they need and pushing row filters down to the reader, and fall back to the
+CSV otherwise (or when pyarrow is not installed).
+
+Run `python storage.py` to build the Parquet copies from the current CSVs.
+"""
+import csv
+import os
+import shutil
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # CSV-only mode
+    pa = None
+    pq = None
+
+# Partition column per dataset (file stem in data/)
+PARTITIONS = {
+    "production": ["productName"],
+    "consumption": ["productName"],
+    "stocks": ["productName"],
+    "prices": ["product"],
+}
+# Sort order inside each partition, keeps row-group statistics tight
+SORT_KEYS = {
+    "prices": ["period"],
+}
+DEFAULT_SORT = ["countryRegionId", "period"]
+
+
+def parquet_path(csv_path):
+    """data/production.csv -> data/parquet/production"""
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(os.path.dirname(csv_path), "parquet", stem)
+
+
+def has_parquet(csv_path):
+    return pq is not None and os.path.isdir(parquet_path(csv_path))
+
+
+# --- Write ---
+def write_parquet(df, csv_path, partition_cols=None):
+    """
+    Write df as a partitioned Parquet dataset next to csv_path.
+
+    The dataset is built in a temporary directory and swapped in once
+    complete. Returns the dataset path, or None when pyarrow is missing.
+    """
+    if pq is None or df.empty:
+        return None
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    if partition_cols is None:
+        partition_cols = PARTITIONS.get(stem, [])
+
+    df = df.copy()
+    if "period" in df.columns:
+        df["period"] = pd.to_datetime(df["period"], errors="coerce")
+    if "value" in df.columns:
+        df["value"] = pd.to_numeric(df["value"], errors="coerce").astype("float64")
+    sort_cols = [c for c in SORT_KEYS.get(stem, DEFAULT_SORT) if c in df.columns]
+    if sort_cols:
+        df = df.sort_values(sort_cols, kind="stable")
+    # Strings -> dictionary-encoded columns
+    for col in df.select_dtypes(include=["object", "string"]).columns:
+        df[col] = df[col].astype("category")
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    root = parquet_path(csv_path)
+    tmp = root + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    pq.write_to_dataset(table, tmp, partition_cols=partition_cols or None)
+    _swap_in(tmp, root)
+    return root
+
+
+def write_parquet_from_csv(csv_path, partition_cols=None, block_size=1 << 20):
+    """
+    Stream csv_path into its partitioned Parquet dataset block by block.
+
+    Memory stays at roughly one CSV block regardless of the file size.
+    Returns the dataset path, or None when pyarrow is missing or the CSV
+    has no rows.
+    """
+    if pq is None or not os.path.exists(csv_path):
+        return None
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    if partition_cols is None:
+        partition_cols = PARTITIONS.get(stem, [])
+
+    with open(csv_path, encoding="utf-8", newline="") as fh:
+        reader = csv.reader(fh)
+        names = next(reader, None)
+        if not names or next(reader, None) is None:
+            return None
+    # Everything but period/value stays string, whatever the first block looks like
+    column_types = {name: pa.string() for name in names}
+    column_types.update({"period": pa.timestamp("us"), "value": pa.float64()})
+    reader = pacsv.open_csv(
+        csv_path,
+        read_options=pacsv.ReadOptions(block_size=block_size),
+        convert_options=pacsv.ConvertOptions(column_types=column_types, strings_can_be_null=True),
+    )
+
+    root = parquet_path(csv_path)
+    tmp = root + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    ds.write_dataset(reader, tmp, format="parquet",
+                     partitioning=partition_cols or None, partitioning_flavor="hive")
+    _swap_in(tmp, root)
+    return root
+
+
+def _swap_in(tmp, root):
+    """Replace the dataset directory `root` with the finished `tmp` one."""
+    old = root + ".old"
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.isdir(root):
+        os.replace(root, old)
+    os.replace(tmp, root)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+# --- Read ---
+def read_parquet(csv_path, columns=None, filters=None):
+    """
+    Read the Parquet copy of csv_path, or return None if there is none.
+
+    columns: list of columns to load (None = all)
+    filters: pyarrow filter list, e.g. [("value", ">", 0)], applied to
+             partitions and row groups before decoding
+    """
+    if not has_parquet(csv_path):
+        return None
+    table = pq.read_table(parquet_path(csv_path), columns=columns, filters=filters)
+    return table.to_pandas()
+
+
+if __name__ == "__main__":
+    data_dir = "data"
+    for stem in PARTITIONS:
+        path = os.path.join(data_dir, f"{stem}.csv")
+        if os.path.exists(path):
+            out = write_parquet(pd.read_csv(path), path)
+            print(f"{path} -> {out}")
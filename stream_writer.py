@@ -0,0 +1,79 @@
+# stream_writer.py
+"""Bounded-memory output for the fetchers.
+
+Pages are type-converted and appended to a temporary file as they arrive;
+the temporary file is renamed over the target only when the whole run
+succeeded, so a running dashboard never reads a half-written data/*.csv.
+"""
+import os
+import sys
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class AtomicCSVWriter:
+    """
+    Append DataFrame chunks to `path` through a temporary file.
+
+        with AtomicCSVWriter("data/prices.csv") as out:
+            for chunk in chunks:
+                out.write(chunk)
+
+    The column order is fixed by `columns` or the first chunk. On error (or
+    when nothing was written and replace_if_empty is False) the temporary
+    file is removed and the target is left untouched.
+    """
+
+    def __init__(self, path, columns=None, replace_if_empty=True):
+        self.path = path
+        self.replace_if_empty = replace_if_empty
+        self.tmp_path = f"{path}.tmp-{os.getpid()}"
+        self.columns = list(columns) if columns is not None else None
+        self.rows = 0
+        self._fh = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._fh = open(self.tmp_path, "w", newline="", encoding="utf-8")
+        return self
+
+    def write(self, df):
+        if df.empty:
+            return
+        if self.columns is None:
+            self.columns = list(df.columns)
+        df.reindex(columns=self.columns).to_csv(self._fh, header=self.rows == 0, index=False)
+        self.rows += len(df)
+
+    def __exit__(self, exc_type, exc, tb):
+        self._fh.close()
+        if exc_type is not None or (self.rows == 0 and not self.replace_if_empty):
+            os.remove(self.tmp_path)
+            return False
+        if self.rows == 0 and self.columns:
+            self._write_header()
+        os.replace(self.tmp_path, self.path)
+        return False
+
+    def _write_header(self):
+        with open(self.tmp_path, "w", newline="", encoding="utf-8") as fh:
+            fh.write(",".join(self.columns) + "\n")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def print_peak_rss():
+    """Print the peak RSS of the fetch, where the platform reports it."""
+    peak = peak_rss_mb()
+    if peak is not None:
+        print(f"Peak RSS: {peak:.1f} MB")
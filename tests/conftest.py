@@ -0,0 +1,7 @@
+# tests/conftest.py
+"""Run the tests against the modules at the repo root: python -m pytest -q"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
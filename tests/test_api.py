@@ -0,0 +1,133 @@
+# tests/test_api.py
+"""JSON API: ETag / 304, gzip, keyset paging over Parquet-backed data, bad parameters."""
+import gzip
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import api
+import data_cache
+from data_cache import dataset_cache
+from dataset_registry import DatasetRegistry
+from storage import write_parquet_from_csv
+
+COUNTRIES = ["USA", "CAN", "MEX", "BRA"]
+PRODUCTS = ["Crude oil including lease condensate", "NGPL", "Refinery processing gain"]
+MONTHS = 24
+DAYS = 600
+
+
+def write_data(data_dir):
+    rng = np.random.default_rng(0)
+    periods = pd.date_range("2023-01-01", periods=MONTHS, freq="MS")
+    snd = pd.DataFrame([(p.strftime("%Y-%m-%d"), product, c, 100 + rng.random())
+                        for p in periods for c in COUNTRIES for product in PRODUCTS],
+                       columns=["period", "productName", "countryRegionId", "value"])
+    snd.to_csv(data_dir / "production.csv", index=False)
+    days = pd.date_range("2023-01-01", periods=DAYS, freq="D")
+    prices = pd.DataFrame([(d.strftime("%Y-%m-%d"), product, 70 + i * 0.01 + (5 if product == "EPCBRENT" else 0))
+                           for i, d in enumerate(days) for product in ("EPCBRENT", "EPCWTI")],
+                          columns=["period", "product", "value"])
+    prices.to_csv(data_dir / "prices.csv", index=False)
+    for name in ("production.csv", "prices.csv"):
+        assert write_parquet_from_csv(str(data_dir / name))
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """API test client over synthetic data/ files with Parquet copies."""
+    (tmp_path / "data").mkdir()
+    write_data(tmp_path / "data")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(data_cache, "registry", DatasetRegistry(str(tmp_path / "registry")))
+    dataset_cache.clear()
+    yield api.create_app().test_client()
+    dataset_cache.clear()
+
+
+def get_json(client, url, **headers):
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.get_json()
+
+
+def all_pages(client, url):
+    """Rows of every page of url, following next_cursor."""
+    rows, cursor, pages = [], None, 0
+    while True:
+        body = get_json(client, url + (f"&cursor={cursor}" if cursor else ""))
+        rows += body["data"]
+        pages += 1
+        cursor = body["meta"]["next_cursor"]
+        if cursor is None:
+            return rows, pages
+
+
+def test_etag_not_modified(client):
+    first = client.get("/api/v1/spot/brent?limit=10")
+    assert first.status_code == 200
+    again = client.get("/api/v1/spot/brent?limit=10", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == first.headers["ETag"]
+    other = client.get("/api/v1/spot/brent?limit=11", headers={"If-None-Match": first.headers["ETag"]})
+    assert other.status_code == 200
+
+
+def test_gzip(client):
+    plain = client.get("/api/v1/spot/wti?limit=500")
+    zipped = client.get("/api/v1/spot/wti?limit=500", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in plain.headers
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(zipped.data)) == plain.get_json()
+
+
+def test_snd_paging_over_parquet(client):
+    url = "/api/v1/snd/production?country=USA,CAN,MEX"
+    assert isinstance(
+        api.utils.load_and_clean(api.ACTIVITIES["production"], columns=api.SND_COLUMNS)["productName"].dtype,
+        pd.CategoricalDtype)
+    rows, pages = all_pages(client, url + "&limit=25")
+    assert pages == -(-MONTHS * 3 * len(PRODUCTS) // 25)
+    assert rows == get_json(client, url + f"&limit={api.MAX_LIMIT}")["data"]
+    keys = [(r["period"], r["countryRegionId"], r["productName"]) for r in rows]
+    assert keys == sorted(set(keys))
+
+
+def test_spot_paging(client):
+    rows, pages = all_pages(client, "/api/v1/spot/spread?freq=Weekly&limit=20")
+    assert pages > 1
+    assert rows == get_json(client, f"/api/v1/spot/spread?freq=Weekly&limit={api.MAX_LIMIT}")["data"]
+
+
+def test_custom_range_keeps_last_bucket(client):
+    body = get_json(client, "/api/v1/spot/brent?freq=Yearly&start=2024-03-01&end=2024-06-30")
+    daily = get_json(client, "/api/v1/spot/brent?start=2024-06-30&end=2024-06-30")
+    assert [r["value"] for r in body["data"]] == [daily["data"][0]["value"]]
+
+
+def test_tz_aware_dates(client):
+    aware = get_json(client, "/api/v1/spot/brent?start=2024-01-01T00:00Z&end=2024-01-10T00:00%2B00:00")
+    naive = get_json(client, "/api/v1/spot/brent?start=2024-01-01&end=2024-01-10")
+    assert aware["data"] == naive["data"]
+
+
+@pytest.mark.parametrize("url", [
+    "/api/v1/spot/gold",
+    "/api/v1/spot/brent?start=notadate",
+    "/api/v1/spot/brent?limit=0",
+    "/api/v1/spot/brent?limit=ten",
+    "/api/v1/spot/brent?freq=Hourly",
+    "/api/v1/spot/brent?cursor=!!!",
+    f"/api/v1/spot/brent?cursor={api.encode_cursor(123)}",
+    f"/api/v1/spot/brent?cursor={api.encode_cursor(['notadate'])}",
+    f"/api/v1/spot/brent?cursor={api.encode_cursor(['2024-01-01', 'extra'])}",
+    f"/api/v1/snd/production?cursor={api.encode_cursor(['x', 'USA', 'NGPL'])}",
+    f"/api/v1/snd/production?cursor={api.encode_cursor(['2024-01-01', 'USA'])}",
+    f"/api/v1/snd/production?cursor={api.encode_cursor(['2024-01-01', 'USA', 7])}",
+])
+def test_bad_parameters(client, url):
+    response = client.get(url)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
@@ -0,0 +1,67 @@
+# tests/test_data_cache.py
+"""Dataset cache keys: source files, snapshots and loader code versions."""
+import importlib
+import sys
+
+import pandas as pd
+import pytest
+
+import data_cache
+from data_cache import cached_dataset, dataset_cache
+from dataset_registry import DatasetRegistry
+
+LOADER = '''
+import pandas as pd
+from data_cache import cached_dataset
+
+@cached_dataset(shared=True)
+def load(path):
+    return pd.read_csv(path).assign(scale={scale})
+'''
+
+
+@pytest.fixture
+def isolated(tmp_path, monkeypatch):
+    """Empty process cache and a registry under tmp_path."""
+    monkeypatch.setattr(data_cache, "registry", DatasetRegistry(str(tmp_path / "registry")))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    dataset_cache.clear()
+    yield tmp_path
+    dataset_cache.clear()
+    sys.modules.pop("loader_mod", None)
+
+
+def load_with(tmp_path, scale, path):
+    """Write the loader module with `scale`, import it fresh and call it."""
+    (tmp_path / "loader_mod.py").write_text(LOADER.format(scale=scale))
+    sys.modules.pop("loader_mod", None)
+    importlib.invalidate_caches()
+    module = importlib.import_module("loader_mod")
+    dataset_cache.clear()  # a new process: only the registry is shared
+    return module.load(path)
+
+
+def test_cached_until_the_source_changes(isolated):
+    path = isolated / "x.csv"
+    path.write_text("value\n1\n")
+    calls = []
+
+    @cached_dataset()
+    def load(p):
+        calls.append(p)
+        return pd.read_csv(p)
+
+    load(str(path)), load(str(path))
+    assert len(calls) == 1
+    path.write_text("value\n1\n2\n")
+    assert len(load(str(path))) == 2
+    assert len(calls) == 2
+
+
+@pytest.mark.skipif(data_cache.registry is None, reason="needs pyarrow")
+def test_registry_not_reused_after_a_loader_change(isolated):
+    path = isolated / "x.csv"
+    path.write_text("value\n1\n")
+    assert load_with(isolated, 1, str(path))["scale"].tolist() == [1]
+    assert load_with(isolated, 1, str(path))["scale"].tolist() == [1]  # attached from the registry
+    assert load_with(isolated, 2, str(path))["scale"].tolist() == [2]  # new code, same data
@@ -0,0 +1,31 @@
+# tests/test_downsample.py
+"""Point budget and trace type of the spot charts."""
+import numpy as np
+import pandas as pd
+
+from downsample import POINT_BUDGET, WEBGL_THRESHOLD, downsample_indices
+
+
+def price_frame(n):
+    rng = np.random.default_rng(0)
+    values = 60 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({"period": pd.date_range("1990-01-01", periods=n, freq="D"),
+                         "value": values, "returns": pd.Series(values).pct_change().to_numpy() * 100})
+
+
+def test_budget_keeps_extremes():
+    df = price_frame(20_000)
+    y = df["value"].to_numpy()
+    keep = downsample_indices(df["period"].to_numpy(), y, POINT_BUDGET)
+    assert len(keep) <= POINT_BUDGET
+    assert y.argmax() in keep and y.argmin() in keep
+
+
+def test_webgl_for_long_drawn_traces():
+    from utils import plot_price_chart, plot_returns_with_vol
+    long, short = price_frame(POINT_BUDGET * 10), price_frame(WEBGL_THRESHOLD // 2)
+    for fig in [plot_price_chart(long, "X", "t", "y"), plot_returns_with_vol(long, "X")]:
+        assert all(len(trace.x) <= POINT_BUDGET for trace in fig.data)
+        assert {trace.type for trace in fig.data} == {"scattergl"}  # downsampled, still above the threshold
+    for fig in [plot_price_chart(short, "X", "t", "y"), plot_returns_with_vol(short, "X")]:
+        assert {trace.type for trace in fig.data} == {"scatter"}
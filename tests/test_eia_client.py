@@ -0,0 +1,104 @@
+# tests/test_eia_client.py
+"""Fetch engine against the local EIA stub: retries, paging, rate limit, 304 handling."""
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+import requests
+
+import eia_stub
+from eia_client import EIAClient, TokenBucket
+from http_cache import ResponseCache
+
+ROWS = 1234
+LENGTH = 100
+
+
+@pytest.fixture
+def stub(tmp_path):
+    """EIA stub over a synthetic production.csv answering ~30% of requests with 429."""
+    pd.DataFrame({
+        "period": [f"{2000 + i // 120}-{i // 10 % 12 + 1:02d}" for i in range(ROWS)],
+        "countryRegionId": [f"C{i % 10}" for i in range(ROWS)],
+        "activityId": "1",
+        "value": [str(i) for i in range(ROWS)],
+    }).to_csv(tmp_path / "production.csv", index=False)
+    random.seed(0)
+    server, root = eia_stub.serve(data_dir=str(tmp_path), fail_rate=0.3)
+    yield root
+    server.shutdown()
+
+
+def fast_client(**kwargs):
+    options = dict(max_workers=4, rate=1000, burst=100, max_retries=30, backoff=0.001)
+    return EIAClient(**{**options, **kwargs})
+
+
+def test_iter_many_retries_and_returns_every_page_once(stub):
+    client = fast_client()
+    url = f"{stub}/international/data/"
+    queries = {"all": (url, {}), "c3": (url, {"facets[countryRegionId][0]": "C3"})}
+    seen = {}
+    for key, offset, rows in client.iter_many(queries, LENGTH):
+        assert (key, offset) not in seen
+        seen[(key, offset)] = [row["value"] for row in rows]
+
+    pages = len(seen)
+    assert sorted(o for k, o in seen if k == "all") == list(range(0, ROWS, LENGTH))
+    values = [v for (k, _), rows in sorted(seen.items()) if k == "all" for v in rows]
+    assert sorted(values, key=int) == [str(i) for i in range(ROWS)]
+    assert sum(len(rows) for (k, _), rows in seen.items() if k == "c3") == len(range(3, ROWS, 10))
+    assert client.requests_made > pages  # some 429s were retried
+
+
+def test_rate_limit_holds(stub):
+    client = fast_client(rate=20, burst=1)
+    start = time.monotonic()
+    rows = client.fetch_all(f"{stub}/international/data/", {}, LENGTH)
+    elapsed = time.monotonic() - start
+    assert len(rows) == ROWS
+    assert elapsed >= (client.requests_made - 1) / 20 * 0.9
+
+
+def test_token_bucket_rate():
+    bucket = TokenBucket(rate=50, capacity=5)
+    start = time.monotonic()
+    threads = [threading.Thread(target=lambda: [bucket.acquire() for _ in range(10)]) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # 5 tokens of burst, then 50 per second
+    assert time.monotonic() - start >= (30 - 5) / 50 * 0.9
+
+
+@pytest.fixture
+def not_modified_server():
+    """Server answering every request with 304, as a misbehaving proxy would."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(304)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v2/"
+    server.shutdown()
+
+
+def test_304_without_cached_body(not_modified_server, tmp_path):
+    client = fast_client(cache=ResponseCache(str(tmp_path), ttl=0))
+    with pytest.raises(requests.HTTPError, match="304"):
+        client.get_json(not_modified_server, {"length": 1})
+
+    # An entry whose body disappeared after the lookup is refetched, not read
+    client.cache.store(not_modified_server, {"length": 1}, b'{"response": {}}', {"ETag": '"x"'})
+    entry = client.cache.lookup(not_modified_server, {"length": 1})
+    (tmp_path / entry.key[:2] / f"{entry.key}.json.gz").unlink()
+    assert client._not_modified(entry) is None
@@ -0,0 +1,75 @@
+# tests/test_fetch_activity.py
+"""Full and incremental activity refreshes against the EIA stub keep the SQLite store in step."""
+import pandas as pd
+import pytest
+
+import activity_store
+import eia_stub
+import fetch_activity
+from eia_client import EIAClient
+
+COUNTRIES = ["USA", "CAN", "SAU"]
+PRODUCTS = ["Crude oil including lease condensate", "NGPL"]
+
+
+def source_rows(months, base):
+    """Production rows as the EIA stub serves them, value = base + month index."""
+    periods = pd.date_range("2021-01-01", periods=months, freq="MS")
+    return pd.DataFrame([{
+        "period": p.strftime("%Y-%m-%d"), "productName": product, "activityId": "1",
+        "activityName": "Production", "countryRegionId": country, "countryRegionName": country,
+        "value": base + i, "unit": "TBPD",
+    } for i, p in enumerate(periods) for country in COUNTRIES for product in PRODUCTS])
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    (tmp_path / "data").mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(activity_store, "_engines", {})
+    client = EIAClient(rate=1000, burst=100, backoff=0.001)
+    monkeypatch.setattr(fetch_activity, "default_client", lambda: client)
+    servers = []
+
+    def serve(rows):
+        """Point the fetcher at a stub serving rows."""
+        source = tmp_path / f"source{len(servers)}"
+        source.mkdir()
+        rows.to_csv(source / "production.csv", index=False)
+        server, root = eia_stub.serve(data_dir=str(source))
+        servers.append(server)
+        monkeypatch.setattr(fetch_activity, "URL", f"{root}/international/data/")
+
+    yield serve
+    for server in servers:
+        server.shutdown()
+
+
+def fetch(incremental):
+    return fetch_activity.fetch_activities({"Production": "1"}, incremental=incremental)["Production"]
+
+
+def stored_values():
+    df = activity_store.read_activity("1")
+    return sorted(df["value"].tolist())
+
+
+def test_full_refresh_replaces_the_store(workdir):
+    workdir(source_rows(24, base=100))
+    assert fetch(incremental=True) == 24 * len(COUNTRIES) * len(PRODUCTS)
+
+    # The full history is revised (and a month dropped): a full refresh must replace the store
+    revised = source_rows(23, base=500)
+    workdir(revised)
+    assert fetch(incremental=False) == len(revised)
+    assert stored_values() == sorted(revised["value"].astype(float).tolist())
+
+    # An incremental run afterwards regenerates the same revised history
+    assert fetch(incremental=True) == len(revised)
+    csv = pd.read_csv(fetch_activity.activity_csv_path("Production"))
+    assert sorted(csv["value"].tolist()) == sorted(revised["value"].astype(float).tolist())
+
+
+def test_fetch_activity_returns_rows_written(workdir):
+    workdir(source_rows(3, base=1))
+    assert fetch_activity.fetch_activity("Production", "1") == 3 * len(COUNTRIES) * len(PRODUCTS)
@@ -0,0 +1,81 @@
+# tests/test_fetch_planner.py
+"""Facet-list packing: capacity, facet limit, every key planned once, date-range splits."""
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from fetch_planner import (FILL, MAX_FACETS, estimate_rows, months_since, plan_batches, split_range,
+                           split_rows)
+
+LENGTH = 5000
+TODAY = "2026-06-15"
+
+
+def planned_keys():
+    rng = np.random.default_rng(1)
+    countries = [f"C{i:03d}" for i in range(150)]
+    keys = [(c, a, "2020-01" if i % 3 else "2024-04")
+            for i, c in enumerate(countries) for a in ("1", "2", "5")]
+    rates = {a: {c: float(rng.choice([0.5, 3, 12, 40])) for c in countries[:140]} for a in ("1", "2")}
+    rates["5"] = {c: 2.0 for c in countries[:10]}  # the others have no activity 5 rows
+    rates["1"]["C007"] = 400.0  # ~30k rows: above a page on its own
+    return keys, estimate_rows(rates, keys, today=TODAY)
+
+
+def test_batches_fit_the_page_and_facet_limits():
+    keys, estimates = planned_keys()
+    for batch in plan_batches(keys, estimates, LENGTH, today=TODAY):
+        assert len(batch["countries"]) <= MAX_FACETS
+        if batch["rows"] is not None:
+            assert batch["rows"] <= FILL * LENGTH
+
+
+def test_every_key_planned_once():
+    """Each key is in one batch, or in consecutive date ranges covering its history once."""
+    keys, estimates = planned_keys()
+    ranges = defaultdict(list)
+    for b in plan_batches(keys, estimates, LENGTH, today=TODAY):
+        for country in b["countries"]:
+            for activity in b["activities"]:
+                ranges[(country, activity)].append((b["start"], b["end"]))
+    assert set(ranges) == {(c, a) for c, a, _ in keys}
+    for country, activity, start in keys:
+        parts = ranges[(country, activity)]
+        assert parts[0][0] == start and parts[-1][1] is None
+        for (_, end), (nxt, _) in zip(parts, parts[1:]):
+            assert pd.Period(nxt, freq="M") == pd.Period(end, freq="M") + 1
+
+
+def test_oversized_key_split_by_date_range():
+    keys, estimates = planned_keys()
+    batches = plan_batches(keys, estimates, LENGTH, today=TODAY)
+    parts = [b for b in batches if "C007" in b["countries"] and "1" in b["activities"]]
+    assert len(parts) > 1 and all(b["countries"] == ["C007"] for b in parts)
+    # Consecutive, non-overlapping months from the key's start, the last one open-ended
+    assert parts[0]["start"] == "2020-01" and parts[-1]["end"] is None
+    for prev, nxt in zip(parts, parts[1:]):
+        assert pd.Period(nxt["start"], freq="M") == pd.Period(prev["end"], freq="M") + 1
+    assert sum(b["rows"] for b in parts) >= estimates[("C007", "1")]
+
+
+def test_split_range_months():
+    ranges = split_range("2020-01", 10_000, 4000, today="2023-04-15")
+    assert ranges == [("2020-01", "2021-04", 4000), ("2021-05", "2022-08", 4000), ("2022-09", None, 2000)]
+    assert split_range("2020-01", 3000, 4000, today=TODAY) == [("2020-01", None, 3000)]
+
+
+def test_estimates():
+    keys = [("USA", "1", "2026-01"), ("XXX", "1", "2026-01"), ("USA", "9", "2026-01")]
+    estimates = estimate_rows({"1": {"USA": 10.0}}, keys, today=TODAY)
+    assert months_since("2026-01", TODAY) == 6
+    assert estimates == {("USA", "1"): 61, ("XXX", "1"): 1}  # unknown activity "9" left out
+
+
+def test_split_rows_routes_back_per_key():
+    rows = [{"countryRegionId": "USA", "activityId": 1, "value": 1},
+            {"countryRegionId": "CAN", "activityId": "2", "value": 2},
+            {"countryRegionId": "USA", "activityId": 1, "value": 3}]
+    out = split_rows(rows)
+    assert [r["value"] for r in out[("USA", "1")]] == [1, 3]
+    assert [r["value"] for r in out[("CAN", "2")]] == [2]
@@ -0,0 +1,68 @@
+# tests/test_figure_cache.py
+"""Figure cache keys: data versions for loader frames, row-order-aware content otherwise."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_cache import tag_version, version_of
+from figure_cache import _fingerprint, figure_cache
+from spot_engine import SpotEngine
+
+
+def prices(days=400, shift=0.0):
+    periods = pd.date_range("2020-01-01", periods=days, freq="D")
+    rng = np.random.default_rng(0)
+    value = 60 + np.cumsum(rng.normal(0, 1, days)) + shift
+    return pd.concat([pd.DataFrame({"period": periods, "series": sid, "value": value + off})
+                      for sid, off in (("RBRTE", 5.0), ("RWTC", 0.0))], ignore_index=True)
+
+
+def test_row_order_changes_the_key():
+    df = pd.DataFrame({"period": pd.date_range("2020-01-01", periods=3), "value": [1.0, 2.0, 3.0]})
+    assert _fingerprint(df) != _fingerprint(df.iloc[::-1].reset_index(drop=True))
+    assert _fingerprint(df) == _fingerprint(df.copy())
+
+
+def test_versioned_frames_are_not_hashed(monkeypatch):
+    from utils import aggregate_prices, slice_period
+    engine = SpotEngine(prices())
+    tag_version(engine, "v1")
+    df = slice_period(aggregate_prices(engine.frame("brent"), "Weekly"), "2020-03-01", "2020-09-30")
+    assert version_of(df) is not None
+
+    def no_hashing(*args, **kwargs):
+        raise AssertionError("versioned frame hashed by content")
+    monkeypatch.setattr(pd.util, "hash_pandas_object", no_hashing)
+    key = _fingerprint(df)
+    assert key == _fingerprint(slice_period(aggregate_prices(engine.frame("brent"), "Weekly"),
+                                            "2020-03-01", "2020-09-30"))
+    assert key != _fingerprint(slice_period(aggregate_prices(engine.frame("brent"), "Weekly"),
+                                            "2020-03-01", "2020-10-31"))
+
+    newer = SpotEngine(prices(shift=1.0))
+    tag_version(newer, "v2")
+    assert key != _fingerprint(slice_period(aggregate_prices(newer.frame("brent"), "Weekly"),
+                                            "2020-03-01", "2020-09-30"))
+
+
+@pytest.fixture
+def empty_figure_cache():
+    figure_cache.clear()
+    yield figure_cache
+    figure_cache.clear()
+
+
+def test_chart_rebuilt_for_a_new_data_version(empty_figure_cache):
+    from utils import plot_price_chart
+    engine = SpotEngine(prices())
+    tag_version(engine, "v1")
+    plot_price_chart(engine.frame("wti"), "WTI", "t", "y")
+    misses = figure_cache.stats()["misses"]
+    plot_price_chart(engine.frame("wti"), "WTI", "t", "y")
+    assert figure_cache.stats()["misses"] == misses
+
+    newer = SpotEngine(prices(shift=1.0))
+    tag_version(newer, "v2")
+    fig = plot_price_chart(newer.frame("wti"), "WTI", "t", "y")
+    assert figure_cache.stats()["misses"] == misses + 1
+    assert fig.data[0].y[0] == pytest.approx(newer.frame("wti")["value"].iloc[0])
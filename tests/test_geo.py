@@ -0,0 +1,26 @@
+# tests/test_geo.py
+"""Country dimension: name joins onto the import facts."""
+import numpy as np
+import pandas as pd
+
+from geo import CountryIndex, attach_origin_geo
+
+COUNTRIES = pd.DataFrame({
+    "code": ["CA", "NA", "MX"],
+    "name": ["Canada", "Namibia", "Mexico"],
+    "latitude": [56.13, -22.96, 23.63],
+    "longitude": [-106.35, 18.49, -102.55],
+})
+
+
+def test_join_is_on_the_name():
+    facts = pd.DataFrame({"originName": ["Mexico", "Canada", "Namibia", "Mexico", "Republic of Mexico"],
+                          "quantity": [1.0, 2.0, 3.0, 4.0, 5.0]})
+    index = CountryIndex(COUNTRIES)
+    got = attach_origin_geo(facts, index)
+    expected = facts.merge(COUNTRIES.rename(columns={"name": "originName"}), on="originName", how="left")
+    assert got["originCode"].tolist()[:4] == expected["code"].tolist()[:4] == ["MX", "CA", "NA", "MX"]
+    np.testing.assert_allclose(got["originLat"], expected["latitude"])
+    # A spelling the dimension does not have resolves to nothing, and is reported
+    assert pd.isna(got["originCode"].iloc[4]) and np.isnan(got["originLat"].iloc[4])
+    assert index.missing(facts["originName"]) == ["Republic of Mexico"]
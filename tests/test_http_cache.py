@@ -0,0 +1,31 @@
+# tests/test_http_cache.py
+"""Response cache: key normalization and recorded request plans in replay mode."""
+import pytest
+
+import fetch_planner
+from http_cache import CacheMiss, ResponseCache, cache_key
+
+KEYS = [("USA", "1", "2020-01"), ("CAN", "1", "2020-01"), ("MEX", "1", "2020-01")]
+RATES = {"1": {"USA": 40, "CAN": 30, "MEX": 20}}
+
+
+def plan_on(today):
+    return fetch_planner.plan_batches(KEYS, fetch_planner.estimate_rows(RATES, KEYS, today=today), 5000)
+
+
+def test_cache_key_ignores_api_key():
+    url = "https://api.eia.gov/v2/international/data/"
+    assert cache_key(url, {"api_key": "a", "length": 10}) == cache_key(url, {"length": 10, "api_key": "b"})
+
+
+def test_plan_recorded_and_replayed(tmp_path):
+    recorded = ResponseCache(str(tmp_path), mode="on").plan("activity", lambda: plan_on("2026-06-01"))
+    # Years later the same inputs pack differently; replay must keep the recorded requests
+    assert plan_on("2036-06-01") != recorded
+    replayed = ResponseCache(str(tmp_path), mode="replay").plan("activity", lambda: plan_on("2036-06-01"))
+    assert replayed == recorded
+
+
+def test_replay_without_recorded_plan(tmp_path):
+    with pytest.raises(CacheMiss):
+        ResponseCache(str(tmp_path), mode="replay").plan("activity", lambda: plan_on(None))
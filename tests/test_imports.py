@@ -0,0 +1,50 @@
+# tests/test_imports.py
+"""utils loads its submodules lazily and keeps plotly / streamlit off the data path."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+
+def imported_after(statement):
+    """Top-level packages loaded by statement in a fresh interpreter."""
+    code = f"import sys\n{statement}\nprint(' '.join(sorted({{m.split('.')[0] for m in sys.modules}})))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(out.stdout.split())
+
+
+def test_import_utils_is_light():
+    loaded = imported_after("import utils")
+    assert not loaded & {"pandas", "plotly", "streamlit", "pyarrow"}
+
+
+def test_data_loaders_skip_plotting_libraries():
+    loaded = imported_after("from utils import load_spot_data, load_and_clean, aggregate_prices, slice_period")
+    assert "pandas" in loaded
+    assert not loaded & {"plotly", "streamlit"}
+
+
+def test_main_page_skips_plotly():
+    """The landing page renders KPIs only: its utils import must not import plotly."""
+    with open(os.path.join(ROOT, "main.py")) as f:
+        line = next(l for l in f if l.startswith("from utils import"))
+    # Some streamlit versions load plotly themselves, so record the imports the line asks for
+    code = ("import builtins, streamlit\n"
+            "seen, real = [], builtins.__import__\n"
+            "def hook(name, *args, **kwargs):\n"
+            "    seen.append(name)\n"
+            "    return real(name, *args, **kwargs)\n"
+            "builtins.__import__ = hook\n"
+            f"{line}"
+            "print(' '.join(seen))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert not [name for name in out.stdout.split() if name.split(".")[0] == "plotly"]
+
+
+def test_unknown_name_raises_attribute_error():
+    import utils
+    with pytest.raises(AttributeError):
+        utils.no_such_helper
@@ -0,0 +1,54 @@
+# tests/test_imports_cube.py
+"""ImportsCube roll-ups against a pandas groupby of the long imports rows."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from imports_cube import ImportsCube
+
+ORIGINS = ["Canada", "Mexico", "Saudi Arabia", "Iraq", "Colombia", "Brazil"]
+SELECTED = ["Mexico", "Iraq", "Brazil", "Nowhere"]  # unknown names are ignored
+
+
+@pytest.fixture(scope="module")
+def imports():
+    rng = np.random.default_rng(0)
+    n = 3000
+    df = pd.DataFrame({
+        "period": pd.Series(rng.choice(pd.date_range("2019-01-01", "2023-12-01", freq="MS"), n)).dt.strftime("%Y-%m-%d"),
+        "originName": rng.choice(ORIGINS, n, p=[0.4, 0.2, 0.15, 0.1, 0.1, 0.05]),
+        "gradeName": rng.choice(["Light Sweet", "Medium", "Heavy Sour"], n),
+        "quantity": rng.integers(1, 1000, n).astype(float),
+    })
+    df.loc[::40, "quantity"] = np.nan
+    df["year"] = pd.to_datetime(df["period"]).dt.year
+    return df
+
+
+def test_top_and_origin_totals(imports):
+    cube = ImportsCube(imports)
+    for year, rows in imports.groupby("year"):
+        totals = rows.groupby("originName")["quantity"].sum().sort_values(ascending=False, kind="stable")
+        assert cube.top(year, 3) == pytest.approx(list(totals.head(3).items()))
+        selected = totals[totals.index.isin(SELECTED)]
+        got = cube.origin_totals(year, SELECTED)
+        assert got["originName"].tolist() == selected.index.tolist()
+        np.testing.assert_allclose(got["quantity"], selected.to_numpy())
+
+
+@pytest.mark.parametrize("origins", [None, SELECTED])
+def test_yoy(imports, origins):
+    rows = imports if origins is None else imports[imports["originName"].isin(origins)]
+    totals = rows.groupby("year")["quantity"].sum()
+    got = ImportsCube(imports).yoy(origins)
+    np.testing.assert_allclose(got["quantity"], totals.to_numpy())
+    np.testing.assert_allclose(got["yoy"].iloc[1:], (totals.pct_change() * 100).iloc[1:].to_numpy())
+    assert np.isnan(got["yoy"].iloc[0])
+
+
+def test_frame_is_the_grouped_year(imports):
+    rows = imports[(imports["year"] == 2021) & imports["originName"].isin(SELECTED)]
+    expected = rows.groupby(["period", "originName", "gradeName"])["quantity"].sum()
+    expected = expected[expected > 0]  # cells with only missing quantities are dropped
+    got = ImportsCube(imports).frame(2021, SELECTED).set_index(["period", "originName", "gradeName"])["quantity"]
+    pd.testing.assert_series_equal(got.sort_index(), expected.sort_index(), check_names=False)
@@ -0,0 +1,52 @@
+# tests/test_kpi_index.py
+"""KPI index: the last two observations per key are taken by period, whatever the file order."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from kpi_index import KpiIndex, build_index, read_index, update_index
+
+COUNTRIES = ["USA", "SAU", "CAN"]
+PRODUCTS = ["Crude oil including lease condensate", "NGPL"]
+
+
+@pytest.fixture
+def production_csv(tmp_path):
+    """Monthly production rows shuffled out of period order, with a skipped non-positive value."""
+    periods = pd.date_range("2023-01-01", periods=18, freq="MS")
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame([(p.strftime("%Y-%m-%d"), product, country, round(rng.uniform(10, 100), 2))
+                       for p in periods for product in PRODUCTS for country in COUNTRIES],
+                      columns=["period", "productName", "countryRegionId", "value"])
+    df.loc[(df["countryRegionId"] == "SAU") & (df["period"] == "2024-06-01"), "value"] = 0.0
+    df = df.sample(frac=1, random_state=1)
+    path = tmp_path / "production.csv"
+    df.to_csv(path, index=False)
+    return path, df
+
+
+def expected_last_two(df):
+    """(product, country) -> (last period, last value, previous period, previous value), via pandas."""
+    df = df[df["value"] > 0].assign(period=pd.to_datetime(df["period"]))
+    top = df.sort_values("period").groupby(["productName", "countryRegionId"]).tail(2)
+    out = {}
+    for (product, country), rows in top.groupby(["productName", "countryRegionId"]):
+        (prev_p, prev_v), (p, v) = rows[["period", "value"]].itertuples(index=False)
+        out[(product, country)] = (p, v, prev_p, prev_v)
+    return out
+
+
+def test_last_two_by_period(production_csv):
+    path, df = production_csv
+    expected = expected_last_two(df)
+    for frame in (build_index(str(path)), update_index(str(path)), read_index(str(path))):
+        index = KpiIndex(frame)
+        assert index.keys("production") == sorted(COUNTRIES)
+        for (product, country), (period, value, prev_period, prev_value) in expected.items():
+            got = index.get("production", country, product)
+            assert (got["period"], got["prev_period"]) == (period, prev_period)
+            assert got["value"] == pytest.approx(value)
+            assert got["change"] == pytest.approx((value / prev_value - 1) * 100)
+    # SAU's last month is 0: its latest observation is the month before
+    sau = expected[(PRODUCTS[0], "SAU")]
+    assert sau[0] == pd.Timestamp("2024-05-01") and sau[2] == pd.Timestamp("2024-04-01")
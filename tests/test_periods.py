@@ -0,0 +1,43 @@
+# tests/test_periods.py
+"""slice_period: mask-equivalent rows, a bounded per-frame memo, unsorted frames sorted once."""
+import numpy as np
+import pandas as pd
+
+from data_cache import frame_memo
+from utils.periods import SLICE_MEMO, apply_time_filter, slice_period
+
+
+def frame(n=1000, shuffle=False):
+    df = pd.DataFrame({"period": pd.date_range("2020-01-01", periods=n, freq="D"), "value": np.arange(n, dtype=float)})
+    return df.sample(frac=1, random_state=0).reset_index(drop=True) if shuffle else df
+
+
+def test_matches_a_boolean_mask():
+    for df in (frame(), frame(shuffle=True)):
+        start, end = pd.Timestamp("2020-03-15"), pd.Timestamp("2021-02-01")
+        expected = df[(df["period"] >= start) & (df["period"] <= end)].sort_values("period")
+        assert slice_period(df, start, end)["value"].tolist() == expected["value"].tolist()
+    assert slice_period(frame(), end="2019-12-31").empty
+
+
+def test_memo_is_bounded_and_reuses_recent_slices():
+    df = frame()
+    first = slice_period(df, "2020-02-01", "2020-03-01")
+    assert slice_period(df, "2020-02-01", "2020-03-01") is first
+    for day in range(200):  # custom ranges: any pair of bounds
+        slice_period(df, pd.Timestamp("2020-01-01") + pd.Timedelta(days=day), "2021-06-01")
+    slices = frame_memo(df, "slices", lambda d: None)
+    assert len(slices) == SLICE_MEMO
+    assert slice_period(df, "2020-02-01", "2020-03-01") is not first  # evicted, rebuilt
+
+
+def test_unsorted_frame_sorted_once(monkeypatch):
+    df = frame(shuffle=True)
+    slice_period(df, "2020-02-01")
+    calls = []
+    original = pd.DataFrame.sort_values
+    monkeypatch.setattr(pd.DataFrame, "sort_values", lambda *a, **k: calls.append(1) or original(*a, **k))
+    for window in ("1M", "1Y", "Max"):
+        apply_time_filter(df, window)
+    slice_period(df, "2020-05-01", "2020-06-01")
+    assert calls == []
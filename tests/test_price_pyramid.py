@@ -0,0 +1,39 @@
+# tests/test_price_pyramid.py
+"""Pyramid levels against a pandas groupby over calendar periods."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from price_pyramid import build_pyramid
+
+# Pyramid level -> calendar period of its buckets
+PERIODS = {"Weekly": "W-FRI", "Monthly": "M", "Quarterly": "Q", "Yearly": "Y"}
+
+
+@pytest.fixture(scope="module")
+def daily():
+    periods = pd.bdate_range("2021-03-03", "2024-08-20")
+    rng = np.random.default_rng(0)
+    value = 70 * np.exp(np.cumsum(rng.normal(0, 0.01, len(periods))))
+    return pd.DataFrame({"period": periods, "product": "EPCBRENT", "value": value,
+                         "returns": pd.Series(value).pct_change().to_numpy() * 100})
+
+
+@pytest.mark.parametrize("level", list(PERIODS))
+def test_levels_match_groupby(daily, level):
+    got = build_pyramid(daily)[level]
+    grouped = daily.groupby(daily["period"].dt.to_period(PERIODS[level]))["value"]
+    expected = grouped.agg(["last", "max", "min", "mean"])
+    assert got["period"].dt.to_period(PERIODS[level]).tolist() == expected.index.tolist()
+    np.testing.assert_allclose(got["value"], expected["last"], rtol=1e-12)
+    np.testing.assert_allclose(got["high"], expected["max"], rtol=1e-12)
+    np.testing.assert_allclose(got["low"], expected["min"], rtol=1e-12)
+    np.testing.assert_allclose(got["mean"], expected["mean"], rtol=1e-12)
+    np.testing.assert_allclose(got["returns"].iloc[1:], (expected["last"].pct_change() * 100).iloc[1:], rtol=1e-9)
+    assert (got["product"] == "EPCBRENT").all()
+
+
+def test_daily_level_is_the_frame(daily):
+    got = build_pyramid(daily)["Daily"]
+    pd.testing.assert_frame_equal(got[list(daily.columns)], daily)
+    assert (got["high"] == got["value"]).all() and (got["low"] == got["value"]).all()
@@ -0,0 +1,107 @@
+# tests/test_rolling.py
+"""RollingStats against pandas' rolling mean / std."""
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rolling import BLOCK, RollingStats, rolling_batch
+
+WINDOWS = [5, 20, 50, 200, BLOCK + 44]  # the last one spans more than two blocks
+
+
+def assert_matches_pandas(values, k, rtol=1e-9):
+    """Equal to pandas where pandas is finite, NaN where pandas is NaN or inf."""
+    s = pd.Series(values)
+    stats = RollingStats(values)
+    for ours, ref in [(stats.mean(k), s.rolling(k).mean()), (stats.std(k), s.rolling(k).std())]:
+        ref = ref.to_numpy()
+        finite = np.isfinite(ref)
+        assert np.isnan(ours[~finite]).all()
+        np.testing.assert_allclose(ours[finite], ref[finite], rtol=rtol, atol=1e-9)
+
+
+def random_walk_prices(n, seed=0):
+    """Log random walk around 60, trending over long stretches like the synthetic intraday ticks."""
+    rng = np.random.default_rng(seed)
+    return 60 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+
+
+@pytest.mark.parametrize("k", WINDOWS)
+def test_long_price_history(k):
+    """
+    Precision holds on a long series at a high level (the block-centered sums).
+
+    pandas' online variance drifts here (~1e-4 relative at k=5), so windows
+    are checked against a two-pass numpy std instead.
+    """
+    prices = random_walk_prices(300_000) + 1e4
+    stats = RollingStats(prices)
+    mean, std = stats.mean(k), stats.std(k)
+    ends = np.random.default_rng(k).integers(k - 1, len(prices), 2000)
+    windows = np.stack([prices[e - k + 1:e + 1] for e in ends])
+    np.testing.assert_allclose(mean[ends], windows.mean(axis=1), rtol=1e-12)
+    if k > 1:
+        np.testing.assert_allclose(std[ends], windows.std(axis=1, ddof=1), rtol=1e-7)
+    assert np.isnan(mean[:k - 1]).all() and np.isfinite(mean[k - 1:]).all()
+
+
+@pytest.mark.parametrize("k", WINDOWS)
+def test_returns(k):
+    prices = pd.Series(random_walk_prices(50_000, seed=3))
+    assert_matches_pandas((prices.pct_change() * 100).to_numpy(), k, rtol=1e-6)
+
+
+@pytest.mark.parametrize("k", [1, 2, 5, 20])
+def test_nan_values(k):
+    rng = np.random.default_rng(1)
+    values = rng.normal(60, 5, 300)
+    values[[0, 17, 18, 150, 299]] = np.nan
+    assert_matches_pandas(values, k)
+
+
+@pytest.mark.parametrize("k", [2, 20, 50])
+def test_inf_values_only_blank_their_windows(k):
+    rng = np.random.default_rng(2)
+    values = rng.normal(0, 2, 600)
+    values[[100, 400]] = [np.inf, -np.inf]  # spread returns where the spread is 0
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        stats = RollingStats(values)
+        mean, std = stats.mean(k), stats.std(k)
+    assert np.isnan(std).sum() == np.isnan(pd.Series(values).rolling(k).std()).sum()
+    assert np.isfinite(mean[k - 1:]).sum() == len(values) - k + 1 - 2 * k
+    assert_matches_pandas(values, k)
+
+
+def test_inf_across_blocks():
+    """Non-finite values next to a block boundary leave the other windows intact."""
+    values = np.linspace(50, 80, 1000)
+    values[255:257] = np.inf
+    stats = RollingStats(values, block=256)
+    ref = pd.Series(np.where(np.isfinite(values), values, np.nan)).rolling(20).std().to_numpy()
+    np.testing.assert_allclose(stats.std(20), ref, rtol=1e-9, equal_nan=True)
+
+
+def test_window_longer_than_series():
+    stats = RollingStats(np.arange(5.0))
+    assert np.isnan(stats.mean(6)).all()
+    assert np.isnan(stats.std(6)).all()
+
+
+def test_rolling_batch_shapes():
+    out = rolling_batch({"a": np.arange(30.0), "b": np.ones(30)}, [2, 5])
+    assert out["a"]["mean"].shape == (2, 30)
+    np.testing.assert_allclose(out["b"]["std"][1, 4:], 0.0)
+
+
+@pytest.mark.parametrize("k", [2, 3])
+def test_constant_window_after_outlier_is_zero(k):
+    """A run of zeros in the same block as a large outlier has a std of exactly 0, as in pandas."""
+    values = np.array([1e4, 0, 0, 0, 5, 3] + [0.0] * 5)
+    ours, ref = RollingStats(values).std(k), pd.Series(values).rolling(k).std().to_numpy()
+    zero = ref == 0
+    assert zero.sum() >= 4
+    assert (ours[zero] == 0).all()
+    np.testing.assert_allclose(ours[~zero], ref[~zero], rtol=1e-6)  # the same rounding noise
@@ -0,0 +1,68 @@
+# tests/test_sankey.py
+"""Sankey links against a pandas groupby, with the smallest origins folded into "Other"."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from sankey import OTHER, build_sankey_links
+
+
+@pytest.fixture(scope="module")
+def imports():
+    rng = np.random.default_rng(0)
+    origins = [f"Origin {i:02d}" for i in range(12)]
+    n = 2000
+    df = pd.DataFrame({
+        "originName": rng.choice(origins, n, p=np.linspace(1, 12, 12) / 78),
+        "gradeName": rng.choice(["Light Sweet", "Medium", "Heavy Sour"], n),
+        "period": rng.choice(pd.date_range("2023-01-01", periods=6, freq="MS"), n),
+        "quantity": rng.integers(1, 500, n).astype(float),
+    })
+    df.loc[::50, "quantity"] = np.nan
+    return df
+
+
+def links(result):
+    """{(source label, target label): value}"""
+    nodes, source, target, values = result
+    return {(nodes[s], nodes[t]): v for s, t, v in zip(source, target, values)}
+
+
+def folded(df, max_links, links_per_origin):
+    """Origin names with everything after the largest (max_links - links of OTHER) links renamed OTHER."""
+    totals = df.groupby("originName", sort=False)["quantity"].sum().sort_values(ascending=False, kind="stable")
+    kept = totals.index[:(max_links - links_per_origin) // links_per_origin]
+    return df["originName"].where(df["originName"].isin(kept), OTHER)
+
+
+def test_origin_links_fold_the_tail(imports):
+    df = imports.dropna(subset=["quantity"])
+    assert links(build_sankey_links(imports)) == pytest.approx(
+        {(o, "USA"): v for o, v in df.groupby("originName")["quantity"].sum().items()})
+
+    got = links(build_sankey_links(imports, max_links=5))
+    expected = df.groupby(folded(df, 5, 1))["quantity"].sum()
+    assert len(got) == 5
+    assert got == pytest.approx({(o, "USA"): v for o, v in expected.items()})
+
+
+def test_month_links_fold_the_tail(imports):
+    df = imports.dropna(subset=["quantity"])
+    nodes, source, _, values = build_sankey_links(imports, level="month", max_links=30)
+    # Six monthly links per origin: four origins and OTHER
+    assert len(source) == 30
+    origin = folded(df, 30, 6)
+    assert sorted(nodes) == sorted(set(origin) | {"USA"})
+    expected = df.groupby([origin, df["period"].dt.strftime("%Y-%m")])["quantity"].sum()
+    got = pd.Series(values, index=[nodes[s] for s in source]).groupby(level=0).apply(sorted)
+    assert got.to_dict() == {o: sorted(v) for o, v in expected.groupby(level=0)}
+
+
+def test_grade_links(imports):
+    df = imports.dropna(subset=["quantity"])
+    got = links(build_sankey_links(imports, level="grade", max_links=20))
+    origin = folded(df, 20 - 3, 3)
+    expected = {**{k: v for k, v in df.groupby([origin, df["gradeName"]])["quantity"].sum().items()},
+                **{(g, "USA"): v for g, v in df.groupby("gradeName")["quantity"].sum().items()}}
+    assert len(got) <= 20
+    assert got == pytest.approx(expected)
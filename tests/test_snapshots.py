@@ -0,0 +1,49 @@
+# tests/test_snapshots.py
+"""Snapshot publishing, and a dashboard read path that never writes."""
+import os
+
+import pandas as pd
+
+from kpi_index import kpi_path, read_index, update_index
+from snapshots import SnapshotStore
+from spot_derived import load_derived
+
+
+def write_prices(data_dir, days):
+    periods = pd.date_range("2024-01-01", periods=days, freq="D")
+    rows = [(p, product, 70.0 + i + (5 if product == "EPCBRENT" else 0))
+            for i, p in enumerate(periods) for product in ("EPCBRENT", "EPCWTI")]
+    path = os.path.join(data_dir, "prices.csv")
+    pd.DataFrame(rows, columns=["period", "product", "value"]).to_csv(path, index=False)
+    return path
+
+
+def test_manual_refresh_is_published(tmp_path):
+    data = str(tmp_path)
+    store = SnapshotStore(root=os.path.join(data, "snapshots"), data_dir=data)
+    path = write_prices(data, 3)
+    assert store.publish_if_tracked("prices") is None  # never published: readers use data/ directly
+    assert store.resolve(path) == path
+
+    first = store.publish("prices")
+    write_prices(data, 4)  # a manual fetch rewrites data/
+    second = store.publish_if_tracked("prices")
+    assert second not in (None, first)
+    assert len(pd.read_csv(store.resolve(path))) == 8
+
+
+def test_read_path_does_not_write(tmp_path):
+    path = write_prices(str(tmp_path), 5)
+    derived = load_derived(path, path=str(tmp_path / "spot_derived.parquet"))
+    assert derived["spread"].tolist() == [5.0] * 5
+    index = read_index(path)
+    assert set(index["key"]) == {"brent", "wti", "spread"}
+    assert sorted(os.listdir(tmp_path)) == ["prices.csv"]
+
+
+def test_ingest_writes_index(tmp_path):
+    path = write_prices(str(tmp_path), 5)
+    update_index(path)
+    assert os.path.exists(kpi_path(path))
+    assert os.path.exists(tmp_path / "spot_derived.parquet")
+    assert read_index(path)["value"].tolist() == update_index(path)["value"].tolist()
@@ -0,0 +1,89 @@
+# tests/test_snd_matrix.py
+"""SndMatrix group roll-ups and derived measures against a pandas groupby."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from snd_matrix import GROUPS, WINDOW, SndMatrix
+
+COUNTRIES = ["SAU", "IRN", "RUS", "KAZ", "USA", "CAN", "BRA", "OPEC"]  # OPEC: EIA's own aggregate
+
+
+def long_rows(seed, base):
+    """Three years of monthly rows with gaps: a month nobody reports, and per-country holes."""
+    rng = np.random.default_rng(seed)
+    periods = pd.date_range("2021-01-01", periods=36, freq="MS")
+    df = pd.DataFrame([(p, c) for p in periods for c in COUNTRIES], columns=["period", "countryRegionId"])
+    df["value"] = rng.uniform(base, 2 * base, len(df)).round(1)
+    df = df[df["period"] != "2022-05-01"]  # missing month
+    df = df[~((df["countryRegionId"] == "IRN") & (df["period"].dt.month % 4 == 0))]
+    df = df[~((df["countryRegionId"] == "KAZ") & (df["period"] < "2022-01-01"))]  # starts late
+    # A zero base year: the yoy_pct of 2023-03 divides by zero
+    df.loc[(df["countryRegionId"] == "CAN") & (df["period"] == "2022-03-01"), "value"] = 0.0
+    return df.reset_index(drop=True)
+
+
+@pytest.fixture(scope="module")
+def frames():
+    return {"Production": long_rows(1, 1000), "Consumption": long_rows(2, 800)}
+
+
+def expected_levels(df):
+    """period x (countries + groups) via pandas: pivot, then a groupby over group membership."""
+    wide = df.pivot(index="period", columns="countryRegionId", values="value")
+    wide = wide.reindex(pd.date_range(df["period"].min(), df["period"].max(), freq="MS"))
+    members = pd.DataFrame([(g, c) for g, cs in GROUPS.items()
+                            for c in (cs if cs is not None else [c for c in COUNTRIES if c != "OPEC"])
+                            if c in wide.columns], columns=["group", "country"])
+    long = df.rename(columns={"countryRegionId": "country"}).merge(members, on="country")
+    groups = long.groupby(["period", "group"])["value"].sum().unstack().reindex(wide.index)
+    return pd.concat([wide, groups[list(GROUPS)]], axis=1)
+
+
+def test_levels_and_group_rollups(frames):
+    m = SndMatrix(frames)
+    for activity, df in frames.items():
+        expected = expected_levels(df)
+        got = m.frame(activity, list(expected.columns))
+        pd.testing.assert_frame_equal(got, expected, check_names=False, check_freq=False)
+    # OPEC (EIA's aggregate) is a column of its own and is never summed into "All countries"
+    assert "OPEC" in m.columns
+    level = expected_levels(frames["Production"])
+    np.testing.assert_allclose(
+        m.frame("Production", ["All countries"])["All countries"],
+        level[[c for c in COUNTRIES if c != "OPEC"]].sum(axis=1, min_count=1))
+
+
+def test_balance(frames):
+    m = SndMatrix(frames)
+    production, consumption = expected_levels(frames["Production"]), expected_levels(frames["Consumption"])
+    expected = production - consumption
+    got = m.frame("Balance", list(expected.columns))
+    expected = expected.loc[:, expected.notna().any()]
+    pd.testing.assert_frame_equal(got, expected, check_names=False, check_freq=False)
+
+
+@pytest.mark.parametrize("measure", ["yoy", "yoy_pct", "ttm"])
+def test_derived_measures(frames, measure):
+    m = SndMatrix(frames)
+    level = expected_levels(frames["Production"])
+    prev = level.shift(WINDOW)
+    expected = {
+        "yoy": level - prev,
+        "yoy_pct": (level - prev) / prev.abs() * 100,
+        "ttm": level.rolling(WINDOW, min_periods=1).mean(),
+    }[measure]
+    expected = expected.loc[:, expected.notna().any()]
+    got = m.frame("Production", list(expected.columns), measure)
+    pd.testing.assert_frame_equal(got, expected, check_names=False, check_freq=False)
+    if measure == "yoy_pct":
+        assert np.isinf(got.loc["2023-03-01", "CAN"])
+        assert got.loc["2022-05-01"].isna().all()  # nobody reported the month
+
+
+def test_latest_orders_by_value(frames):
+    m = SndMatrix(frames)
+    latest = m.latest("Production", list(GROUPS))
+    level = expected_levels(frames["Production"])
+    expected = level[list(GROUPS)].rolling(WINDOW, min_periods=1).mean().iloc[-1].sort_values(ascending=False)
+    pd.testing.assert_series_equal(latest, expected, check_names=False)
@@ -0,0 +1,65 @@
+# tests/test_spot_engine.py
+"""SpotEngine combinations against their legs, and its Brent / WTI / spread frames against load_spot_data."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_cache
+from data_cache import dataset_cache
+from dataset_registry import DatasetRegistry
+from spot_engine import COMBINATIONS, GALLONS_PER_BARREL, SPOT_SERIES, SpotEngine, read_spot_prices
+
+
+def price_rows(keys, days=60, skip=None, seed=0):
+    """Long (period, product, series, value) rows; skip: key -> day numbers without a print."""
+    rng = np.random.default_rng(seed)
+    periods = pd.date_range("2024-01-01", periods=days, freq="D")
+    rows = []
+    for key in keys:
+        cfg = SPOT_SERIES[key]
+        level = 2.5 if cfg["unit"] == "$/GAL" else 75.0
+        values = level * np.exp(np.cumsum(rng.normal(0, 0.01, days)))
+        rows += [(p, cfg.get("product"), cfg["series"], round(v, 4))
+                 for i, (p, v) in enumerate(zip(periods, values)) if i not in (skip or {}).get(key, ())]
+    return pd.DataFrame(rows, columns=["period", "product", "series", "value"])
+
+
+def test_combinations_are_weighted_legs():
+    legs = sorted({leg for cfg in COMBINATIONS.values() for leg in cfg["legs"]})
+    prices = price_rows(legs)
+    engine = SpotEngine(prices)
+    assert engine.combination_keys == list(COMBINATIONS)
+    wide = prices.pivot(index="period", columns="series", values="value")
+    for key, cfg in COMBINATIONS.items():
+        expected = sum(weight * wide[SPOT_SERIES[leg]["series"]]
+                       * (GALLONS_PER_BARREL if SPOT_SERIES[leg]["unit"] == "$/GAL" else 1)
+                       for leg, weight in cfg["legs"].items())
+        got = engine.frame(key)
+        np.testing.assert_allclose(got["value"], expected.to_numpy(), rtol=1e-12)
+        np.testing.assert_allclose(got["returns"].iloc[1:], (expected.pct_change() * 100).iloc[1:], rtol=1e-9)
+
+
+@pytest.fixture
+def spot_dir(tmp_path, monkeypatch):
+    """data/prices.csv under a fresh working directory, with empty dataset caches."""
+    (tmp_path / "data").mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(data_cache, "registry", DatasetRegistry(str(tmp_path / "registry")))
+    dataset_cache.clear()
+    yield tmp_path / "data" / "prices.csv"
+    dataset_cache.clear()
+
+
+def test_brent_wti_spread_match_load_spot_data(spot_dir):
+    from utils import load_spot_data
+    # Misaligned prints: each series misses days the other reports, Brent misses the first day
+    skip = {"brent": {0, 5, 6, 30}, "wti": {12, 13, 40, 59}}
+    price_rows(["brent", "wti", "gasoline_nyh"], skip=skip).to_csv(spot_dir, index=False)
+    engine = SpotEngine(read_spot_prices(str(spot_dir)))
+    brent, wti, spread, _ = load_spot_data()
+    for key, expected in (("brent", brent), ("wti", wti), ("spread", spread)):
+        got = engine.frame(key)
+        expected = expected[expected["value"].notna()].reset_index(drop=True)
+        assert got["period"].tolist() == expected["period"].tolist(), key
+        for col in ("value", "change", "returns"):
+            np.testing.assert_allclose(got[col], expected[col], rtol=1e-9, err_msg=f"{key} {col}")
@@ -0,0 +1,33 @@
+# tests/test_stream_writer.py
+"""Atomic CSV output and the peak RSS report of the fetchers."""
+import pandas as pd
+import pytest
+
+import stream_writer
+from stream_writer import AtomicCSVWriter, print_peak_rss
+
+
+def test_writes_chunks_atomically(tmp_path):
+    path = tmp_path / "prices.csv"
+    with AtomicCSVWriter(str(path)) as out:
+        out.write(pd.DataFrame({"period": ["2025-01-02"], "value": [1.0]}))
+        out.write(pd.DataFrame({"value": [2.0], "period": ["2025-01-03"]}))
+    assert pd.read_csv(path).to_dict("list") == {"period": ["2025-01-02", "2025-01-03"], "value": [1.0, 2.0]}
+
+
+def test_error_leaves_target_untouched(tmp_path):
+    path = tmp_path / "prices.csv"
+    path.write_text("old\n")
+    with pytest.raises(RuntimeError):
+        with AtomicCSVWriter(str(path)) as out:
+            out.write(pd.DataFrame({"value": [1.0]}))
+            raise RuntimeError("page failed")
+    assert path.read_text() == "old\n"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_peak_rss_without_resource_module(monkeypatch, capsys):
+    monkeypatch.setattr(stream_writer, "resource", None)  # as on Windows
+    assert stream_writer.peak_rss_mb() is None
+    print_peak_rss()
+    assert capsys.readouterr().out == ""
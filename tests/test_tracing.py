@@ -0,0 +1,80 @@
+# tests/test_tracing.py
+"""Span histograms and exports against the durations computed directly."""
+import json
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import tracing
+from tracing import BUCKETS_MS, Histograms
+
+
+@pytest.fixture
+def fresh(tmp_path, monkeypatch):
+    """Empty histograms, both exports, into tmp_path."""
+    monkeypatch.setattr(tracing, "histograms", Histograms())
+    monkeypatch.setattr(tracing, "EXPORT", "both")
+    monkeypatch.setattr(tracing, "METRICS_DIR", str(tmp_path))
+    return tmp_path
+
+
+def parse_prometheus(text):
+    """{(metric, span, le): value} of the exposition lines."""
+    out = {}
+    for line in text.splitlines():
+        m = re.fullmatch(r'oil_dash_span_ms_(\w+)\{span="((?:[^"\\]|\\.)*)"(?:,le="([^"]+)")?\} (\S+)', line)
+        if m:
+            out[(m[1], m[2], m[3])] = float(m[4])
+    return out
+
+
+def test_histogram_buckets_and_summary():
+    hist = Histograms()
+    durations = pd.Series(np.random.default_rng(0).lognormal(3, 1.5, 500)).round(3)
+    durations.iloc[:3] = [1.0, 50.0, 20000.0]  # on bucket bounds, and past the last one
+    for ms in durations:
+        hist.observe('load "prices"', ms)
+
+    got = parse_prometheus(hist.prometheus())
+    for bound in BUCKETS_MS:
+        assert got[("bucket", 'load \\"prices\\"', str(bound))] == (durations <= bound).sum()
+    assert got[("bucket", 'load \\"prices\\"', "+Inf")] == len(durations)
+    assert got[("count", 'load \\"prices\\"', None)] == len(durations)
+    assert got[("sum", 'load \\"prices\\"', None)] == pytest.approx(durations.sum(), abs=1e-3)
+
+    summary = hist.summary()['load "prices"']
+    ordered = durations.sort_values().to_numpy()
+    assert summary["p50_ms"] == ordered[len(ordered) // 2]
+    assert summary["p95_ms"] == ordered[int(len(ordered) * 0.95)]
+    assert summary["max_ms"] == durations.max()
+
+
+def test_rerun_is_exported(fresh):
+    trace = tracing.begin("Spot", enabled=True)
+    with tracing.span("load"):
+        with tracing.span("parse", rows=3):
+            pass
+    tracing.traced("chart")(lambda: None)()
+    tracing.end(trace)
+    assert not tracing.active()
+
+    record = json.loads((fresh / tracing.JSONL_FILE).read_text().splitlines()[-1])
+    assert record["page"] == "Spot" and record["total_ms"] == trace.total_ms
+    assert [(s["name"], s["depth"]) for s in record["spans"]] == [("parse", 1), ("load", 0), ("chart", 0)]
+    assert record["spans"][0]["rows"] == 3
+
+    prom = parse_prometheus((fresh / tracing.PROM_FILE).read_text())
+    for s in record["spans"] + [{"name": "rerun", "ms": trace.total_ms}]:
+        assert prom[("count", s["name"], None)] == 1
+        assert prom[("sum", s["name"], None)] == pytest.approx(s["ms"], abs=1e-3)
+    assert tracing.slowest([trace], n=1)[0][0] == max(record["spans"], key=lambda s: s["ms"])["name"]
+
+
+def test_off_by_default(fresh, monkeypatch):
+    monkeypatch.setattr(tracing, "ENABLED", False)
+    assert tracing.begin("Spot") is None
+    assert tracing.span("load") is tracing._NO_SPAN
+    tracing.end(None)
+    assert not list(fresh.iterdir())
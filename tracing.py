@@ -0,0 +1,228 @@
+# tracing.py
+"""Per-rerun timing spans for the dashboard.
+
+A page calls `begin(page)` at the top of a rerun and `end(trace)` at the
+bottom; code in between wraps its stages in `span(name)` or decorates them
+with `traced(name)`. Spans of one rerun are collected on a Trace held in
+a context variable (each Streamlit session reruns in its own thread).
+Finished traces feed process-wide histograms per span name, which are
+exported as a Prometheus text file and/or a JSONL log.
+
+Tracing is on for every session with OIL_DASH_TRACE=1, or per session
+through the sidebar performance panel. When off, `span` returns a shared
+no-op object and `traced` is a single context-variable lookup per call.
+
+Environment:
+- OIL_DASH_TRACE: 1 to trace every rerun
+- OIL_DASH_TRACE_EXPORT: prom (default), jsonl, both or none
+- OIL_DASH_METRICS_DIR: export directory (default data/.metrics)
+"""
+import bisect
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+ENABLED = os.getenv("OIL_DASH_TRACE", "") not in ("", "0")
+EXPORT = os.getenv("OIL_DASH_TRACE_EXPORT", "prom")
+METRICS_DIR = os.getenv("OIL_DASH_METRICS_DIR", os.path.join("data", ".metrics"))
+PROM_FILE = "oil_dashboard.prom"
+JSONL_FILE = "traces.jsonl"
+
+# Histogram bucket upper bounds in milliseconds
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+RECENT = 1000  # durations kept per span name for percentiles
+
+_current = contextvars.ContextVar("oil_dash_trace", default=None)
+
+
+# --- Spans ---
+class _NoSpan:
+    """Returned by span() when tracing is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Span:
+    def __init__(self, trace, name, attrs):
+        self.trace, self.name, self.attrs = trace, name, attrs
+
+    def __enter__(self):
+        self.depth = self.trace.depth
+        self.trace.depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        ms = (time.perf_counter() - self.start) * 1000
+        self.trace.depth -= 1
+        self.trace.spans.append({
+            "name": self.name,
+            "start_ms": (self.start - self.trace.start) * 1000,
+            "ms": ms,
+            "depth": self.depth,
+            **self.attrs,
+        })
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class Trace:
+    """Spans of one rerun of one page."""
+
+    def __init__(self, page):
+        self.page = page
+        self.timestamp = time.time()
+        self.start = time.perf_counter()
+        self.spans = []
+        self.depth = 0
+        self.total_ms = None
+
+
+def active():
+    return _current.get() is not None
+
+
+def begin(page, enabled=False):
+    """Start tracing a rerun of page; returns the Trace or None when off."""
+    trace = Trace(page) if (ENABLED or enabled) else None
+    _current.set(trace)
+    return trace
+
+
+def span(name, **attrs):
+    """Context manager timing one stage of the current rerun."""
+    trace = _current.get()
+    if trace is None:
+        return _NO_SPAN
+    return Span(trace, name, attrs)
+
+
+def traced(name=None):
+    """Decorator recording every call of a function as a span."""
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _current.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            with Span(trace, label, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def end(trace):
+    """Finish a rerun: update the histograms and export. Returns the trace."""
+    _current.set(None)
+    if trace is None:
+        return None
+    trace.total_ms = (time.perf_counter() - trace.start) * 1000
+    histograms.observe("rerun", trace.total_ms)
+    for s in trace.spans:
+        histograms.observe(s["name"], s["ms"])
+    export(trace)
+    return trace
+
+
+# --- Histograms ---
+class Histograms:
+    """Thread-safe cumulative bucket counts and recent durations per span name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}  # name -> [bucket counts, count, sum, recent deque]
+
+    def observe(self, name, ms):
+        with self._lock:
+            entry = self._data.get(name)
+            if entry is None:
+                entry = self._data[name] = [[0] * (len(BUCKETS_MS) + 1), 0, 0.0, deque(maxlen=RECENT)]
+            entry[0][bisect.bisect_left(BUCKETS_MS, ms)] += 1
+            entry[1] += 1
+            entry[2] += ms
+            entry[3].append(ms)
+
+    def summary(self):
+        """{name: {count, sum_ms, p50_ms, p95_ms, max_ms}} over recent durations."""
+        with self._lock:
+            out = {}
+            for name, (_, count, total, recent) in self._data.items():
+                ordered = sorted(recent)
+                out[name] = {
+                    "count": count,
+                    "sum_ms": total,
+                    "p50_ms": ordered[len(ordered) // 2],
+                    "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                    "max_ms": ordered[-1],
+                }
+            return out
+
+    def prometheus(self):
+        """Prometheus text exposition of all histograms."""
+        lines = ["# HELP oil_dash_span_ms Duration of dashboard stages in milliseconds.",
+                 "# TYPE oil_dash_span_ms histogram"]
+        with self._lock:
+            for name in sorted(self._data):
+                buckets, count, total, _ = self._data[name]
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                cumulative = 0
+                for bound, n in zip(BUCKETS_MS + ("+Inf",), buckets):
+                    cumulative += n
+                    lines.append(f'oil_dash_span_ms_bucket{{span="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'oil_dash_span_ms_sum{{span="{label}"}} {total:.3f}')
+                lines.append(f'oil_dash_span_ms_count{{span="{label}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+histograms = Histograms()
+_export_lock = threading.Lock()
+
+
+# --- Export ---
+def export(trace, directory=None):
+    """Write the Prometheus file and/or append the trace to the JSONL log."""
+    if EXPORT == "none":
+        return
+    directory = directory or METRICS_DIR
+    os.makedirs(directory, exist_ok=True)
+    with _export_lock:
+        if EXPORT in ("prom", "both"):
+            path = os.path.join(directory, PROM_FILE)
+            tmp = f"{path}.tmp-{os.getpid()}"
+            with open(tmp, "w") as f:
+                f.write(histograms.prometheus())
+            os.replace(tmp, path)
+        if EXPORT in ("jsonl", "both"):
+            record = {"page": trace.page, "timestamp": trace.timestamp, "total_ms": trace.total_ms,
+                      "pid": os.getpid(), "spans": trace.spans}
+            with open(os.path.join(directory, JSONL_FILE), "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+
+def slowest(traces, n=10):
+    """Stages of several traces ranked by total time: [(name, calls, total_ms, max_ms)]."""
+    totals = {}
+    for trace in traces:
+        for s in trace.spans:
+            calls, total, worst = totals.get(s["name"], (0, 0.0, 0.0))
+            totals[s["name"]] = (calls + 1, total + s["ms"], max(worst, s["ms"]))
+    ranked = sorted(totals.items(), key=lambda item: -item[1][1])
+    return [(name, calls, total, worst) for name, (calls, total, worst) in ranked[:n]]
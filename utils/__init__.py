@@ -0,0 +1,49 @@
+# utils/__init__.py
+"""Dashboard helpers, grouped by page and imported on first use.
+
+    periods  time windows and period slicing shared by the pages
+    spot     spot price loading (N-series engine), aggregation and charts
+    snd      supply & demand loading, period x country matrix and charts
+    imports  US import flows: cube, country dimension, Sankey / map charts
+    kpis     landing page KPI index
+    panels   sidebar panels and chart rendering (cache stats, tracing)
+    theme    colors from .streamlit/config.toml, read once
+
+`from utils import plot_price_chart` imports only utils.spot; plotly and
+streamlit are imported inside the helpers that draw, so loading data (the
+API, the scheduler, benchmarks) never pays for them. Each name is bound
+on the package after its first lookup.
+"""
+import importlib
+
+_SUBMODULES = {
+    "periods": ["TIME_WINDOWS", "window_start", "slice_period", "apply_time_filter"],
+    "spot": ["PRICES_PATH", "load_spot_data", "load_spot_engine", "aggregate_prices", "ma_window_inputs",
+             "plot_price_chart", "vol_window_input", "plot_returns_with_vol", "plot_spread_matrix", "sub_metrics"],
+    "snd": ["CRUDE_PRODUCT", "SND_COLUMNS", "SND_PATHS", "SND_MEASURES", "apply_time_filter_snd", "load_and_clean",
+            "load_snd_matrix", "plot_section", "section_line_chart", "section_bar_chart"],
+    "imports": ["IMPORTS_PATH", "load_imports", "load_imports_cube", "load_country_index",
+                "prepare_sankey_nodes", "plot_sankey", "plot_barchart", "plot_imports_yoy", "plot_import_map"],
+    "kpis": ["KPI_SOURCES", "load_kpi_index", "kpi_periods"],
+    "panels": ["cache_stats_panel", "show_chart", "begin_page_trace", "performance_panel"],
+    "theme": ["text_color", "primary_color", "bg_color", "sidebar_bg", "accent_color1", "accent_color2"],
+}
+_EXPORTS = {name: module for module, names in _SUBMODULES.items() for name in names}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    if module != "theme":  # colors stay lookups into the (cached) theme
+        globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | set(_SUBMODULES))
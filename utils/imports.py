@@ -0,0 +1,168 @@
+# utils/imports.py
+"""US import flows helpers: imports cube, country dimension and charts."""
+import pandas as pd
+
+from data_cache import cached_dataset
+from figure_cache import cached_figure
+from geo import WORLD_PATH, CountryIndex, read_countries
+from imports_cube import ImportsCube
+from sankey import build_sankey_links
+from tracing import traced
+
+from . import theme
+
+IMPORTS_PATH = "data/us_crude_imports.csv"
+
+@cached_dataset(sources=lambda path=IMPORTS_PATH: [path], shared=True)
+def load_imports(path=IMPORTS_PATH):
+    """US imports fact rows used by the cube."""
+    return pd.read_csv(path, usecols=["period", "originName", "gradeName", "quantity"])
+
+@traced("load.imports_cube")
+@cached_dataset(sources=lambda path=IMPORTS_PATH: [path])
+def load_imports_cube(path=IMPORTS_PATH):
+    """Year x month x origin x grade cube of the US imports, built once per file version."""
+    return ImportsCube(load_imports(path))
+
+@traced("load.country_index")
+@cached_dataset(sources=lambda path=WORLD_PATH: [path])
+def load_country_index(path=WORLD_PATH):
+    """Country dimension (code, name, coordinates) with indexed lookups."""
+    return CountryIndex(read_countries(path))
+
+@traced("aggregate.sankey")
+def prepare_sankey_nodes(df, target_name="USA", level="origin", max_links=None):
+    """
+    Prepare Sankey nodes and link indices for Plotly.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Must have columns ['originName', 'quantity'] ('gradeName' for
+        level "grade", 'period' for level "month").
+    target_name : str
+        Name of the target node (default "USA").
+    level : str
+        "origin" (one link per origin), "grade" (origin -> grade -> target)
+        or "month" (one link per origin and month).
+    max_links : int or None
+        Fold the smallest origins into an "Other" node above this many links.
+
+    Returns
+    -------
+    nodes : list
+        List of node labels
+    source_indices : np.ndarray
+        Source node indices
+    target_indices : np.ndarray
+        Target node indices
+    values : np.ndarray
+        Link values
+    """
+    return build_sankey_links(df, level=level, target_name=target_name, max_links=max_links)
+
+
+@traced("figure.plot_sankey")
+@cached_figure
+def plot_sankey(nodes, source_indices, target_indices, values, title="Sankey Diagram"):
+    """
+    Plot a Sankey diagram with Plotly in Streamlit.
+
+    Parameters
+    ----------
+    nodes : list
+        Node labels
+    source_indices : list
+        Source node indices
+    target_indices : list
+        Target node indices
+    values : list
+        Link values
+    title : str
+        Chart title
+    """
+    import plotly.graph_objects as go
+    fig = go.Figure(data=[go.Sankey(
+        node=dict(label=nodes, color=theme.primary_color),
+        link=dict(source=source_indices, target=target_indices, value=values)
+    )])
+    fig.update_layout(yaxis_title="Thousand Barrels",
+        xaxis_title=None,
+        legend_title="Country/Region",
+        template="plotly_white",
+        height=400,
+        margin=dict(l=20, r=20, t=30, b=20),
+        hovermode=None,
+        title={"text": f"{title} Monthly Data", "x": 0.5, "xanchor": "center"},
+    )
+    return fig
+
+@traced("figure.plot_barchart")
+@cached_figure
+def plot_barchart(df, year_filter, title="Bar Chart"):
+    import plotly.graph_objects as go
+    df_sum = df.groupby("originName")["quantity"].sum().sort_values(ascending=False).reset_index()
+    fig = go.Figure(go.Bar(
+        x=df_sum['originName'],
+        y=df_sum['quantity'],
+        text=df_sum['quantity'],
+        textposition='auto'
+    ))
+    fig.update_layout(title={"text": f"{title} - {year_filter}", "x": 0.5, "xanchor": "center"},
+                      yaxis_title="Thousand Barrels",
+                      template="plotly_white",
+                      height=500,
+        margin=dict(l=20, r=20, t=30, b=20),)
+    return fig
+
+@traced("figure.plot_imports_yoy")
+@cached_figure
+def plot_imports_yoy(yearly, yoy, title="Year over Year", top_n=8):
+    """
+    Stacked yearly imports of the largest origins with the total YoY change.
+
+    yearly: year x origin totals (ImportsCube.yearly_totals)
+    yoy: per-year total and 'yoy' change in % (ImportsCube.yoy)
+    """
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    shown = list(yearly.columns[:top_n])
+    for origin in shown:
+        fig.add_trace(go.Bar(x=yearly.index, y=yearly[origin], name=origin))
+    if len(yearly.columns) > top_n:
+        fig.add_trace(go.Bar(x=yearly.index, y=yearly.iloc[:, top_n:].sum(axis=1), name="Other"))
+    fig.add_trace(go.Scatter(x=yoy.index, y=yoy["yoy"], name="YoY change (%)", yaxis="y2",
+                             mode="lines+markers", line=dict(color=theme.accent_color1)))
+    fig.update_layout(title={"text": title, "x": 0.5, "xanchor": "center"},
+                      barmode="stack",
+                      yaxis_title="Thousand Barrels",
+                      yaxis2=dict(title="YoY (%)", overlaying="y", side="right", showgrid=False),
+                      template="plotly_white",
+                      height=500,
+        margin=dict(l=20, r=20, t=30, b=20),)
+    return fig
+
+@traced("figure.plot_import_map")
+@cached_figure
+def plot_import_map(totals, title="Import Origins"):
+    """
+    Bubble map of import volumes by origin.
+
+    totals: (originName, quantity, latitude, longitude) rows
+    """
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Scattergeo(
+        lon=totals["longitude"], lat=totals["latitude"],
+        text=totals["originName"],
+        customdata=totals["quantity"],
+        hovertemplate="%{text}: %{customdata:,.0f} thousand barrels<extra></extra>",
+        marker=dict(size=totals["quantity"], sizemode="area",
+                    sizeref=2 * totals["quantity"].max() / 50 ** 2 if len(totals) else 1,
+                    color=theme.primary_color, line=dict(width=0)),
+    ))
+    fig.update_layout(title={"text": title, "x": 0.5, "xanchor": "center"},
+                      geo=dict(showland=True, showcountries=True, projection_type="natural earth"),
+                      template="plotly_white",
+                      height=500,
+        margin=dict(l=20, r=20, t=30, b=20),)
+    return fig
@@ -0,0 +1,27 @@
+# utils/kpis.py
+"""Landing page KPIs, read from the latest-value index (kpi_index.py)."""
+import pandas as pd
+
+from data_cache import cached_dataset
+from kpi_index import KpiIndex, kpi_path, read_index
+from snapshots import resolve
+from tracing import traced
+
+from .spot import PRICES_PATH
+
+# --- Landing page KPIs ---
+KPI_SOURCES = [PRICES_PATH, "data/production.csv", "data/consumption.csv", "data/stocks.csv"]
+
+@traced("load.kpi_index")
+@cached_dataset(sources=lambda: KPI_SOURCES + [kpi_path(p) for p in KPI_SOURCES])
+def load_kpi_index():
+    """Last two observations per spot series and per S&D (product, country), from data/kpi/."""
+    return KpiIndex(pd.concat([read_index(resolve(p)) for p in KPI_SOURCES], ignore_index=True))
+
+def kpi_periods(kpi):
+    """Periods a KPI compares, e.g. "Jun 2025 vs May 2025" (None when unknown)."""
+    if kpi["period"] is None:
+        return None
+    if kpi["prev_period"] is None:
+        return f"{kpi['period']:%b %Y}"
+    return f"{kpi['period']:%b %Y} vs {kpi['prev_period']:%b %Y}"
@@ -0,0 +1,57 @@
+# utils/panels.py
+"""Sidebar panels and chart rendering shared by every page."""
+import tracing
+from data_cache import dataset_cache
+from figure_cache import figure_cache
+from snapshots import snapshots
+from tracing import span
+
+# --- Cache statistics ---
+def cache_stats_panel():
+    """Sidebar expander with dataset and figure cache hit rates."""
+    import streamlit as st
+    with st.sidebar.expander("Cache statistics"):
+        data, figs = dataset_cache.stats(), figure_cache.stats()
+        st.caption(f"Datasets: {data['hits']} hits / {data['misses']} misses "
+                   f"({data['hit_rate']:.0%}), {data['bytes'] / 2**20:.1f} MB")
+        st.caption(f"Figures: {figs['hits']} hits / {figs['misses']} misses "
+                   f"({figs['hit_rate']:.0%}), {figs['bytes'] / 2**20:.1f} MB, "
+                   f"{figs['seconds_saved']:.2f} s saved")
+        versions = snapshots.versions()
+        if versions:
+            st.caption("Data versions: " + ", ".join(f"{name} {v.split('-')[0]}" for name, v in sorted(versions.items())))
+
+
+# --- Performance tracing ---
+def show_chart(fig, **kwargs):
+    """st.plotly_chart, recorded as a span with the figure payload size when tracing."""
+    import streamlit as st
+    with span("plotly_chart") as s:
+        if tracing.active():
+            s.set(payload_bytes=len(fig.to_json()))
+        st.plotly_chart(fig, **kwargs)
+
+def begin_page_trace(page):
+    """Start tracing this rerun if enabled globally or by the session's panel toggle."""
+    import streamlit as st
+    return tracing.begin(page, enabled=st.session_state.get("perf_panel", False))
+
+def performance_panel(trace):
+    """Finish the rerun trace and show the opt-in sidebar panel of the slowest stages."""
+    import pandas as pd
+    import streamlit as st
+    tracing.end(trace)
+    enabled = st.sidebar.checkbox("Performance panel", key="perf_panel")
+    if trace is None or not enabled:
+        return
+    history = st.session_state.setdefault("perf_traces", [])
+    history.append(trace)
+    del history[:-20]  # last 20 reruns of this session
+    with st.sidebar.expander("Slowest stages", expanded=True):
+        st.caption(f"Last rerun ({trace.page}): {trace.total_ms:.0f} ms, {len(trace.spans)} spans")
+        rows = tracing.slowest(history)
+        st.dataframe(pd.DataFrame(rows, columns=["stage", "calls", "total ms", "max ms"]).round(1),
+                     hide_index=True)
+        payload = sum(s.get("payload_bytes", 0) for s in trace.spans)
+        if payload:
+            st.caption(f"Chart payload this rerun: {payload / 1024:.0f} KB")
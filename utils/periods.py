@@ -0,0 +1,88 @@
+# utils/periods.py
+"""Time windows and period slicing shared by the spot and S&D pages."""
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import pandas as pd
+
+from data_cache import derive_version, frame_memo
+from tracing import traced
+
+# --- Time filter ---
+# Sidebar label -> look-back from the latest period (spot and S&D pages)
+TIME_WINDOWS = {
+    "1W": pd.DateOffset(weeks=1),
+    "1M": pd.DateOffset(months=1),
+    "3M": pd.DateOffset(months=3),
+    "6M": pd.DateOffset(months=6),
+    "1Y": pd.DateOffset(years=1),
+    "5Y": pd.DateOffset(years=5),
+    "10Y": pd.DateOffset(years=10),
+    "Last 1 Year": pd.DateOffset(years=1),
+    "Last 5 Years": pd.DateOffset(years=5),
+    "Last 10 Years": pd.DateOffset(years=10),
+}
+
+def _period_index(df):
+    """DatetimeIndex over df['period'], built once per (shared, cached) frame."""
+    return frame_memo(df, "period_index", lambda d: pd.DatetimeIndex(d["period"]))
+
+def window_start(time_filter, max_date):
+    """First date inside the window `time_filter` ends at max_date (None = everything)."""
+    if time_filter == "YTD":
+        return pd.Timestamp(datetime(max_date.year, 1, 1))
+    offset = TIME_WINDOWS.get(time_filter)
+    return max_date - offset if offset is not None else None
+
+SLICE_MEMO = 16  # slices kept per frame (custom date ranges can produce any pair of bounds)
+_slices_lock = threading.Lock()
+
+def _sorted(df):
+    """df ordered by period (missing periods dropped), sorted once per frame."""
+    return frame_memo(df, "sorted_by_period",
+                      lambda d: d[d["period"].notna()].sort_values("period", kind="stable"))
+
+def slice_period(df, start=None, end=None):
+    """
+    Rows with start <= period <= end, as a zero-copy slice.
+
+    Uses binary search on the sorted period index instead of a boolean mask;
+    frames not sorted by period are sorted once (one copy, kept with the
+    frame). The last SLICE_MEMO distinct slices of a frame come back as the
+    same objects, so what charts memoize per frame (rolling statistics)
+    carries over between reruns.
+    """
+    if df.empty:
+        return df
+    idx = _period_index(df)
+    if not idx.is_monotonic_increasing:
+        df = _sorted(df)
+        idx = _period_index(df)
+    i = int(idx.searchsorted(pd.Timestamp(start), side="left")) if start is not None else 0
+    j = int(idx.searchsorted(pd.Timestamp(end), side="right")) if end is not None else len(idx)
+    slices = frame_memo(df, "slices", lambda d: OrderedDict())
+    with _slices_lock:  # shared frames: sessions slice them concurrently
+        piece = slices.get((i, j))
+        if piece is not None:
+            slices.move_to_end((i, j))
+            return piece
+    piece = derive_version(df, df.iloc[i:j], "slice", i, j)
+    with _slices_lock:
+        piece = slices.setdefault((i, j), piece)
+        while len(slices) > SLICE_MEMO:
+            slices.popitem(last=False)
+    return piece
+
+def _apply_window(df, time_filter):
+    if df.empty:
+        return df
+    idx = _period_index(df)
+    if not idx.is_monotonic_increasing:
+        return _apply_window(slice_period(df), time_filter)
+    return slice_period(df, window_start(time_filter, idx[-1]))
+
+@traced("filter.time")
+def apply_time_filter(df, time_filter):
+    """Spot timeframes: 1W, 1M, 3M, 6M, YTD, 1Y, 5Y, 10Y or Max."""
+    return _apply_window(df, time_filter)
@@ -0,0 +1,130 @@
+# utils/snd.py
+"""Supply & Demand helpers: production / consumption / stocks loading, matrix and charts."""
+import pandas as pd
+
+from data_cache import cached_dataset
+from figure_cache import cached_figure
+from snapshots import resolve
+from snd_matrix import SndMatrix
+from storage import parquet_path, read_parquet
+from tracing import traced
+
+from .panels import show_chart
+from .periods import _apply_window, window_start
+
+# --- Apply time filter for monthly S&D data ---
+@traced("filter.time_snd")
+def apply_time_filter_snd(df, time_filter):
+    """Filter monthly S&D data based on sidebar selection."""
+    return _apply_window(df, time_filter)
+
+# --- Load and clean CSV data ---
+CRUDE_PRODUCT = "Crude oil including lease condensate"
+SND_COLUMNS = ["period", "countryRegionId", "value"]
+
+@traced("load.and_clean")
+@cached_dataset(sources=lambda path, *a, **k: [path, parquet_path(path)], shared=True)
+def load_and_clean(path, filter_crude=False, columns=None):
+    """
+    Load an S&D dataset keeping positive values only.
+
+    columns: columns to return (None = all). With a Parquet copy only these
+    are read and the crude / value > 0 filters are pushed down to the reader.
+    """
+    path = resolve(path)  # current snapshot of the dataset, if published
+    read_cols = None
+    if columns is not None:
+        read_cols = list(dict.fromkeys(["period", "value", *columns]))
+    filters = [("value", ">", 0)]
+    if filter_crude:
+        filters.append(("productName", "==", CRUDE_PRODUCT))
+    df = read_parquet(path, columns=read_cols, filters=filters)
+    if df is not None:
+        return _sort_periods(df[columns] if columns is not None else df)
+
+    if read_cols is not None and filter_crude:
+        read_cols.append("productName")
+    df = pd.read_csv(path, usecols=lambda c: read_cols is None or c in read_cols)
+    if filter_crude and "productName" in df.columns:
+        df = df[df["productName"] == CRUDE_PRODUCT]
+    df["period"] = pd.to_datetime(df["period"], errors="coerce")
+    df["value"] = pd.to_numeric(df["value"], errors="coerce")
+    df = df[df["value"].notna() & (df["value"] > 0)]
+    return _sort_periods(df[columns] if columns is not None else df)
+
+def _sort_periods(df):
+    """Rows ordered by period (missing periods dropped) for slice_period."""
+    df = df[df["period"].notna()]
+    return df.sort_values("period", kind="stable").reset_index(drop=True)
+
+# --- Period x country matrix ---
+SND_PATHS = {"Production": "data/production.csv", "Consumption": "data/consumption.csv", "Stocks": "data/stocks.csv"}
+# Section measure label -> SndMatrix measure
+SND_MEASURES = {"Level": "level", "YoY change": "yoy", "YoY change (%)": "yoy_pct", "12-month average": "ttm"}
+
+@traced("load.snd_matrix")
+@cached_dataset(sources=lambda: [p for path in SND_PATHS.values() for p in (path, parquet_path(path))])
+def load_snd_matrix():
+    """Production, consumption, stocks and balance matrices with group sums, built once per version."""
+    return SndMatrix({name: load_and_clean(path, filter_crude=(name == "Production"), columns=SND_COLUMNS)
+                      for name, path in SND_PATHS.items()})
+
+# --- Plot line + bar section ---
+def plot_section(matrix, title, selected_countries, global_countries, time_filter="All", measure="Level",
+                 activity=None):
+    """Plot the monthly measure and the last 12-month average for the selected countries / groups."""
+    import streamlit as st
+    activity = activity or title
+    selected = selected_countries if selected_countries else global_countries
+    end = matrix.last_row(activity)
+    if end < 0:
+        st.warning(f"No data available for {title}.")
+        return
+
+    start = window_start(time_filter, matrix.periods[end])
+    series = matrix.frame(activity, selected, SND_MEASURES[measure], start=start)
+    if series.empty:
+        st.warning(f"No data available for {title} with the selected countries.")
+        return
+
+    unit = "Million Barrels" if activity == "Stocks" else "Thousand Barrels per Day"
+    axis = "YoY change (%)" if measure == "YoY change (%)" else unit
+    show_chart(section_line_chart(series, title, axis, measure), use_container_width=True)
+    show_chart(section_bar_chart(matrix.latest(activity, selected), title, unit), use_container_width=True)
+
+@traced("figure.section_line_chart")
+@cached_figure
+def section_line_chart(series, title, yaxis_title="Thousand Barrels per Day", measure="Level"):
+    """Monthly time series per column of a wide period x country frame."""
+    import plotly.graph_objects as go
+    fig_line = go.Figure([go.Scatter(x=series.index, y=series[name], name=name, mode="lines+markers",
+                                     connectgaps=True)
+                          for name in series.columns])
+    suffix = "Monthly Time Series" if measure == "Level" else measure
+    fig_line.update_layout(
+        yaxis_title=yaxis_title,
+        xaxis_title=None,
+        legend_title="Country/Region",
+        template="plotly_white",
+        height=400,
+        margin=dict(l=20, r=20, t=30, b=20),
+        hovermode="x unified",
+        title={"text": f"{title} {suffix}", "x": 0.5, "xanchor": "center"},
+    )
+    return fig_line
+
+@traced("figure.section_bar_chart")
+@cached_figure
+def section_bar_chart(latest, title, yaxis_title="Thousand Barrels per Day"):
+    """Average of the last 12 months per country (SndMatrix.latest)."""
+    import plotly.graph_objects as go
+    fig_bar = go.Figure(go.Bar(x=latest.index, y=latest.to_numpy()))
+    fig_bar.update_layout(
+        yaxis_title=yaxis_title,
+        template="plotly_white",
+        xaxis_title=None,
+        height=250,
+        margin=dict(l=20, r=20, t=30, b=20),
+        title={"text": f"{title} - Average Last 12 Months", "x": 0.5, "xanchor": "center"},
+    )
+    return fig_bar
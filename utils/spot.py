@@ -0,0 +1,226 @@
+# utils/spot.py
+"""Spot analysis helpers: spot series loading (engine and Brent / WTI artifact), aggregation and charts."""
+import pandas as pd
+
+from data_cache import cached_dataset, frame_memo
+from downsample import POINT_BUDGET, downsample_indices, scatter_class
+from figure_cache import cached_figure
+from price_pyramid import build_pyramid
+from rolling import RollingStats
+from snapshots import resolve
+from spot_derived import DERIVED_PATH, SERIES, load_derived
+from spot_engine import SpotEngine, read_spot_prices
+from storage import parquet_path
+from tracing import span, traced
+
+from . import theme
+
+# --- load spot prices data ---
+PRICES_PATH = "data/prices.csv"
+
+def _spot_frame(derived, name, product=None):
+    """Rows of one derived series as a (period, [product,] value, change, returns) frame."""
+    rows = derived[derived[f"has_{name}"]] if f"has_{name}" in derived else derived
+    df = pd.DataFrame({
+        "period": rows["period"].to_numpy(),
+        "value": rows[name].to_numpy(),
+        "change": rows[f"{name}_change"].to_numpy(),
+        "returns": rows[f"{name}_returns"].to_numpy(),
+    })
+    if product is not None:
+        df.insert(1, "product", product)
+    return df
+
+@traced("load.spot_data")
+@cached_dataset(sources=[PRICES_PATH, parquet_path(PRICES_PATH)], shared=True)
+def load_spot_data():
+    """Brent, WTI, spread and long prices frames, mapped from the derived-series artifact."""
+    derived = load_derived(resolve(PRICES_PATH), path=resolve(DERIVED_PATH))
+    brent = _spot_frame(derived, "brent", SERIES["brent"])
+    wti = _spot_frame(derived, "wti", SERIES["wti"])
+    spread = _spot_frame(derived, "spread")
+    prices = pd.concat([brent, wti], ignore_index=True).sort_values(["period", "product"], kind="stable")
+    return brent, wti, spread, prices.reset_index(drop=True)
+
+@traced("load.spot_engine")
+@cached_dataset(sources=[PRICES_PATH, parquet_path(PRICES_PATH)])
+def load_spot_engine():
+    """Every configured spot series and combination as one date-aligned matrix (spot_engine.py)."""
+    return SpotEngine(read_spot_prices(resolve(PRICES_PATH)))
+
+# --- Aggregate prices ---
+@traced("aggregate.prices")
+def aggregate_prices(df, freq="Daily"):
+    """
+    Aggregate single-product daily data to a coarser frequency.
+    freq: "Daily", "Weekly", "Monthly", "Quarterly" or "Yearly"
+
+    Levels come from a resolution pyramid built once per loaded frame;
+    each has the last value per bucket plus high/low/mean columns.
+    """
+    pyramid = frame_memo(df, "price_pyramid", build_pyramid)
+    return pyramid.get(freq, pyramid["Daily"])
+
+# --- Price chart ---
+def _budget_points(df, y, max_points):
+    """Indices of df rows to draw (all of them within the point budget)."""
+    return downsample_indices(df["period"].to_numpy(), y, max_points)
+
+def ma_window_inputs(product_name):
+    """Fast and slow MA window inputs for one product, side by side."""
+    import streamlit as st
+    col_fast, col_slow = st.columns([1,1])
+    with col_slow:
+        slow_k = st.number_input(
+            f"Rolling window for {product_name} slow MA",
+            min_value=1, max_value=250, value=20, step=1,
+            key=f"slow_rolling_{product_name}")
+    with col_fast:
+        fast_k = st.number_input(
+            f"Rolling window for {product_name} fast MA",
+            min_value=1, max_value=250, value=20, step=1,
+            key=f"fast_rolling_{product_name}")
+    return fast_k, slow_k
+
+@traced("figure.plot_price_chart")
+@cached_figure
+def plot_price_chart(df, product_name, title, yaxis_title, show_ma=True, fast_k=20, slow_k=20,
+                     max_points=POINT_BUDGET):
+    """
+    Plot price chart with optional moving averages.
+
+    df: DataFrame with ['period', 'value']
+    product_name: str, name of the product for labeling
+    title: chart title
+    yaxis_title: y-axis label
+    show_ma: bool, whether to show moving averages
+    fast_k: int, period of fast MA
+    slow_k: int, period of slow MA
+    max_points: int, points drawn per trace (None = all); MAs are computed
+        on the full series and drawn at the same downsampled dates
+    """
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    values = df['value'].to_numpy(dtype="float64")
+    keep = _budget_points(df, values, max_points)
+    x = df['period'].to_numpy()[keep]
+    Scatter = scatter_class(len(x))
+        # Main price line
+    fig.add_trace(Scatter(
+        x=x,
+        y=values[keep],
+        mode='lines',
+        name='Price',
+        line=dict(color=theme.primary_color)
+    ))
+
+    if show_ma:
+        with span("rolling.ma"):
+            stats = frame_memo(df, "rolling_stats", lambda d: RollingStats(values))
+            fast_ma, slow_ma = stats.mean(fast_k), stats.mean(slow_k)
+        if fast_k > 0:
+            fig.add_trace(Scatter(
+                x=x,
+                y=fast_ma[keep],
+                mode='lines',
+                name=f'MA{fast_k} (Fast)',
+                line=dict(color=theme.accent_color1, dash='dot')
+            ))
+        if slow_k > 0:
+            fig.add_trace(Scatter(
+                x=x,
+                y=slow_ma[keep],
+                mode='lines',
+                name=f'MA{slow_k} (Slow)',
+                line=dict(color=theme.accent_color2, dash='dash')
+            ))
+
+    fig.update_layout(
+        title=title,
+        yaxis_title=yaxis_title,
+        template="plotly_white",
+        height=400,
+        margin=dict(l=20, r=20, t=30, b=20),
+        hovermode="x unified"
+    )
+    return fig
+
+# --- Returns + volatility chart ---
+def vol_window_input(product_name):
+    """Rolling volatility window input, shown above the returns chart."""
+    import streamlit as st
+    return st.number_input(
+        f"Rolling window for {product_name} volatility",
+        min_value=1, max_value=250, value=20, step=1,
+        key=f"rolling_{product_name}"
+    )
+
+@traced("figure.plot_returns_with_vol")
+@cached_figure
+def plot_returns_with_vol(df, product_name, k=20, max_points=POINT_BUDGET):
+    import plotly.graph_objects as go
+    # Daily returns come precomputed from load_spot_data
+    returns = df["returns"] if "returns" in df.columns else df["value"].pct_change() * 100
+
+    returns = returns.to_numpy(dtype="float64")
+    with span("rolling.vol"):
+        rolling_std = frame_memo(df, "rolling_stats_returns", lambda d: RollingStats(returns)).std(k)
+    upper = returns + rolling_std
+    lower = returns - rolling_std
+
+    # Volatility uses every return; only the drawn points are downsampled
+    keep = _budget_points(df, returns, max_points)
+    x = df["period"].to_numpy()[keep]
+    Scatter = scatter_class(len(x))
+
+    fig = go.Figure()
+    fig.add_trace(Scatter(x=x, y=returns[keep], mode="lines", name="Returns"))
+    fig.add_trace(Scatter(x=x, y=upper[keep],
+                          line=dict(color=theme.accent_color1, dash='dot'), name="+1σ", fill=None,))
+    fig.add_trace(Scatter(x=x, y=lower[keep],
+                          line=dict(color=theme.accent_color2, dash='dot',), name="-1σ", fill=None,))
+
+    fig.update_layout(
+        title=f"{product_name} Daily Returns with {k}-period Rolling Volatility",
+        yaxis_title="Daily Returns (%)",
+        xaxis_title=None,
+        template="plotly_white",
+        height=400,
+        margin=dict(l=20, r=20, t=30, b=20),
+        hovermode="x unified"
+    )
+    return fig
+
+# --- Spread matrix ---
+@traced("figure.plot_spread_matrix")
+@cached_figure
+def plot_spread_matrix(matrix, title="Spread Matrix"):
+    """Heatmap of row - column spreads ($/BBL), from SpotEngine.spread_matrix."""
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Heatmap(
+        z=matrix.to_numpy(), x=list(matrix.columns), y=list(matrix.index),
+        text=matrix.round(2).to_numpy(), texttemplate="%{text}", colorscale="RdBu", zmid=0,
+        hovertemplate="%{y} - %{x}: %{z:.2f} $/BBL<extra></extra>",
+    ))
+    fig.update_layout(
+        title=title,
+        template="plotly_white",
+        height=max(300, 40 * len(matrix) + 100),
+        margin=dict(l=20, r=20, t=30, b=20),
+        yaxis=dict(autorange="reversed"),
+    )
+    return fig
+
+# --- Sub-metrics (High / Low) ---
+def sub_metrics(df, label_high="High", label_low="Low", time_filter_name="Timeframe", unit="$/BBL"):
+    import streamlit as st
+    if df.empty:
+        return
+    # Aggregated frames carry the intra-bucket extremes
+    high = df["high"].max() if "high" in df.columns else df["value"].max()
+    low = df["low"].min() if "low" in df.columns else df["value"].min()
+    col_low, col_high = st.columns(2)
+    col_high.markdown(f"<p style='font-size:18px; margin:0'>{label_high} ({time_filter_name}): "
+                      f"<b>{high:.2f} {unit}</b></p>", unsafe_allow_html=True)
+    col_low.markdown(f"<p style='font-size:18px; margin:0'>{label_low} ({time_filter_name}): "
+                     f"<b>{low:.2f} {unit}</b></p>", unsafe_allow_html=True)
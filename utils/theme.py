@@ -0,0 +1,47 @@
+# utils/theme.py
+"""Theme colors from .streamlit/config.toml.
+
+The file is parsed once, on the first color lookup (`theme.primary_color`),
+with the standard library's tomllib (the toml package on Python < 3.11).
+Colors missing from the file fall back to the dashboard defaults.
+"""
+import os
+from functools import lru_cache
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".streamlit", "config.toml")
+
+# Attribute -> (config.toml [theme] key, default)
+COLORS = {
+    "text_color": ("textColor", "#e2e8f0"),
+    "primary_color": ("primaryColor", "#615fff"),
+    "bg_color": ("backgroundColor", "#1d293d"),
+    "sidebar_bg": ("secondaryBackgroundColor", "#0f172b"),
+    "accent_color1": ("accentColor1", "#F4F754"),
+    "accent_color2": ("accentColor2", "#CD2C58"),
+}
+
+
+def _read_toml(path):
+    try:
+        import tomllib
+    except ModuleNotFoundError:  # Python < 3.11
+        import toml
+        return toml.load(path)
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+@lru_cache(maxsize=1)
+def settings():
+    """The [theme] table of the Streamlit config ({} without a config file)."""
+    try:
+        return _read_toml(CONFIG_PATH).get("theme", {})
+    except FileNotFoundError:
+        return {}
+
+
+def __getattr__(name):
+    if name in COLORS:
+        key, default = COLORS[name]
+        return settings().get(key, default)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")